@@ -0,0 +1,363 @@
+"""Rendering of many instance files in one process pool."""
+import glob
+import json
+import logging
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+import yaml
+from linkml_runtime import SchemaView
+
+from linkml_renderer.renderers.multi_renderer import MultiRenderer
+from linkml_renderer.renderers.profiling import RenderProfile
+from linkml_renderer.renderers.renderer import Renderer
+from linkml_renderer.schema_cache import SchemaCache, load_schema
+from linkml_renderer.style.style_engine import StyleEngine
+
+logger = logging.getLogger(__name__)
+
+INPUT_SUFFIXES = (".yaml", ".yml", ".json")
+"""Suffixes of files picked up when a directory is given as input."""
+
+_worker_state: Optional[Tuple[MultiRenderer, SchemaView]] = None
+"""Renderers and schema loaded once per worker process."""
+
+
+@dataclass
+class BatchItem:
+    """A single input file and where to write its renderings."""
+
+    input_path: Path
+    output_paths: Dict[str, Path]
+    """Output file for each format."""
+
+    @property
+    def output_path(self) -> Path:
+        """Output file of the first format."""
+        return next(iter(self.output_paths.values()))
+
+
+@dataclass
+class BatchResult:
+    """Outcome of rendering one input file."""
+
+    input_path: Path
+    output_paths: Dict[str, Path]
+    error: Optional[str] = None
+
+    @property
+    def output_path(self) -> Path:
+        """Output file of the first format."""
+        return next(iter(self.output_paths.values()))
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def load_instance(path: str, input_format: str) -> Any:
+    """
+    Load an instance from a YAML or JSON file.
+
+    :param path: file to load
+    :param input_format: yaml or json
+    :return: instance as a dict (or list)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if input_format == "yaml":
+            return yaml.safe_load(f)
+        else:
+            return json.load(f)
+
+
+def iter_records(path: str, input_format: str) -> Iterator[Any]:
+    """
+    Lazily load records from a JSON Lines file or a multi-document YAML stream.
+
+    Only one record is held in memory at a time. Blank lines in JSON Lines files
+    and empty YAML documents are skipped.
+
+    :param path: file to load
+    :param input_format: jsonl, or yaml for a multi-document stream
+    :return: iterator over records, as dicts (or lists)
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if input_format == "jsonl":
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}, line {line_number}: {e}") from e
+        elif input_format == "yaml":
+            for doc in yaml.safe_load_all(f):
+                if doc is not None:
+                    yield doc
+        else:
+            raise ValueError(f"Cannot read records from {input_format}; use yaml or jsonl")
+
+
+def load_renderer(
+    renderer_class: Type[Renderer],
+    schema: str,
+    config: Optional[str] = None,
+    profile: Optional[RenderProfile] = None,
+    cache_directory: Optional[str] = None,
+) -> Tuple[Renderer, SchemaView]:
+    """
+    Create a renderer with its schema and style configuration.
+
+    :param renderer_class: renderer to instantiate
+    :param schema: path to the LinkML schema
+    :param config: optional path to a style configuration file
+    :param profile: if set, renders are profiled into it
+    :param cache_directory: if set, the schema is loaded from a snapshot kept there
+    :return: renderer and schemaview
+    """
+    sv, se = _load_schema(schema, config, cache_directory)
+    renderer = renderer_class(profile=profile)
+    renderer.style_engine = se
+    return renderer, sv
+
+
+def load_renderers(
+    renderer_classes: Dict[str, Type[Renderer]],
+    schema: str,
+    config: Optional[str] = None,
+    profile: Optional[RenderProfile] = None,
+    cache_directory: Optional[str] = None,
+) -> Tuple[MultiRenderer, SchemaView]:
+    """
+    Create renderers for several formats, sharing a schema and style configuration.
+
+    :param renderer_classes: renderer to instantiate for each format
+    :param schema: path to the LinkML schema
+    :param config: optional path to a style configuration file
+    :param profile: if set, renders are profiled into it
+    :param cache_directory: if set, the schema is loaded from a snapshot kept there
+    :return: renderer for all formats, and schemaview
+    """
+    sv, se = _load_schema(schema, config, cache_directory)
+    return MultiRenderer.for_formats(renderer_classes, se, profile), sv
+
+
+def _load_schema(
+    schema: str, config: Optional[str], cache_directory: Optional[str]
+) -> Tuple[SchemaView, StyleEngine]:
+    if cache_directory:
+        return SchemaCache(cache_directory).load(schema, config)
+    return load_schema(schema, config)
+
+
+def expand_inputs(inputs: Iterable[str]) -> List[Tuple[Path, Path]]:
+    """
+    Expand files, glob patterns and directories into a list of input files.
+
+    Directories contribute the files directly inside them with a suffix in INPUT_SUFFIXES;
+    use a recursive glob pattern (``dir/**/*.json``) to descend into subdirectories.
+
+    :param inputs: file names, glob patterns or directories
+    :return: (file, path relative to the output directory) for each file, without duplicates
+    """
+    found = []
+    seen = set()
+
+    def add(path: Path, relative: Path) -> None:
+        key = path.resolve()
+        if key not in seen:
+            seen.add(key)
+            found.append((path, relative))
+
+    for input_spec in inputs:
+        path = Path(input_spec)
+        if path.is_dir():
+            for p in sorted(path.iterdir()):
+                if p.is_file() and p.suffix.lower() in INPUT_SUFFIXES:
+                    add(p, Path(p.name))
+        elif glob.has_magic(input_spec):
+            matches = sorted(glob.glob(input_spec, recursive=True))
+            if not matches:
+                raise FileNotFoundError(f"No files match {input_spec}")
+            for match in matches:
+                if os.path.isfile(match):
+                    add(Path(match), Path(Path(match).name))
+        elif path.is_file():
+            add(path, Path(path.name))
+        else:
+            raise FileNotFoundError(f"No such file or directory: {input_spec}")
+    return found
+
+
+def plan_batch(
+    inputs: Iterable[str], output_directory: str, suffixes: Dict[str, str]
+) -> List[BatchItem]:
+    """
+    Work out the output files for each input.
+
+    :param inputs: file names, glob patterns or directories
+    :param output_directory: directory to write renderings to
+    :param suffixes: suffix of output files for each format, e.g. ``{"html": ".html"}``
+    :return: one item per input file
+    """
+    items = []
+    outputs = {}
+    expanded = expand_inputs(inputs)
+    stems = Counter(relative.with_suffix("") for _, relative in expanded)
+    for path, relative in expanded:
+        output_paths = {}
+        for fmt, suffix in suffixes.items():
+            if stems[relative.with_suffix("")] > 1:
+                # e.g. x.json and x.yaml are written to x.json.html and x.yaml.html
+                output_relative = relative.with_name(relative.name + suffix)
+            else:
+                output_relative = relative.with_suffix(suffix)
+            output_path = Path(output_directory) / output_relative
+            if output_path in outputs:
+                raise ValueError(
+                    f"{path} and {outputs[output_path]} would both be written to {output_path}"
+                )
+            outputs[output_path] = path
+            output_paths[fmt] = output_path
+        items.append(BatchItem(path, output_paths))
+    return items
+
+
+def _init_worker(
+    renderer_classes: Dict[str, Type[Renderer]],
+    schema: str,
+    config: Optional[str],
+    profiled: bool = False,
+    cache_directory: Optional[str] = None,
+) -> None:
+    global _worker_state
+    profile = RenderProfile() if profiled else None
+    _worker_state = load_renderers(renderer_classes, schema, config, profile, cache_directory)
+
+
+def _render_item(
+    renderer: MultiRenderer,
+    sv: SchemaView,
+    item: BatchItem,
+    input_format: str,
+    root: Optional[str],
+) -> BatchResult:
+    try:
+        obj = load_instance(str(item.input_path), input_format)
+        item.output_path.parent.mkdir(parents=True, exist_ok=True)
+        renderer.render_to_files(item.output_paths, obj, sv, source_element_name=root)
+    except Exception as e:
+        logger.debug(f"Failed to render {item.input_path}", exc_info=True)
+        return BatchResult(item.input_path, item.output_paths, f"{type(e).__name__}: {e}")
+    return BatchResult(item.input_path, item.output_paths)
+
+
+def _render_items(
+    args: Tuple[List[BatchItem], str, Optional[str]]
+) -> Tuple[List[BatchResult], Optional[RenderProfile]]:
+    items, input_format, root = args
+    renderer, sv = _worker_state
+    results = [_render_item(renderer, sv, item, input_format, root) for item in items]
+    # counts are handed back per chunk, for the parent to merge
+    profile = renderer.profile
+    if profile is not None:
+        for r in renderer.renderers.values():
+            r.profile = RenderProfile()
+    return results, profile
+
+
+def render_batch(
+    items: List[BatchItem],
+    renderer_classes: Dict[str, Type[Renderer]],
+    schema: str,
+    config: Optional[str] = None,
+    input_format: str = "yaml",
+    root: Optional[str] = None,
+    jobs: int = 1,
+    chunk_size: int = 16,
+    profile: Optional[RenderProfile] = None,
+    cache_directory: Optional[str] = None,
+) -> Iterator[BatchResult]:
+    """
+    Render many input files, optionally across a pool of worker processes.
+
+    The schema and style configuration are loaded once per worker, not once per file,
+    and each file is traversed once however many formats it is rendered to.
+    A file that fails to render is reported in its result; the rest of the batch
+    continues.
+
+    :param items: files to render, from :func:`plan_batch`
+    :param renderer_classes: renderer to use for each format
+    :param schema: path to the LinkML schema
+    :param config: optional path to a style configuration file
+    :param input_format: yaml or json
+    :param root: name of the class at the root of each instance
+    :param jobs: number of worker processes; 1 renders in this process
+    :param chunk_size: maximum number of files sent to a worker at a time
+    :param profile: if set, renders are profiled into it, including those of workers
+    :param cache_directory: if set, the schema is loaded from a snapshot kept there
+    :return: one result per item, in order
+    """
+    if jobs <= 1 or len(items) <= 1:
+        renderer, sv = load_renderers(renderer_classes, schema, config, profile, cache_directory)
+        for item in items:
+            yield _render_item(renderer, sv, item, input_format, root)
+        return
+    # small batches are split finely enough to keep every worker busy
+    chunk_size = max(1, min(chunk_size, len(items) // (jobs * 4)))
+    chunks = [
+        (items[i : i + chunk_size], input_format, root) for i in range(0, len(items), chunk_size)
+    ]
+    initargs = (renderer_classes, schema, config, profile is not None, cache_directory)
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=initargs
+    ) as executor:
+        for results, worker_profile in executor.map(_render_items, chunks):
+            if worker_profile is not None:
+                profile.merge(worker_profile)
+            yield from results
+
+
+def render_records(
+    renderer: MultiRenderer,
+    sv: SchemaView,
+    path: str,
+    input_format: str,
+    output_directory: str,
+    suffixes: Dict[str, str],
+    root: Optional[str] = None,
+) -> Iterator[BatchResult]:
+    """
+    Render each record of a JSON Lines or multi-document YAML file to its own files.
+
+    Record n (counting from 1) of ``x.jsonl`` is written to ``x-n`` plus the suffix of
+    each format. A record that fails to render is reported in its result; the remaining
+    records are still rendered.
+
+    :param renderer: renderers to use
+    :param sv: schema the records conform to
+    :param path: file holding the records
+    :param input_format: jsonl, or yaml for a multi-document stream
+    :param output_directory: directory to write renderings to
+    :param suffixes: suffix of output files for each format, e.g. ``{"html": ".html"}``
+    :param root: name of the class at the root of each record
+    :return: one result per record, in order
+    """
+    stem = Path(path).stem
+    Path(output_directory).mkdir(parents=True, exist_ok=True)
+    for n, record in enumerate(iter_records(path, input_format), start=1):
+        input_path = Path(f"{path}#{n}")
+        output_paths = {
+            fmt: Path(output_directory) / f"{stem}-{n}{suffix}" for fmt, suffix in suffixes.items()
+        }
+        try:
+            renderer.render_to_files(output_paths, record, sv, source_element_name=root)
+        except Exception as e:
+            logger.debug(f"Failed to render {input_path}", exc_info=True)
+            yield BatchResult(input_path, output_paths, f"{type(e).__name__}: {e}")
+        else:
+            yield BatchResult(input_path, output_paths)
@@ -0,0 +1,6 @@
+"""
+Benchmarks of rendering throughput and memory.
+
+Run from the repository root with ``python -m linkml_renderer.benchmarks``; see
+``--help`` for sizes, formats and comparing against a stored baseline.
+"""
@@ -0,0 +1,111 @@
+"""Command line interface for the benchmark suite."""
+import sys
+
+import click
+
+from linkml_renderer.benchmarks.generator import SIZES, GeneratorConfig
+from linkml_renderer.benchmarks.runner import (
+    BUNDLED_CASES,
+    BenchmarkCase,
+    compare,
+    format_report,
+    load_results,
+    run_benchmarks,
+    save_results,
+)
+from linkml_renderer.benchmarks.startup import format_startup_report, run_startup
+from linkml_renderer.cli import FORMAT_TO_RENDERER
+
+
+@click.command()
+@click.option(
+    "--size",
+    type=click.Choice(list(SIZES)),
+    default="small",
+    show_default=True,
+    help="Preset size of generated instances",
+)
+@click.option("--collection-length", type=int, help="Members of each collection of the root")
+@click.option("--nested-length", type=int, help="Members of each nested collection")
+@click.option("--depth", type=int, help="Levels of inlined objects below the root")
+@click.option("--string-length", type=int, help="Length of generated strings")
+@click.option(
+    "-t",
+    "--output-format",
+    type=click.Choice(list(FORMAT_TO_RENDERER)),
+    multiple=True,
+    help="Formats to benchmark; all by default",
+)
+@click.option("-s", "--schema", help="Benchmark this schema instead of the bundled ones")
+@click.option("-r", "--root", help="Class of generated instances of --schema")
+@click.option("-c", "--config", help="Style configuration for --schema")
+@click.option("--repeat", type=click.IntRange(min=1), default=3, show_default=True)
+@click.option("--baseline", type=click.Path(exists=True), help="Results to compare against")
+@click.option("--save", type=click.Path(), help="Write results to this file, e.g. as a baseline")
+@click.option(
+    "--startup/--no-startup",
+    default=False,
+    show_default=True,
+    help="Instead, time linkml-render from cold on a small instance, in new interpreters",
+)
+@click.option("--data", help="Instance to render with --startup and --schema")
+@click.option("--time-tolerance", type=float, default=0.25, show_default=True)
+@click.option("--memory-tolerance", type=float, default=0.25, show_default=True)
+def main(
+    size,
+    collection_length,
+    nested_length,
+    depth,
+    string_length,
+    output_format,
+    schema,
+    root,
+    config,
+    repeat,
+    baseline,
+    save,
+    startup,
+    data,
+    time_tolerance,
+    memory_tolerance,
+):
+    """Benchmark renderers on synthetic instances of the bundled (or given) schemas.
+
+    Exits with status 1 if any measurement regressed against --baseline by more than
+    the tolerance.
+
+    With --startup, the command line interface is timed instead: --help, and the rendering
+    of a small instance to each format, with and without a schema snapshot in --cache-dir.
+    """
+    if startup:
+        if schema and not data:
+            raise click.UsageError("--startup with --schema requires --data")
+        results = run_startup(schema, data, list(output_format) or None, repeat)
+        click.echo(format_startup_report(results))
+        return
+    preset = SIZES[size]
+    generator_config = GeneratorConfig(
+        collection_length=collection_length or preset.collection_length,
+        nested_collection_length=nested_length or preset.nested_collection_length,
+        max_depth=preset.max_depth if depth is None else depth,
+        string_length=string_length or preset.string_length,
+    )
+    formats = output_format or list(FORMAT_TO_RENDERER)
+    renderers = {fmt: FORMAT_TO_RENDERER[fmt] for fmt in formats}
+    if schema:
+        cases = [BenchmarkCase(schema, schema, root, config)]
+    else:
+        cases = BUNDLED_CASES
+    results = run_benchmarks(cases, renderers, generator_config, repeat)
+    comparisons = compare(
+        results, load_results(baseline) if baseline else [], time_tolerance, memory_tolerance
+    )
+    click.echo(format_report(comparisons))
+    if save:
+        save_results(results, save, size=size)
+    if any(c.regressions for c in comparisons):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
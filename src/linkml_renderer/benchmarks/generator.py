@@ -0,0 +1,174 @@
+"""Generation of synthetic instances of any LinkML schema, for benchmarks."""
+import random
+import string
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from linkml_runtime import SchemaView
+from linkml_runtime.linkml_model import SlotDefinition
+
+from linkml_renderer.renderers.render_plan import render_plan_cache
+
+
+@dataclass
+class GeneratorConfig:
+    """Size and shape of generated instances."""
+
+    collection_length: int = 100
+    """Number of members of each multivalued slot of the root object."""
+
+    nested_collection_length: int = 3
+    """Number of members of each multivalued slot below the root object."""
+
+    max_depth: int = 3
+    """Levels of inlined objects below the root; deeper inlined slots are left empty."""
+
+    string_length: int = 16
+    """Length of generated strings."""
+
+    fill_ratio: float = 1.0
+    """Probability that an optional slot is given a value."""
+
+    seed: int = 42
+    """Seed for the random choices, so that the same config gives the same instance."""
+
+
+SIZES: Dict[str, GeneratorConfig] = {
+    "small": GeneratorConfig(collection_length=20, nested_collection_length=2, max_depth=2),
+    "medium": GeneratorConfig(collection_length=200, nested_collection_length=3, max_depth=3),
+    "large": GeneratorConfig(collection_length=2000, nested_collection_length=3, max_depth=3),
+}
+"""Preset configurations."""
+
+_TYPE_KINDS = [
+    ("boolean", ["boolean"]),
+    ("integer", ["integer"]),
+    ("float", ["float", "double", "decimal"]),
+    ("datetime", ["datetime"]),
+    ("date", ["date"]),
+    ("uri", ["uri"]),
+    ("curie", ["uriorcurie", "curie"]),
+]
+"""Kinds of generated value, by the built-in types a type may derive from; else strings."""
+
+_LETTERS = string.ascii_letters + " "
+
+
+@dataclass
+class SyntheticGenerator:
+    """
+    Generates instances that conform to a schema, as plain dicts.
+
+    Every slot of an object is filled according to its range: inlined objects are
+    generated recursively up to :attr:`GeneratorConfig.max_depth`, references point at
+    the identifiers of objects generated earlier, enums take one of their permissible
+    values, and types get values of their base type.
+
+    >>> generator = SyntheticGenerator(sv, GeneratorConfig(collection_length=1000))
+    >>> instance = generator.generate("Container")
+    >>> generator.objects
+    """
+
+    schemaview: SchemaView
+    config: GeneratorConfig = field(default_factory=GeneratorConfig)
+
+    objects: int = 0
+    """Number of objects generated so far."""
+
+    _ids: Dict[str, List[str]] = field(default_factory=dict, repr=False)
+    _random: Optional[random.Random] = field(default=None, repr=False)
+    _kinds: Dict[str, str] = field(default_factory=dict, repr=False)
+
+    def generate(self, class_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Generate an instance of a class.
+
+        :param class_name: class to instantiate; defaults to the tree_root class
+        :return: instance, as a dict
+        """
+        if class_name is None:
+            roots = [c.name for c in self.schemaview.all_classes().values() if c.tree_root]
+            if len(roots) != 1:
+                raise ValueError("Cannot determine root class; pass class_name")
+            class_name = roots[0]
+        self._random = random.Random(self.config.seed)
+        self._ids = {}
+        self.objects = 0
+        return self._object(class_name, 0)
+
+    def _object(self, class_name: str, depth: int) -> Dict[str, Any]:
+        self.objects += 1
+        plan = render_plan_cache.get(self.schemaview, class_name)
+        obj = {}
+        for slot in plan.slots:
+            if slot.identifier or slot.key:
+                obj[slot.name] = self._identifier(class_name)
+                continue
+            if not slot.required and self._random.random() >= self.config.fill_ratio:
+                continue
+            if slot.multivalued:
+                if depth == 0:
+                    n = self.config.collection_length
+                else:
+                    n = self.config.nested_collection_length
+                values = [self._value(slot, depth) for _ in range(n)]
+                values = [v for v in values if v is not None]
+                if values:
+                    obj[slot.name] = values
+            else:
+                v = self._value(slot, depth)
+                if v is not None:
+                    obj[slot.name] = v
+        return obj
+
+    def _identifier(self, class_name: str) -> str:
+        ids = self._ids.setdefault(class_name, [])
+        identifier = f"{class_name}:{len(ids) + 1}"
+        ids.append(identifier)
+        return identifier
+
+    def _value(self, slot: SlotDefinition, depth: int) -> Any:
+        rng = slot.range
+        kind = self._kinds.get(rng)
+        if kind is None:
+            kind = self._kinds[rng] = self._kind(rng)
+        r = self._random
+        if kind == "class":
+            if slot.inlined:
+                if depth >= self.config.max_depth:
+                    return None
+                return self._object(rng, depth + 1)
+            ids = self._ids.get(rng)
+            if ids:
+                return r.choice(ids)
+            return f"{rng}:{r.randint(1, 1000)}"
+        if kind == "enum":
+            values = list(self.schemaview.get_enum(rng).permissible_values)
+            return r.choice(values) if values else None
+        if kind == "boolean":
+            return r.random() < 0.5
+        if kind == "integer":
+            return r.randint(0, 10000)
+        if kind == "float":
+            return round(r.uniform(0, 1000), 3)
+        if kind == "datetime":
+            return f"20{r.randint(10, 29)}-0{r.randint(1, 9)}-1{r.randint(0, 9)}T12:00:00"
+        if kind == "date":
+            return f"20{r.randint(10, 29)}-0{r.randint(1, 9)}-1{r.randint(0, 9)}"
+        if kind == "uri":
+            return f"http://example.org/{r.randint(1, 100000)}"
+        if kind == "curie":
+            return f"EX:{r.randint(1, 100000)}"
+        return "".join(r.choices(_LETTERS, k=self.config.string_length))
+
+    def _kind(self, rng: Optional[str]) -> str:
+        sv = self.schemaview
+        if rng in sv.all_classes():
+            return "class"
+        if rng in sv.all_enums():
+            return "enum"
+        ancestors = sv.type_ancestors(rng) if rng in sv.all_types() else []
+        for kind, bases in _TYPE_KINDS:
+            if any(base in ancestors for base in bases):
+                return kind
+        return "string"
@@ -0,0 +1,260 @@
+"""Measurement of renderer throughput and memory on synthetic instances."""
+import json
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Type, Union
+
+import yaml
+from linkml_runtime import SchemaView
+
+from linkml_renderer.benchmarks.generator import GeneratorConfig, SyntheticGenerator
+from linkml_renderer.renderers.renderer import Renderer
+from linkml_renderer.style.model import Configuration
+from linkml_renderer.style.style_engine import StyleEngine
+
+INPUT_DIR = Path("tests") / "test_renderers" / "input"
+
+
+@dataclass
+class BenchmarkCase:
+    """A schema to generate instances of, and how to style them."""
+
+    name: str
+    """Name used in reports and baselines."""
+
+    schema: Union[str, Path]
+    """Path to the LinkML schema."""
+
+    class_name: Optional[str] = None
+    """Class of the generated root object; defaults to the tree_root class."""
+
+    config: Optional[Union[str, Path]] = None
+    """Optional path to a style configuration file."""
+
+
+BUNDLED_CASES = [
+    BenchmarkCase("personinfo", INPUT_DIR / "personinfo" / "personinfo.yaml"),
+    BenchmarkCase(
+        "phenopackets",
+        INPUT_DIR / "phenopackets" / "schema" / "phenopackets.yaml",
+        config=INPUT_DIR / "conf-pfx.yaml",
+    ),
+]
+"""Cases for the schemas bundled with the tests, relative to the repository root."""
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements of one renderer on one instance."""
+
+    case: str
+    format: str
+    objects: int
+    """Number of objects in the instance."""
+
+    wall_time: float
+    """Best time to render the instance, in seconds."""
+
+    output_bytes: int
+    """Size of the rendering, UTF-8 encoded."""
+
+    peak_memory: int
+    """Peak memory allocated while rendering, in bytes, as traced by tracemalloc."""
+
+    @property
+    def key(self) -> str:
+        return f"{self.case}/{self.format}"
+
+    @property
+    def objects_per_sec(self) -> float:
+        return self.objects / self.wall_time if self.wall_time else 0.0
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.output_bytes / self.wall_time if self.wall_time else 0.0
+
+
+@dataclass
+class Comparison:
+    """A result set against its baseline."""
+
+    result: BenchmarkResult
+    baseline: Optional[BenchmarkResult]
+    time_ratio: Optional[float] = None
+    memory_ratio: Optional[float] = None
+    regressions: List[str] = field(default_factory=list)
+    """Measurements that got worse by more than the tolerance."""
+
+
+class _CountingSink:
+    """Discards text written to it, counting its UTF-8 size."""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text: str) -> int:
+        self.size += len(text.encode("utf-8"))
+        return len(text)
+
+
+def run_case(
+    case: BenchmarkCase,
+    renderers: Dict[str, Type[Renderer]],
+    config: GeneratorConfig,
+    repeat: int = 3,
+) -> List[BenchmarkResult]:
+    """
+    Generate an instance for a case and measure each renderer on it.
+
+    Output goes to a sink that only counts it, so peak memory is that of the renderer
+    itself, not of a copy of its output. Wall time is the best of ``repeat`` runs; peak
+    memory is measured in a separate run, as tracing slows rendering down.
+
+    :param case: schema and style
+    :param renderers: renderer class for each format
+    :param config: size of the generated instance
+    :param repeat: number of timed runs per renderer
+    :return: one result per format
+    """
+    sv = SchemaView(str(case.schema))
+    style_engine = StyleEngine(sv)
+    if case.config:
+        with open(case.config) as f:
+            style_engine.configuration = Configuration(**yaml.safe_load(f))
+    generator = SyntheticGenerator(sv, config)
+    instance = generator.generate(case.class_name)
+    results = []
+    for fmt, renderer_class in renderers.items():
+        renderer = renderer_class(style_engine=style_engine)
+        # the first run compiles render plans, which later runs share
+        sink = _CountingSink()
+        renderer.render_to(sink, instance, sv, case.class_name)
+        best = None
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            renderer.render_to(_CountingSink(), instance, sv, case.class_name)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        tracemalloc.start()
+        try:
+            renderer.render_to(_CountingSink(), instance, sv, case.class_name)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        results.append(BenchmarkResult(case.name, fmt, generator.objects, best, sink.size, peak))
+    return results
+
+
+def run_benchmarks(
+    cases: Iterable[BenchmarkCase],
+    renderers: Dict[str, Type[Renderer]],
+    config: GeneratorConfig,
+    repeat: int = 3,
+) -> List[BenchmarkResult]:
+    """
+    Measure every renderer on every case.
+
+    :param cases: schemas to generate instances of
+    :param renderers: renderer class for each format
+    :param config: size of the generated instances
+    :param repeat: number of timed runs per renderer
+    :return: results, by case then format
+    """
+    results = []
+    for case in cases:
+        results.extend(run_case(case, renderers, config, repeat))
+    return results
+
+
+def save_results(results: List[BenchmarkResult], path: Union[str, Path], **metadata) -> None:
+    """
+    Store results as JSON, e.g. as a new baseline.
+
+    :param results: results to store
+    :param path: file to write
+    :param metadata: stored alongside the results, e.g. the size preset used
+    """
+    data = {"metadata": metadata, "results": [asdict(r) for r in results]}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def load_results(path: Union[str, Path]) -> List[BenchmarkResult]:
+    """
+    Load results stored by :func:`save_results`.
+
+    :param path: file to read
+    :return: results
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return [BenchmarkResult(**r) for r in data["results"]]
+
+
+def compare(
+    results: List[BenchmarkResult],
+    baseline: List[BenchmarkResult],
+    time_tolerance: float = 0.25,
+    memory_tolerance: float = 0.25,
+) -> List[Comparison]:
+    """
+    Compare results with a baseline.
+
+    A measurement regresses if it is worse than the baseline by more than the tolerance,
+    e.g. a time tolerance of 0.25 allows renders to be up to 25% slower. Instances of a
+    different size than in the baseline are compared by time per object.
+
+    :param results: new results
+    :param baseline: stored results
+    :param time_tolerance: allowed relative increase in time per object
+    :param memory_tolerance: allowed relative increase in peak memory
+    :return: one comparison per result
+    """
+    by_key = {r.key: r for r in baseline}
+    comparisons = []
+    for result in results:
+        base = by_key.get(result.key)
+        comparison = Comparison(result, base)
+        if base is not None:
+            if base.objects_per_sec and result.objects_per_sec:
+                comparison.time_ratio = base.objects_per_sec / result.objects_per_sec
+                if comparison.time_ratio > 1 + time_tolerance:
+                    comparison.regressions.append("time")
+            if base.peak_memory and base.objects == result.objects:
+                comparison.memory_ratio = result.peak_memory / base.peak_memory
+                if comparison.memory_ratio > 1 + memory_tolerance:
+                    comparison.regressions.append("memory")
+        comparisons.append(comparison)
+    return comparisons
+
+
+def format_report(comparisons: List[Comparison]) -> str:
+    """
+    A plain text table of results, with ratios to the baseline where there is one.
+
+    :param comparisons: from :func:`compare`
+    :return: report
+    """
+
+    def ratio(r: Optional[float]) -> str:
+        return "-" if r is None else f"{r:.2f}x"
+
+    header = (
+        f"{'benchmark':<24} {'objects':>8} {'time (s)':>9} {'objects/s':>10} "
+        f"{'MB/s':>7} {'peak MB':>8} {'time':>6} {'memory':>6}"
+    )
+    lines = [header, "-" * len(header)]
+    for c in comparisons:
+        r = c.result
+        line = (
+            f"{r.key:<24} {r.objects:>8} {r.wall_time:>9.3f} {r.objects_per_sec:>10.0f} "
+            f"{r.bytes_per_sec / 1e6:>7.2f} {r.peak_memory / 1e6:>8.2f} "
+            f"{ratio(c.time_ratio):>6} {ratio(c.memory_ratio):>6}"
+        )
+        if c.regressions:
+            line += "  REGRESSION: " + ", ".join(c.regressions)
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,100 @@
+"""Measurement of the time the command line interface takes to start and run, from cold."""
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from linkml_renderer.benchmarks.runner import INPUT_DIR
+
+_ENTRY = "from linkml_renderer.cli import main; main()"
+"""What the linkml-render script runs."""
+
+
+@dataclass
+class StartupResult:
+    """Times of one command line, each run in a new interpreter."""
+
+    name: str
+    args: List[str]
+    best: float
+    """Shortest wall time, in seconds."""
+
+    median: float
+    """Median wall time, in seconds."""
+
+
+def time_command(args: List[str], repeat: int = 5) -> List[float]:
+    """
+    Run ``linkml-render`` with the given arguments in a new interpreter, several times.
+
+    :param args: command line arguments
+    :param repeat: number of runs
+    :return: wall time of each run, in seconds, including interpreter startup
+    """
+    times = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", _ENTRY] + args,
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_startup(
+    schema: Optional[str] = None,
+    data: Optional[str] = None,
+    formats: Optional[List[str]] = None,
+    repeat: int = 5,
+) -> List[StartupResult]:
+    """
+    Time ``--help``, and the rendering of a small instance to each format from cold.
+
+    Each rendering is also timed with a warm ``--cache-dir``, holding a snapshot of the
+    schema made by an untimed first run.
+
+    :param schema: schema to render with; defaults to the bundled personinfo schema
+    :param data: instance to render; defaults to the bundled personinfo container
+    :param formats: formats to render to; html, markdown and mermaid by default
+    :param repeat: runs per command line
+    :return: one result per command line
+    """
+    if schema is None:
+        schema = str(INPUT_DIR / "personinfo" / "personinfo.yaml")
+        data = data or str(INPUT_DIR / "personinfo" / "Container-001.yaml")
+    if data is None:
+        raise ValueError("An instance to render is required with a schema")
+    commands = [("help", ["--help"])]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ["--cache-dir", str(Path(tmp) / "cache")]
+        for fmt in formats or ["html", "markdown", "mermaid"]:
+            render = ["-s", schema, "-t", fmt, data, "-o", str(Path(tmp) / f"out-{fmt}")]
+            commands.append((fmt, render))
+            commands.append((f"{fmt} cached", render + cache))
+        results = []
+        for name, args in commands:
+            if "--cache-dir" in args:
+                time_command(args, 1)
+            times = sorted(time_command(args, repeat))
+            results.append(StartupResult(name, args, times[0], times[len(times) // 2]))
+    return results
+
+
+def format_startup_report(results: List[StartupResult]) -> str:
+    """
+    A plain text table of startup times.
+
+    :param results: from :func:`run_startup`
+    :return: report
+    """
+    header = f"{'command':<24} {'best (s)':>9} {'median (s)':>11}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(f"{r.name:<24} {r.best:>9.3f} {r.median:>11.3f}")
+    return "\n".join(lines)
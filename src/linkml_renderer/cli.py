@@ -1,31 +1,41 @@
-"""Command line interface for linkml-html."""
-import json
+"""
+Command line interface for linkml-html.
+
+Only what parsing the command line needs is imported when this module is loaded; schemas,
+renderers and everything they depend on are imported once a command runs, and renderers
+only for the formats it selects.
+"""
 import logging
 import os
 import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
 import click
-import yaml
-from linkml_runtime import SchemaView
 
 from linkml_renderer import __version__
-from linkml_renderer.renderers.markdown_renderer import MarkdownRenderer
+from linkml_renderer.registry import renderers
+
+if TYPE_CHECKING:
+    from linkml_renderer.renderers.pagination import TablePager
+    from linkml_renderer.renderers.profiling import RenderProfile
 
 __all__ = [
     "main",
 ]
 
-from linkml_renderer.renderers.html_renderer import HTMLRenderer
-from linkml_renderer.renderers.mermaid_renderer import MermaidRenderer
-from linkml_renderer.style.model import Configuration
-from linkml_renderer.style.style_engine import StyleEngine
-
 logger = logging.getLogger(__name__)
 
-FORMAT_TO_RENDERER = {
-    "html": HTMLRenderer,
-    "markdown": MarkdownRenderer,
-    "mermaid": MermaidRenderer,
+FORMAT_TO_RENDERER = renderers
+"""Renderer class of each output format, imported on first lookup."""
+
+INCREMENTAL_FORMATS = {"html", "markdown"}
+"""Formats that can be rendered with --incremental."""
+
+FORMAT_TO_SUFFIX = {
+    "html": ".html",
+    "markdown": ".md",
+    "mermaid": ".mmd",
 }
 
 aliases = {
@@ -34,6 +44,11 @@ aliases = {
 }
 
 
+def _suffix(fmt: str) -> str:
+    # renderers of other packages are written to files named after their format
+    return FORMAT_TO_SUFFIX.get(fmt, f".{fmt}")
+
+
 def _get_format(path: str, specified_format: str = None, default=None):
     if specified_format is None:
         if path is None:
@@ -53,35 +68,140 @@ def _get_format(path: str, specified_format: str = None, default=None):
     return specified_format
 
 
-@click.command()
+class _RenderCommand(click.Command):
+    """The render command, which hands ``linkml-render serve ...`` over to :func:`serve`."""
+
+    def main(self, args=None, prog_name=None, **extra):
+        if args is None:
+            args = sys.argv[1:]
+        if args and args[0] == "serve":
+            return serve.main(list(args[1:]), f"{prog_name or 'linkml-render'} serve", **extra)
+        return super().main(args, prog_name, **extra)
+
+
+@click.command(cls=_RenderCommand)
 @click.option("-v", "--verbose", count=True)
 @click.option("-q", "--quiet")
 @click.option("-s", "--schema", help="LinkML Schema file")
 @click.option("-c", "--config", help="Configuration file")
-@click.option("-o", "--output", type=click.File("w"), default=sys.stdin, help="Output file")
+@click.option(
+    "-o", "--output", type=click.File("w", encoding="utf-8"), default="-", help="Output file"
+)
+@click.option(
+    "-d",
+    "--output-directory",
+    help="Directory to write one output file per input to (required for multiple inputs)",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes used when rendering multiple inputs, the large top-level"
+    " collections of a single input, or pages of large tables",
+)
 @click.option(
     "-r", "--root", help="LinkML class that represents the instance at the root of the tree"
 )
 @click.option(
     "-f",
     "--input-format",
-    type=click.Choice(["yaml", "json"]),
-    help="Input format",
+    type=click.Choice(["yaml", "json", "jsonl"]),
+    help="Input format; jsonl reads one record per line (implies --records)",
     default="yaml",
 )
+@click.option(
+    "--records/--no-records",
+    default=False,
+    show_default=True,
+    help="Treat the input as a stream of records (multi-document YAML or JSON Lines)",
+)
 @click.option(
     "-t",
     "--output-format",
     type=click.Choice(list(FORMAT_TO_RENDERER.keys())),
-    help="Output type",
-    default="html",
+    multiple=True,
+    help="Output type; repeat to render several formats in one pass, one output file each",
+    default=["html"],
+    show_default=True,
+)
+@click.option(
+    "--incremental/--no-incremental",
+    default=False,
+    show_default=True,
+    help="Reuse the output of parts of the input unchanged since the last render to --output,"
+    " kept in a manifest next to it (html and markdown only)",
+)
+@click.option(
+    "--repeat-cache-size",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="Render small objects that occur many times in a single input once, keeping up to"
+    " this many characters of their output; 0 disables (html and markdown only)",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, writable=True),
+    envvar="LINKML_RENDERER_CACHE_DIR",
+    help="Keep a snapshot of the loaded schema and configuration in this directory, and load"
+    " it instead while none of their files change",
+)
+@click.option(
+    "--profile/--no-profile",
+    default=False,
+    show_default=True,
+    help="Print counts and timings of schema lookups, traversal and output to stderr",
+)
+@click.option(
+    "--profile-json",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write counts and timings to a JSON file (implies --profile)",
 )
 @click.version_option(__version__)
-@click.argument("input_data")
+@click.argument("input_data", nargs=-1, required=True)
 def main(
-    verbose: int, quiet: bool, schema, root, config, output_format, input_format, input_data, output
+    verbose: int,
+    quiet: bool,
+    schema,
+    root,
+    config,
+    output_format,
+    input_format,
+    input_data,
+    output,
+    output_directory,
+    jobs,
+    records,
+    incremental,
+    repeat_cache_size,
+    cache_dir,
+    profile,
+    profile_json,
 ):
-    """CLI for linkml-renderer."""
+    """CLI for linkml-renderer.
+
+    INPUT_DATA may be one or more files, glob patterns or directories. When more than
+    one file is given, each is rendered to its own file in --output-directory.
+
+    With --records (or -f jsonl), INPUT_DATA is a single file holding many records,
+    which are read one at a time. They are rendered to one document with a section
+    per record, or to one file per record in --output-directory.
+
+    When -t is given more than once, each input is traversed once and written in every
+    format. Output files for each format are named after --output with the format's
+    suffix, or after the input in --output-directory.
+
+    With --incremental, a single input is rendered to --output reusing the output of
+    everything that has not changed since the previous render; the previous output is
+    kept in OUTPUT.fragments.json.
+
+    With --cache-dir, the loaded schema and configuration are kept in a snapshot that later
+    runs load instead, until any of their files change.
+
+    Run "linkml-render serve --help" for a server that keeps schemas loaded.
+    """
     if verbose >= 2:
         logger.setLevel(level=logging.DEBUG)
     elif verbose == 1:
@@ -90,20 +210,377 @@ def main(
         logger.setLevel(level=logging.WARNING)
     if quiet:
         logger.setLevel(level=logging.ERROR)
-    input_format = _get_format(input_data, input_format)
-    renderer = FORMAT_TO_RENDERER[output_format]()
-    sv = SchemaView(schema)
-    se = StyleEngine(sv)
-    if config:
-        se.configuration = Configuration(**yaml.safe_load(open(config)))
-    renderer.style_engine = se
-    with open(input_data, "r", encoding="utf-8") as f:
-        if input_format == "yaml":
-            obj = yaml.safe_load(f)
+    output_formats = tuple(dict.fromkeys(output_format))
+    render_profile = None
+    if profile or profile_json:
+        from linkml_renderer.renderers.profiling import RenderProfile
+
+        render_profile = RenderProfile()
+    try:
+        _render(
+            output_formats,
+            schema,
+            config,
+            input_format,
+            input_data,
+            output,
+            output_directory,
+            root,
+            jobs,
+            records,
+            incremental,
+            repeat_cache_size,
+            cache_dir,
+            render_profile,
+        )
+    finally:
+        if render_profile is not None:
+            click.echo(render_profile.summary(), err=True)
+            if profile_json:
+                with open(profile_json, "w", encoding="utf-8") as f:
+                    f.write(render_profile.to_json())
+
+
+@click.command()
+@click.option("-v", "--verbose", count=True)
+@click.option(
+    "-s",
+    "--schema",
+    multiple=True,
+    required=True,
+    help="LinkML schema file, as PATH or NAME=PATH; repeat to serve several schemas",
+)
+@click.option("-c", "--config", help="Configuration file, used with every schema")
+@click.option("--host", default="127.0.0.1", show_default=True, help="Address to listen on")
+@click.option("--port", type=int, default=8080, show_default=True, help="TCP port to listen on")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help="Listen on this Unix socket instead of a TCP port",
+)
+@click.option(
+    "-j",
+    "--workers",
+    type=click.IntRange(min=1),
+    help="Number of worker processes, or threads  [default: number of CPUs]",
+)
+@click.option(
+    "--threads",
+    is_flag=True,
+    help="Render in threads sharing one copy of the schemas, rather than in processes",
+)
+@click.option(
+    "--queue-size",
+    type=click.IntRange(min=0),
+    default=64,
+    show_default=True,
+    help="Requests that may wait for a worker; more are answered with 503",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0),
+    default=60.0,
+    show_default=True,
+    help="Seconds a request may take before it is answered with 504; 0 for no limit",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, writable=True),
+    envvar="LINKML_RENDERER_CACHE_DIR",
+    help="Load schemas from snapshots kept in this directory",
+)
+def serve(
+    verbose: int,
+    schema,
+    config,
+    host,
+    port,
+    socket_path,
+    workers,
+    threads,
+    queue_size,
+    timeout,
+    cache_dir,
+):
+    """Serve renderings of instances POSTed over HTTP, with schemas kept loaded.
+
+    POST an instance, as JSON or YAML, to /render/FORMAT?schema=NAME&root=CLASS to get its
+    rendering; the schema name may be left out when serving one schema. GET /stats gives
+    request counts, latencies and throughput, and GET /health gives ok.
+    """
+    from linkml_renderer.server import RenderService, make_server, parse_schema_specs
+
+    logging.basicConfig()
+    # -v logs requests; rendering itself is only logged at warning level and above
+    logging.getLogger("linkml_renderer.server").setLevel(
+        logging.INFO if verbose else logging.WARNING
+    )
+    try:
+        schemas = parse_schema_specs(schema)
+    except ValueError as e:
+        raise click.UsageError(str(e)) from e
+    service = RenderService(
+        schemas,
+        config,
+        workers=workers or os.cpu_count() or 1,
+        queue_size=queue_size,
+        timeout=timeout or None,
+        cache_directory=cache_dir,
+        threads=threads,
+    )
+    service.start()
+    server = make_server(service, host, port, socket_path)
+    address = socket_path or "http://{}:{}".format(*server.server_address[:2])
+    click.echo(f"Serving {', '.join(schemas)} on {address}", err=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+def _render(
+    output_formats,
+    schema,
+    config,
+    input_format,
+    input_data,
+    output,
+    output_directory,
+    root,
+    jobs,
+    records,
+    incremental: bool,
+    repeat_cache_size: int,
+    cache_dir: Optional[str],
+    profile: Optional["RenderProfile"],
+):
+    from linkml_renderer.batch import load_instance, load_renderer, load_renderers, plan_batch
+
+    renderer_classes = {fmt: FORMAT_TO_RENDERER[fmt] for fmt in output_formats}
+    if incremental:
+        if records or input_format == "jsonl":
+            raise click.UsageError("--incremental cannot be used with --records")
+        _render_incremental(
+            renderer_classes,
+            schema,
+            config,
+            input_format,
+            input_data,
+            output,
+            root,
+            repeat_cache_size,
+            cache_dir,
+            profile,
+        )
+        return
+    if records or input_format == "jsonl":
+        _render_records(
+            output_formats,
+            schema,
+            config,
+            input_format,
+            input_data,
+            output,
+            output_directory,
+            root,
+            jobs,
+            cache_dir,
+            profile,
+        )
+        return
+    if output_directory is None and len(input_data) == 1 and os.path.isfile(input_data[0]):
+        input_format = _get_format(input_data[0], input_format)
+        if len(output_formats) > 1:
+            paths = _output_paths(output, output_formats)
+            renderer, sv = load_renderers(renderer_classes, schema, config, profile, cache_dir)
+            obj = load_instance(input_data[0], input_format)
+            renderer.render_to_files(paths, obj, sv, source_element_name=root, jobs=jobs)
+            return
+        renderer, sv = load_renderer(
+            renderer_classes[output_formats[0]], schema, config, profile, cache_dir
+        )
+        _set_repeat_cache(renderer, repeat_cache_size)
+        if jobs > 1:
+            from linkml_renderer.renderers.parallel import ParallelRender
+
+            renderer.parallel = ParallelRender(jobs=jobs)
+        obj = load_instance(input_data[0], input_format)
+        renderer.render_to(output, obj, sv, source_element_name=root, pager=_pager(output, jobs))
+        _report_repeat_cache(renderer, profile)
+        return
+    if output_directory is None:
+        raise click.UsageError("--output-directory is required when rendering multiple inputs")
+    try:
+        items = plan_batch(input_data, output_directory, _suffixes(output_formats))
+    except (FileNotFoundError, ValueError) as e:
+        raise click.UsageError(str(e)) from e
+    from linkml_renderer.batch import render_batch
+
+    failures = 0
+    for result in render_batch(
+        items,
+        renderer_classes,
+        schema,
+        config,
+        input_format,
+        root=root,
+        jobs=jobs,
+        profile=profile,
+        cache_directory=cache_dir,
+    ):
+        if result.ok:
+            outputs = ", ".join(str(p) for p in result.output_paths.values())
+            logger.info(f"Rendered {result.input_path} to {outputs}")
+        else:
+            failures += 1
+            click.echo(f"Failed to render {result.input_path}: {result.error}", err=True)
+    click.echo(f"Rendered {len(items) - failures} of {len(items)} inputs", err=True)
+    if failures:
+        sys.exit(1)
+
+
+def _render_incremental(
+    renderer_classes,
+    schema,
+    config,
+    input_format,
+    input_data,
+    output,
+    root,
+    repeat_cache_size,
+    cache_dir,
+    profile,
+):
+    if len(input_data) != 1 or not os.path.isfile(input_data[0]):
+        raise click.UsageError("--incremental renders exactly one input file")
+    if len(renderer_classes) != 1 or set(renderer_classes) - INCREMENTAL_FORMATS:
+        raise click.UsageError("--incremental renders to a single html or markdown output")
+    name = getattr(output, "name", None)
+    if not isinstance(name, str) or name == "-" or name.startswith("<"):
+        raise click.UsageError("--incremental requires --output to be a file")
+    from linkml_renderer.batch import load_instance, load_renderer
+    from linkml_renderer.renderers.fragments import FragmentCache, manifest_path
+
+    input_format = _get_format(input_data[0], input_format)
+    renderer, sv = load_renderer(
+        next(iter(renderer_classes.values())), schema, config, profile, cache_dir
+    )
+    manifest = manifest_path(name)
+    renderer.fragments = FragmentCache.load(manifest)
+    _set_repeat_cache(renderer, repeat_cache_size)
+    obj = load_instance(input_data[0], input_format)
+    renderer.render_to(output, obj, sv, source_element_name=root, pager=_pager(output, 1))
+    renderer.fragments.save(manifest)
+    _report_repeat_cache(renderer, profile)
+    logger.info(
+        f"Rendered {renderer.fragments.rendered} objects,"
+        f" reused {renderer.fragments.spliced} from {manifest}"
+    )
+
+
+def _set_repeat_cache(renderer, size: int) -> None:
+    if size:
+        from linkml_renderer.renderers.fragments import RepeatCache
+
+        renderer.repeat_cache = RepeatCache(max_size=size)
+
+
+def _report_repeat_cache(renderer, profile: Optional["RenderProfile"]) -> None:
+    cache = renderer.repeat_cache
+    if cache is None:
+        return
+    stats = cache.stats()
+    logger.info(
+        f"Repeated objects: {stats['hits']} reused, {stats['misses']} rendered,"
+        f" {stats['evictions']} evicted"
+    )
+    if profile is not None:
+        for name, n in stats.items():
+            profile.count(f"repeats.{name}", n)
+
+
+def _pager(output, jobs: int) -> Optional["TablePager"]:
+    # pages of large tables are written next to the output file; on stdout they stay inline
+    name = getattr(output, "name", None)
+    if not isinstance(name, str) or name == "-" or name.startswith("<"):
+        return None
+    from linkml_renderer.renderers.pagination import pager_for
+
+    return pager_for(name, jobs=jobs)
+
+
+def _suffixes(output_formats: Tuple[str, ...]) -> Dict[str, str]:
+    return {fmt: _suffix(fmt) for fmt in output_formats}
+
+
+def _output_paths(output, output_formats: Tuple[str, ...]) -> Dict[str, Path]:
+    # one file per format, named after --output with each format's suffix
+    name = getattr(output, "name", None)
+    if not isinstance(name, str) or name == "-" or name.startswith("<"):
+        raise click.UsageError("--output must be a file when rendering several output formats")
+    return {
+        fmt: Path(name).with_suffix(suffix) for fmt, suffix in _suffixes(output_formats).items()
+    }
+
+
+def _render_records(
+    output_formats,
+    schema,
+    config,
+    input_format,
+    input_data,
+    output,
+    output_directory,
+    root,
+    jobs,
+    cache_dir: Optional[str] = None,
+    profile: Optional["RenderProfile"] = None,
+):
+    from linkml_renderer.batch import iter_records, load_renderer, load_renderers, render_records
+
+    if len(input_data) != 1 or not os.path.isfile(input_data[0]):
+        raise click.UsageError("Records are read from exactly one input file")
+    if input_format == "json":
+        raise click.UsageError("Use -f jsonl or -f yaml to read records")
+    path = input_data[0]
+    if output_directory is None:
+        if len(output_formats) > 1:
+            raise click.UsageError(
+                "--output-directory is required when rendering records to several output formats"
+            )
+        renderer, sv = load_renderer(
+            FORMAT_TO_RENDERER[output_formats[0]], schema, config, profile, cache_dir
+        )
+        renderer.render_many_to(
+            output,
+            iter_records(path, input_format),
+            sv,
+            source_element_name=root,
+            pager=_pager(output, jobs),
+        )
+        return
+    renderer, sv = load_renderers(
+        {fmt: FORMAT_TO_RENDERER[fmt] for fmt in output_formats}, schema, config, profile, cache_dir
+    )
+    total = failures = 0
+    suffixes = _suffixes(output_formats)
+    for result in render_records(
+        renderer, sv, path, input_format, output_directory, suffixes, root
+    ):
+        total += 1
+        if result.ok:
+            outputs = ", ".join(str(p) for p in result.output_paths.values())
+            logger.info(f"Rendered {result.input_path} to {outputs}")
         else:
-            obj = json.load(f)
-        out = renderer.render(obj, sv, source_element_name=root)
-        output.write(out)
+            failures += 1
+            click.echo(f"Failed to render {result.input_path}: {result.error}", err=True)
+    click.echo(f"Rendered {total - failures} of {total} records", err=True)
+    if failures:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
-from copy import copy, deepcopy
+from copy import copy
 from dataclasses import dataclass, field
-from typing import Any, List, Optional, Union
+from typing import Any, FrozenSet, Iterator, List, Optional, Union
 
 from linkml_runtime import SchemaView
 from linkml_runtime.linkml_model import (
@@ -11,52 +11,176 @@ from linkml_runtime.linkml_model import (
     TypeDefinition,
 )
 
+_NO_MEMBERS: FrozenSet = frozenset()
+
 
-@dataclass
 class PathComponent:
     """
     A path element.
+
+    Components are immutable once created, so they can be shared between paths.
     """
 
+    __slots__ = ("element_type", "slot", "index")
+
     element_type: ElementName
     """The type which the path component instantiates"""
 
-    slot: Optional[SlotDefinition] = None
+    slot: Optional[SlotDefinition]
     """The slot that points to the path component"""
 
-    index: Optional[Union[int, str]] = None
+    index: Optional[Union[int, str]]
     """For multivalued slots, the index of the value"""
 
+    def __init__(
+        self,
+        element_type: ElementName,
+        slot: Optional[SlotDefinition] = None,
+        index: Optional[Union[int, str]] = None,
+    ):
+        self.element_type = element_type
+        self.slot = slot
+        self.index = index
+
     @property
     def root(self) -> bool:
         """True if this is the root of the path"""
         return self.slot is None
 
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, PathComponent):
+            return NotImplemented
+        return (
+            self.element_type == other.element_type
+            and self.slot is other.slot
+            and self.index == other.index
+        )
+
     def __repr__(self) -> str:
         sn = self.slot.name if self.slot else "."
-        ix = f"[{self.index}]" if self.index else ""
+        ix = f"[{self.index}]" if self.index is not None else ""
         et = self.element_type
         if self.slot and not self.slot.inlined:
             et = f"*{et}"
         return f"{sn}{ix}<<{et}>>"
 
 
-@dataclass
 class ObjectPath:
     """
     A path between the tree root of an object and a particular element.
+
+    Paths are persistent: each path holds its last component and a pointer to the
+    path it extends, so appending is O(1) and shares all preceding components.
     """
 
-    components: List[PathComponent] = field(default_factory=list)
+    __slots__ = ("head", "parent", "depth")
+
+    def __init__(self, head: PathComponent, parent: Optional["ObjectPath"] = None):
+        self.head = head
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 1
 
-    def append(self, component: PathComponent):
+    @property
+    def components(self) -> List[PathComponent]:
         """
-        Append a path component to the path.
+        All components, from the root to the head.
+
+        :return: list of components (a new list each call)
+        """
+        components = []
+        path = self
+        while path is not None:
+            components.append(path.head)
+            path = path.parent
+        components.reverse()
+        return components
+
+    def append(self, component: PathComponent) -> "ObjectPath":
+        """
+        Extend the path by one component.
 
         :param component:
-        :return:
+        :return: new path; this path is unchanged
+        """
+        return ObjectPath(component, self)
+
+    def replace_head(self, component: PathComponent) -> "ObjectPath":
+        """
+        Replace the last component of the path.
+
+        :param component:
+        :return: new path; this path is unchanged
         """
-        self.components.append(component)
+        return ObjectPath(component, self.parent)
+
+    def __len__(self) -> int:
+        return self.depth
+
+    def __repr__(self) -> str:
+        return f"ObjectPath({self.components})"
+
+
+class TargetPath:
+    """
+    A path of elements in the rendered output, e.g. ``["body", "table"]``.
+
+    Like :class:`ObjectPath` this is persistent and parent-linked. Membership tests
+    for hashable elements are constant time, so checks such as ``"table" in path``
+    do not walk the path.
+    """
+
+    __slots__ = ("head", "parent", "depth", "_members")
+
+    def __init__(self, head: Any = None, parent: Optional["TargetPath"] = None):
+        self.head = head
+        self.parent = parent
+        if parent is None:
+            self.depth = 0
+            self._members = _NO_MEMBERS
+        else:
+            self.depth = parent.depth + 1
+            members = parent._members
+            try:
+                if head not in members:
+                    members = members | {head}
+            except TypeError:
+                # unhashable elements are not indexed
+                pass
+            self._members = members
+
+    def append(self, element: Any) -> "TargetPath":
+        """
+        Extend the path by one element.
+
+        :param element:
+        :return: new path; this path is unchanged
+        """
+        return TargetPath(element, self)
+
+    def __contains__(self, element: Any) -> bool:
+        try:
+            return element in self._members
+        except TypeError:
+            return any(x == element for x in self)
+
+    def __iter__(self) -> Iterator[Any]:
+        elements = []
+        path = self
+        while path.depth:
+            elements.append(path.head)
+            path = path.parent
+        return reversed(elements)
+
+    def __len__(self) -> int:
+        return self.depth
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (TargetPath, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
 
 
 @dataclass
@@ -67,7 +191,7 @@ class Context:
 
     schemaview: SchemaView = None
     source_path: ObjectPath = None
-    target_path: List = field(default_factory=list)
+    target_path: TargetPath = field(default_factory=TargetPath)
 
     def set_root(self, root: Union[str, ElementName]) -> None:
         """
@@ -76,8 +200,7 @@ class Context:
         :param root:
         :return:
         """
-        self.source_path = ObjectPath()
-        self.source_path.append(PathComponent(root))
+        self.source_path = ObjectPath(PathComponent(root))
 
     @property
     def target_depth(self) -> int:
@@ -86,7 +209,7 @@ class Context:
 
         :return:
         """
-        return len(self.target_path)
+        return self.target_path.depth
 
     @property
     def current(self) -> Optional[PathComponent]:
@@ -95,9 +218,9 @@ class Context:
 
         :return:
         """
-        if not self.source_path or not self.source_path.components:
+        if self.source_path is None:
             return None
-        return self.source_path.components[-1]
+        return self.source_path.head
 
     @property
     def in_collection(self) -> bool:
@@ -111,12 +234,18 @@ class Context:
             return False
         return head.slot.multivalued and head.index is None
 
+    @property
+    def in_table(self) -> bool:
+        """
+        True if the current element is rendered inside a table.
+
+        :return:
+        """
+        return "table" in self.target_path
+
     def _copy(self) -> "Context":
-        # shallow copy, but with a new source_path
-        c = copy(self)
-        c.source_path = deepcopy(self.source_path)
-        c.target_path = deepcopy(self.target_path)
-        return c
+        # paths are persistent, so a shallow copy is sufficient
+        return copy(self)
 
     def extend(
         self, slot: Optional[SlotDefinition] = None, target_element: Any = None
@@ -124,18 +253,19 @@ class Context:
         new_context = self._copy()
         if slot:
             component = PathComponent(slot=slot, element_type=slot.range)
-            # range_element = slot.range
-            # new_context.element_name = range_element
-            new_context.source_path.append(component)
+            new_context.source_path = self.source_path.append(component)
         if target_element:
-            new_context.target_path.append(target_element)
+            new_context.target_path = self.target_path.append(target_element)
         return new_context
 
     def index_extend(self, index: Any, target_element: Any = None) -> "Context":
         new_context = self._copy()
-        new_context.current.index = index
+        current = self.current
+        new_context.source_path = self.source_path.replace_head(
+            PathComponent(current.element_type, current.slot, index)
+        )
         if target_element:
-            new_context.target_path.append(target_element)
+            new_context.target_path = self.target_path.append(target_element)
         return new_context
 
     @property
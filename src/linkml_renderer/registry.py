@@ -0,0 +1,111 @@
+"""
+Renderers by output format name, imported only when a format is used.
+
+The renderers of this package are always registered. Other packages can add formats by
+declaring an entry point in the ``linkml_renderer.renderers`` group, named after the
+format and pointing at a :class:`Renderer` subclass, e.g. in ``pyproject.toml``:
+
+.. code-block:: toml
+
+    [project.entry-points."linkml_renderer.renderers"]
+    rst = "my_package.rst_renderer:RSTRenderer"
+"""
+import logging
+from importlib import import_module, metadata
+from typing import TYPE_CHECKING, Dict, Iterator, Mapping, Optional, Type, Union
+
+if TYPE_CHECKING:
+    from linkml_renderer.renderers.renderer import Renderer
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "linkml_renderer.renderers"
+"""Entry point group that renderers of other packages are registered in."""
+
+BUILTIN_RENDERERS = {
+    "html": "linkml_renderer.renderers.html_renderer:HTMLRenderer",
+    "markdown": "linkml_renderer.renderers.markdown_renderer:MarkdownRenderer",
+    "mermaid": "linkml_renderer.renderers.mermaid_renderer:MermaidRenderer",
+}
+"""Renderers of this package, as ``module:class``."""
+
+
+def _entry_points(group: str) -> Iterator["metadata.EntryPoint"]:
+    eps = metadata.entry_points()
+    if hasattr(eps, "select"):
+        return iter(eps.select(group=group))
+    # before python 3.10, entry points come as a dict of groups
+    return iter(eps.get(group, []))
+
+
+class RendererRegistry(Mapping[str, Type["Renderer"]]):
+    """
+    A mapping of format names to renderer classes, which imports a renderer's module the
+    first time its class is looked up.
+
+    Names are known without importing anything: listing the formats, e.g. for ``--help``,
+    costs a scan of the installed entry points only.
+
+    >>> registry = RendererRegistry()
+    >>> list(registry)
+    ['html', 'markdown', 'mermaid']
+    >>> registry["mermaid"]
+    <class 'linkml_renderer.renderers.mermaid_renderer.MermaidRenderer'>
+    """
+
+    def __init__(self, group: Optional[str] = ENTRY_POINT_GROUP):
+        """
+        :param group: entry point group to discover renderers in; None for built-ins only
+        """
+        self.group = group
+        self._targets: Optional[Dict[str, Union[str, "metadata.EntryPoint"]]] = None
+        self._classes: Dict[str, Type["Renderer"]] = {}
+
+    def register(self, name: str, target: Union[str, Type["Renderer"]]) -> None:
+        """
+        Register a renderer under a format name, replacing any registered before.
+
+        :param name: format name, e.g. ``html``
+        :param target: renderer class, or where to import it from as ``module:class``
+        """
+        targets = self._discover()
+        self._classes.pop(name, None)
+        if isinstance(target, str):
+            targets[name] = target
+        else:
+            targets[name] = f"{target.__module__}:{target.__qualname__}"
+            self._classes[name] = target
+
+    def _discover(self) -> Dict[str, Union[str, "metadata.EntryPoint"]]:
+        if self._targets is None:
+            targets: Dict[str, Union[str, metadata.EntryPoint]] = dict(BUILTIN_RENDERERS)
+            if self.group:
+                for ep in _entry_points(self.group):
+                    # renderers of this package cannot be replaced by an installed package
+                    if ep.name not in targets:
+                        targets[ep.name] = ep
+            self._targets = targets
+        return self._targets
+
+    def __getitem__(self, name: str) -> Type["Renderer"]:
+        cls = self._classes.get(name)
+        if cls is None:
+            target = self._discover()[name]
+            if isinstance(target, str):
+                module, _, attr = target.partition(":")
+                cls = getattr(import_module(module), attr)
+            else:
+                cls = target.load()
+            logger.debug(f"Loaded renderer {name}: {cls}")
+            self._classes[name] = cls
+        return cls
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._discover())
+
+    def __len__(self) -> int:
+        return len(self._discover())
+
+
+renderers = RendererRegistry()
+"""Process-wide registry of the renderers of installed packages."""
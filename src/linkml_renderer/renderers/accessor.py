@@ -0,0 +1,92 @@
+"""
+Read access to the slots of LinkML instances, without copying them.
+
+Instances may be dicts, YAMLRoot dataclasses or pydantic models (v1 or v2). Converting a
+pydantic model with ``dict()`` copies its whole subtree, which done at every level of a
+tree makes rendering quadratic in its depth; the accessors here read each value in place.
+"""
+from collections import ChainMap
+from typing import Any, Callable, Iterable, Tuple, Union
+
+from linkml_runtime.utils.yamlutils import YAMLRoot
+from pydantic import BaseModel
+
+try:
+    from pydantic.v1 import BaseModel as BaseModelV1
+except ImportError:
+    # pydantic 1 itself
+    BaseModelV1 = BaseModel
+
+MODEL_TYPES = (BaseModel, BaseModelV1)
+"""Pydantic model classes, including v1 models used under pydantic 2."""
+
+OBJECT = Union[YAMLRoot, BaseModel, dict]
+
+_OBJECT_TYPES = (YAMLRoot, dict) + MODEL_TYPES
+
+GETTER = Callable[[str], Any]
+
+
+def is_object(obj: Any) -> bool:
+    """
+    True if an instance has slots that can be read with :func:`slot_getter`.
+
+    :param obj: any value
+    :return:
+    """
+    return isinstance(obj, _OBJECT_TYPES)
+
+
+def slot_getter(obj: OBJECT) -> GETTER:
+    """
+    A function that reads slot values of an instance, for looking up many slots of it.
+
+    Values are returned as stored, so nested objects keep their own type; a slot with no
+    value gives None.
+
+    :param obj: a dict, YAMLRoot or pydantic model
+    :return: function from slot name to value
+    """
+    if isinstance(obj, dict):
+        return obj.get
+    if isinstance(obj, YAMLRoot):
+        return obj.__dict__.get
+    if isinstance(obj, MODEL_TYPES):
+        # both pydantic v1 and v2 keep field values in __dict__; v2 keeps extra fields apart
+        extra = getattr(obj, "__pydantic_extra__", None)
+        if extra:
+            return ChainMap(obj.__dict__, extra).get
+        return obj.__dict__.get
+    raise ValueError(f"Cannot read slots of {obj}")
+
+
+def slot_value(obj: OBJECT, name: str) -> Any:
+    """
+    Read a single slot value of an instance.
+
+    :param obj: a dict, YAMLRoot or pydantic model
+    :param name: slot name
+    :return: value, or None if the slot has no value
+    """
+    return slot_getter(obj)(name)
+
+
+def slot_items(obj: OBJECT) -> Iterable[Tuple[str, Any]]:
+    """
+    The slot names and values stored on an instance, in place.
+
+    Slots with no value may be left out, or given as None.
+
+    :param obj: a dict, YAMLRoot or pydantic model
+    :return: (slot name, value) pairs
+    """
+    if isinstance(obj, dict):
+        return obj.items()
+    if isinstance(obj, YAMLRoot):
+        return obj.__dict__.items()
+    if isinstance(obj, MODEL_TYPES):
+        extra = getattr(obj, "__pydantic_extra__", None)
+        if extra:
+            return ChainMap(extra, obj.__dict__).items()
+        return obj.__dict__.items()
+    raise ValueError(f"Cannot read slots of {obj}")
@@ -0,0 +1,77 @@
+"""Pre-scan of the members of a collection, to lay them out as the rows of a table."""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Set
+
+from linkml_runtime.linkml_model import SlotDefinition
+
+from linkml_renderer.renderers.accessor import is_object, slot_items
+
+_SCALARS = frozenset([str, int, float, bool])
+
+
+@dataclass
+class ColumnStats:
+    """What a table pre-scan found out about one column."""
+
+    slot: SlotDefinition
+    """Slot shown in the column."""
+
+    index: int = 0
+    """Position of the column in the table, counting from 0."""
+
+    populated: int = 0
+    """Number of rows with a non-empty value."""
+
+    max_width: int = 0
+    """Length of the longest scalar value, as a string."""
+
+    types: Set[str] = field(default_factory=set)
+    """Names of the Python types of the non-empty values, e.g. ``{"str", "dict"}``."""
+
+
+def scan_columns(members: Iterable[Any], slots: List[SlotDefinition]) -> List[ColumnStats]:
+    """
+    Find the populated columns of a table in a single pass over its rows.
+
+    Each row is read once, and only the slots it has values for are looked at, so
+    wide but sparse tables cost in proportion to the number of filled cells rather than
+    rows times slots. Members that are not objects contribute nothing.
+
+    :param members: rows of the table
+    :param slots: candidate columns, in display order
+    :return: statistics of the columns populated in at least one row, in display order
+    """
+    by_name = {slot.name: slot for slot in slots}
+    found: Dict[str, ColumnStats] = {}
+    types: Dict[str, Set[type]] = {}
+    for member in members:
+        if not is_object(member):
+            continue
+        for name, v in slot_items(member):
+            if v is None:
+                continue
+            if not v and isinstance(v, (list, dict)):
+                continue
+            stats = found.get(name)
+            if stats is None:
+                slot = by_name.get(name)
+                if slot is None:
+                    continue
+                stats = found[name] = ColumnStats(slot)
+                types[name] = set()
+            stats.populated += 1
+            t = type(v)
+            types[name].add(t)
+            if t is str:
+                width = len(v)
+            elif t in _SCALARS:
+                width = len(str(v))
+            else:
+                continue
+            if width > stats.max_width:
+                stats.max_width = width
+    columns = [found[slot.name] for slot in slots if slot.name in found]
+    for i, stats in enumerate(columns):
+        stats.index = i
+        stats.types = {t.__name__ for t in types[stats.slot.name]}
+    return columns
@@ -0,0 +1,294 @@
+"""
+Render event streams: a traversal recorded as flat, typed events.
+
+An :class:`EventRecorder` is a :class:`TraversalBackend` that turns each call it receives
+into an event, a plain tuple whose first member is an :class:`EventType`. The events of a
+traversal can be kept in memory or written to disk with :func:`dump_events`, and later
+replayed into any backend with :func:`replay`, which gives the backend the same calls it
+would have received from the :class:`TraversalEngine`. Schema lookups and the walk over the
+instance are then paid once, however many times and in however many formats the events
+are rendered.
+
+Events hold names, not schema objects, so they can be serialized: slots are recorded as
+the name of their class and slot, and resolved again against the schema on replay.
+The items of a collection with columns are the rows of a table.
+"""
+import json
+from enum import IntEnum
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from linkml_runtime import SchemaView
+from linkml_runtime.linkml_model import SlotDefinition
+
+from linkml_renderer.renderers.render_plan import render_plan_cache
+from linkml_renderer.renderers.traversal import Descend, TraversalBackend, TraversalEngine
+from linkml_renderer.style.style_engine import StyleEngine
+
+EVENT = Tuple[Any, ...]
+
+
+class EventType(IntEnum):
+    """Type of a render event, the first member of its tuple."""
+
+    START_DOCUMENT = 1
+    """(type, class_name, title_slot, title)"""
+
+    END_DOCUMENT = 2
+    """(type,)"""
+
+    START_OBJECT = 3
+    """(type, class_name, identifier, title, description)"""
+
+    END_OBJECT = 4
+    """(type,)"""
+
+    START_SLOT = 5
+    """(type, class_name, slot_name, slot_uri, empty)"""
+
+    END_SLOT = 6
+    """(type,)"""
+
+    START_COLLECTION = 7
+    """(type, size, keys, column_class, column_names); no column class outside tables"""
+
+    END_COLLECTION = 8
+    """(type, remaining)"""
+
+    START_ITEM = 9
+    """(type, key)"""
+
+    END_ITEM = 10
+    """(type,)"""
+
+    ATOM = 11
+    """(type, value, url)"""
+
+    REFERENCE = 12
+    """(type, value)"""
+
+
+_STARTS = frozenset(
+    [EventType.START_OBJECT, EventType.START_SLOT, EventType.START_COLLECTION, EventType.START_ITEM]
+)
+_ENDS = frozenset(
+    [EventType.END_OBJECT, EventType.END_SLOT, EventType.END_COLLECTION, EventType.END_ITEM]
+)
+
+# events without arguments are shared, not allocated per call
+_END_DOCUMENT = (EventType.END_DOCUMENT,)
+_END_OBJECT = (EventType.END_OBJECT,)
+_END_SLOT = (EventType.END_SLOT,)
+_END_ITEM = (EventType.END_ITEM,)
+
+
+class EventRecorder(TraversalBackend):
+    """
+    Records a traversal as a list of events.
+
+    The recorder visits everything, so the events describe the whole instance and can be
+    replayed into backends that each skip different parts of it.
+
+    >>> recorder = EventRecorder()
+    >>> TraversalEngine(sv).walk(instance, recorder)
+    >>> markdown = MarkdownRenderer().replay(recorder.events, sv)
+    """
+
+    def __init__(self, events: Optional[List[EVENT]] = None):
+        self.events = [] if events is None else events
+        self._append = self.events.append
+        self._classes: List[str] = []
+        self._ranges: List[Optional[str]] = []
+
+    def start_document(self, class_name, title_slot, title) -> None:
+        self._append((EventType.START_DOCUMENT, class_name, title_slot, title))
+
+    def end_document(self) -> None:
+        self._append(_END_DOCUMENT)
+
+    def start_object(self, class_name, identifier, title, description) -> Descend:
+        self._classes.append(class_name)
+        self._append((EventType.START_OBJECT, class_name, identifier, title, description))
+        return Descend.VISIT
+
+    def end_object(self) -> None:
+        self._classes.pop()
+        self._append(_END_OBJECT)
+
+    def start_slot(self, slot, slot_uri, empty) -> Descend:
+        self._ranges.append(slot.range)
+        self._append((EventType.START_SLOT, self._classes[-1], slot.name, slot_uri, empty))
+        return Descend.VISIT
+
+    def end_slot(self) -> None:
+        self._ranges.pop()
+        self._append(_END_SLOT)
+
+    def start_collection(
+        self, size, keys, columns, collection=None, context=None, stats=None
+    ) -> Descend:
+        column_class = column_names = None
+        if columns is not None:
+            if context is not None:
+                column_class = context.current.element_type
+            else:
+                column_class = self._ranges[-1]
+            column_names = [slot.name for slot in columns]
+        self._append((EventType.START_COLLECTION, size, keys, column_class, column_names))
+        return Descend.VISIT
+
+    def end_collection(self, remaining) -> None:
+        self._append((EventType.END_COLLECTION, remaining))
+
+    def start_item(self, key) -> Descend:
+        self._append((EventType.START_ITEM, key))
+        return Descend.VISIT
+
+    def end_item(self) -> None:
+        self._append(_END_ITEM)
+
+    def atom(self, value, url) -> None:
+        self._append((EventType.ATOM, value, url))
+
+    def reference(self, value) -> None:
+        self._append((EventType.REFERENCE, value))
+
+
+def record(
+    element: Any,
+    schemaview: SchemaView,
+    source_element_name: Optional[str] = None,
+    style_engine: Optional[StyleEngine] = None,
+) -> List[EVENT]:
+    """
+    Traverse an instance and record the events.
+
+    :param element: LinkML instance
+    :param schemaview: SchemaView which the element conforms to
+    :param source_element_name: root class, inferred from tree_root if not present
+    :param style_engine: style used to find title and description slots
+    :return: events, in traversal order
+    """
+    recorder = EventRecorder()
+    TraversalEngine(schemaview, style_engine).walk(element, recorder, source_element_name)
+    return recorder.events
+
+
+def dump_events(events: Iterable[EVENT], stream: IO[str]) -> None:
+    """
+    Write events to a stream as JSON Lines, one event per line.
+
+    Values that JSON cannot represent, such as dates, are written as strings.
+
+    :param events: events to write
+    :param stream: text stream to write to
+    """
+    for event in events:
+        stream.write(json.dumps(event, default=str))
+        stream.write("\n")
+
+
+def load_events(stream: IO[str]) -> Iterator[EVENT]:
+    """
+    Lazily read events written by :func:`dump_events`.
+
+    :param stream: text stream to read from
+    :return: iterator over events
+    """
+    for line in stream:
+        if line.strip():
+            event = json.loads(line)
+            event[0] = EventType(event[0])
+            yield tuple(event)
+
+
+def replay(events: Iterable[EVENT], backend: TraversalBackend, schemaview: SchemaView) -> None:
+    """
+    Feed recorded events to a backend.
+
+    The backend receives the calls it would have received from the traversal that was
+    recorded, except that live collections and contexts are not available. A backend that
+    skips a node or stops a collection has the events inside it passed over.
+
+    :param events: events from an :class:`EventRecorder` or :func:`load_events`
+    :param backend: receives the events
+    :param schemaview: schema the events were recorded against, used to resolve slots
+    """
+    slots: Dict[str, Dict[str, SlotDefinition]] = {}
+
+    def slot_of(class_name: str, slot_name: str) -> SlotDefinition:
+        try:
+            return slots[class_name][slot_name]
+        except KeyError:
+            plan = render_plan_cache.get(schemaview, class_name)
+            slots[class_name] = {s.name: s for s in plan.slots}
+            return slots[class_name][slot_name]
+
+    events = iter(events)
+    for event in events:
+        kind = event[0]
+        if kind == EventType.ATOM:
+            backend.atom(event[1], event[2])
+        elif kind == EventType.START_SLOT:
+            if not backend.start_slot(slot_of(event[1], event[2]), event[3], event[4]):
+                _skip(events)
+        elif kind == EventType.END_SLOT:
+            backend.end_slot()
+        elif kind == EventType.START_ITEM:
+            descend = backend.start_item(event[1])
+            if descend == Descend.STOP:
+                _skip(events)
+                backend.end_collection(1 + _skip_items(events))
+            elif not descend:
+                _skip(events)
+        elif kind == EventType.END_ITEM:
+            backend.end_item()
+        elif kind == EventType.START_OBJECT:
+            if not backend.start_object(event[1], event[2], event[3], event[4]):
+                _skip(events)
+        elif kind == EventType.END_OBJECT:
+            backend.end_object()
+        elif kind == EventType.START_COLLECTION:
+            columns = None
+            if event[3] is not None:
+                columns = [slot_of(event[3], name) for name in event[4]]
+            if not backend.start_collection(event[1], event[2], columns):
+                _skip(events)
+        elif kind == EventType.END_COLLECTION:
+            backend.end_collection(event[1])
+        elif kind == EventType.REFERENCE:
+            backend.reference(event[1])
+        elif kind == EventType.START_DOCUMENT:
+            backend.start_document(event[1], event[2], event[3])
+        elif kind == EventType.END_DOCUMENT:
+            backend.end_document()
+        else:
+            raise ValueError(f"Unknown event type: {kind}")
+
+
+def _skip(events: Iterator[EVENT]) -> EVENT:
+    # pass over the contents of a node whose start event has been read, and its end event
+    depth = 1
+    for event in events:
+        kind = event[0]
+        if kind in _STARTS:
+            depth += 1
+        elif kind in _ENDS:
+            depth -= 1
+            if depth == 0:
+                return event
+    raise ValueError("Event stream ended inside a node")
+
+
+def _skip_items(events: Iterator[EVENT]) -> int:
+    # pass over the remaining items of a collection and its end event, counting the items
+    count = 0
+    for event in events:
+        kind = event[0]
+        if kind == EventType.START_ITEM:
+            count += 1
+            _skip(events)
+        elif kind == EventType.END_COLLECTION:
+            return count + event[1]
+        else:
+            raise ValueError(f"Unexpected event in collection: {kind}")
+    raise ValueError("Event stream ended inside a collection")
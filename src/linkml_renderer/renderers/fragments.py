@@ -0,0 +1,540 @@
+"""
+Incremental re-rendering, by splicing in the output of unchanged subtrees.
+
+While rendering with a :class:`FragmentCache`, the output of every object is captured as a
+fragment and stored under the object's path in the instance, together with a key: a
+Merkle hash of the object's subtree, combined with the state of the backend when the
+object started (its nesting, the columns of the table it is a row of, and so on). When
+the cache is used again, an object whose path and key are unchanged is not traversed;
+its previous output is written in its place. Only changed objects, and the objects they
+are nested in, are rendered again.
+
+Fragments are kept in memory between renders, or saved to a sidecar manifest next to
+the output. A manifest is only used with the schema, style configuration and version of
+this package it was made with.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from operator import itemgetter
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Set, Tuple, Union
+
+from linkml_runtime import SchemaView
+
+from linkml_renderer.renderers.accessor import is_object, slot_items
+from linkml_renderer.schema_cache import schema_files
+from linkml_renderer.style.style_engine import StyleEngine
+
+MANIFEST_VERSION = 1
+"""Version of the manifest format; manifests of other versions are ignored."""
+
+MANIFEST_SUFFIX = ".fragments.json"
+"""Appended to the name of an output file to name its manifest."""
+
+DEFAULT_REPEAT_CACHE_SIZE = 4 * 1024 * 1024
+"""Default limit on the total length of the fragments held by a :class:`RepeatCache`."""
+
+DEFAULT_REPEAT_MAX_VALUES = 64
+"""Default limit on the number of values in an object whose output is cached."""
+
+_MAX_SEEN = 1 << 16
+"""Number of keys of small objects remembered, to tell whether an object has occurred before."""
+
+_merge_lock = threading.Lock()
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def subtree_hash(value: Any, memo: Optional[Dict[int, str]] = None) -> str:
+    """
+    Merkle hash of a value and everything it contains.
+
+    The hash of an object or list is computed from the hashes of its members, so a
+    change anywhere in a subtree changes the hash of the subtree and of all its
+    ancestors, and nothing else. Slots with no value do not count.
+
+    :param value: an object (dict, YAMLRoot or pydantic model), list, or atomic value
+    :param memo: hashes of the objects and lists already hashed, by ``id``; the values
+        must stay alive while the memo is in use
+    :return: hex digest
+    """
+    if memo is None:
+        memo = {}
+    if is_object(value) or isinstance(value, (list, tuple)):
+        return _token(value, memo)
+    return _digest(_token(value, memo).encode("utf-8"))
+
+
+def _token(value: Any, memo: Dict[int, str]) -> str:
+    # atoms stand for themselves, and only objects and lists are digested
+    if isinstance(value, (str, int, float, bool)):
+        return f"{type(value).__name__}:{value!r}"
+    h = memo.get(id(value))
+    if h is not None:
+        return h
+    if is_object(value):
+        parts = [
+            f"{name!r}={_token(v, memo)}"
+            for name, v in sorted(slot_items(value), key=itemgetter(0))
+            if v is not None
+        ]
+        h = _digest(("o:" + ";".join(parts)).encode("utf-8"))
+    elif isinstance(value, (list, tuple)):
+        h = _digest(("l:" + ";".join([_token(v, memo) for v in value])).encode("utf-8"))
+    else:
+        return f"{type(value).__name__}:{value!r}"
+    memo[id(value)] = h
+    return h
+
+
+def _small_token(
+    value: Any, memo: Dict[int, Optional[Tuple[str, int]]], limit: int
+) -> Optional[Tuple[str, int]]:
+    # as _token, with the number of values in the subtree; None once that exceeds limit
+    if isinstance(value, (str, int, float, bool)):
+        return f"{type(value).__name__}:{value!r}", 1
+    key = id(value)
+    if key in memo:
+        return memo[key]
+    if is_object(value):
+        prefix = "o:"
+        members = [
+            (f"{name!r}=", v)
+            for name, v in sorted(slot_items(value), key=itemgetter(0))
+            if v is not None
+        ]
+    elif isinstance(value, (list, tuple)):
+        prefix = "l:"
+        members = [("", v) for v in value]
+    else:
+        return f"{type(value).__name__}:{value!r}", 1
+    size = 1
+    parts = []
+    result = None
+    if len(members) < limit:
+        for label, v in members:
+            member = _small_token(v, memo, limit)
+            if member is None:
+                break
+            size += member[1]
+            if size > limit:
+                break
+            parts.append(label + member[0])
+        else:
+            result = _digest((prefix + ";".join(parts)).encode("utf-8")), size
+    memo[key] = result
+    return result
+
+
+def fingerprint(schemaview: SchemaView, style_engine: Optional[StyleEngine] = None) -> str:
+    """
+    Hash of everything besides the instance that output depends on.
+
+    Schemas loaded from files are identified by the contents of the files, as a
+    SchemaView fills in its schemas as it is used; other schemas by their contents.
+
+    :param schemaview: schema, including its imports
+    :param style_engine: style configuration, if any
+    :return: hex digest
+    """
+    from linkml_renderer import __version__
+
+    parts = [__version__]
+    files = schema_files(schemaview)
+    for name, schema in sorted(schemaview.schema_map.items()):
+        source = None
+        if name in files:
+            try:
+                source = _digest(files[name].read_bytes())
+            except OSError:
+                pass
+        if source is None:
+            from linkml_runtime.dumpers import json_dumper
+
+            source = json_dumper.dumps(schema)
+        parts.append(f"{name}:{source}")
+    if style_engine is not None:
+        parts.append(style_engine.configuration.json())
+    return _digest("\n".join(parts).encode("utf-8"))
+
+
+@dataclass
+class Fragment:
+    """The output of one object, as written by a backend."""
+
+    key: str
+    """Hash of the object's subtree and of the state of the backend it was written in."""
+
+    text: str
+    """The output."""
+
+    children: List[str] = field(default_factory=list)
+    """Paths of the fragments nested directly in this one."""
+
+
+@dataclass
+class FragmentCache:
+    """
+    Fragments of the output of a render, by the path of the object they render.
+
+    Set a cache on a renderer to render incrementally; every render with the same
+    cache reuses the fragments of the previous one:
+
+    >>> renderer = HTMLRenderer(fragments=FragmentCache.load("out.html.fragments.json"))
+    >>> renderer.render_to(stream, instance, sv)
+    >>> renderer.fragments.save("out.html.fragments.json")
+
+    A cache is meant for one document of one renderer; a renderer of another format
+    never matches its fragments, but replaces them. It holds the state of the render in
+    progress, so a renderer with a cache cannot render in several threads at once.
+    """
+
+    fingerprint: Optional[str] = None
+    """Fingerprint of the schema and style the fragments were rendered with."""
+
+    fragments: Dict[str, Fragment] = field(default_factory=dict)
+    """Fragments of the latest render."""
+
+    spliced: int = 0
+    """Number of objects of the latest render whose previous output was reused."""
+
+    rendered: int = 0
+    """Number of objects of the latest render that were traversed and written."""
+
+    _previous: Dict[str, Fragment] = field(default_factory=dict, repr=False)
+    _open: List[List[str]] = field(default_factory=lambda: [[]], repr=False)
+    _hashes: Dict[int, str] = field(default_factory=dict, repr=False)
+
+    def start(self, schemaview: SchemaView, style_engine: Optional[StyleEngine] = None) -> None:
+        """
+        Begin a render: the fragments of the latest render become the ones to reuse.
+
+        If the schema or style have changed since, nothing is reused.
+
+        :param schemaview: schema of the render
+        :param style_engine: style of the render, if any
+        """
+        current = fingerprint(schemaview, style_engine)
+        self._previous = self.fragments if current == self.fingerprint else {}
+        self.fingerprint = current
+        self.fragments = {}
+        self.spliced = self.rendered = 0
+        self._open = [[]]
+        self._hashes = {}
+
+    def key(self, element: Any, class_name: str, state: str) -> str:
+        """
+        Key of an object about to be written.
+
+        :param element: the object
+        :param class_name: class the object is rendered as
+        :param state: state of the backend, from ``fragment_state``
+        :return: hex digest
+        """
+        h = subtree_hash(element, self._hashes)
+        return _digest(f"{h}|{class_name}|{state}".encode("utf-8"))
+
+    def reuse(self, path: str, key: str) -> Optional[str]:
+        """
+        The previous output of an object, if the object and where it is written are the
+        same as in the previous render.
+
+        The reused fragment, and the fragments nested in it, are kept for the next render.
+
+        :param path: path of the object in the instance
+        :param key: from :meth:`key`
+        :return: output to write in place of the object, or None if it must be rendered
+        """
+        fragment = self._previous.get(path)
+        if fragment is None or fragment.key != key:
+            return None
+        self._keep(path)
+        self._open[-1].append(path)
+        self.spliced += 1
+        return fragment.text
+
+    def _keep(self, path: str) -> None:
+        fragment = self._previous.get(path)
+        if fragment is not None:
+            self.fragments[path] = fragment
+            for child in fragment.children:
+                self._keep(child)
+
+    def add(self, path: str, key: str, text: str) -> None:
+        """
+        Store the output of an object that was not rendered, but copied from elsewhere.
+
+        :param path: path of the object in the instance
+        :param key: from :meth:`key`
+        :param text: output of the object
+        """
+        self.fragments[path] = Fragment(key, text)
+        self._open[-1].append(path)
+
+    def open(self) -> None:
+        """Begin capturing the output of an object that could not be reused."""
+        self._open.append([])
+
+    def close(self, path: str, key: str, text: str) -> None:
+        """
+        Store the output of an object, captured since the matching :meth:`open`.
+
+        :param path: path of the object in the instance
+        :param key: from :meth:`key`
+        :param text: output of the object
+        """
+        children = self._open.pop()
+        self.fragments[path] = Fragment(key, text, children)
+        self._open[-1].append(path)
+        self.rendered += 1
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "FragmentCache":
+        """
+        Load a manifest saved by :meth:`save`.
+
+        A missing, unreadable or outdated manifest gives an empty cache, so the next
+        render is a full one.
+
+        :param path: manifest file
+        :return: cache
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return cls()
+        fragments = {
+            p: Fragment(f["key"], f["text"], f.get("children", []))
+            for p, f in data.get("fragments", {}).items()
+        }
+        return cls(fingerprint=data.get("fingerprint"), fragments=fragments)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Save the fragments of the latest render as a manifest.
+
+        :param path: manifest file, e.g. the output file plus :data:`MANIFEST_SUFFIX`
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            self.dump(f)
+
+    def dump(self, stream: IO[str]) -> None:
+        """
+        Write the fragments of the latest render as a manifest.
+
+        :param stream: text stream to write to
+        """
+        data = {
+            "version": MANIFEST_VERSION,
+            "fingerprint": self.fingerprint,
+            "fragments": {
+                p: {"key": f.key, "text": f.text, "children": f.children}
+                for p, f in self.fragments.items()
+            },
+        }
+        json.dump(data, stream)
+
+
+@dataclass
+class RepeatCache:
+    """
+    A bounded cache of the output of small objects, for objects that occur many times in
+    one render, such as ontology terms, units and evidence codes.
+
+    Within a render, objects of the same class with the same contents, written by the
+    backend in the same state (e.g. as a cell of the same table column), are written the
+    same; the output of the second is kept, and copied for the others without visiting
+    them. Only objects with at most ``max_values`` values in their subtree are cached,
+    and the least recently used fragments are dropped once their total length exceeds
+    ``max_size`` characters. Each render fills a cache of its own, made by
+    :meth:`for_render`, as the style may have changed in between and other renders may be
+    running in other threads; when it is done, its statistics are added to this cache with
+    :meth:`merge`, and accumulate until :meth:`reset`.
+
+    >>> renderer = HTMLRenderer(repeat_cache=RepeatCache(max_size=1_000_000))
+    >>> html = renderer.render(instance, sv)
+    >>> renderer.repeat_cache.hits, renderer.repeat_cache.misses
+    """
+
+    max_size: int = DEFAULT_REPEAT_CACHE_SIZE
+    """Limit on the total length of the cached fragments, in characters."""
+
+    max_values: int = DEFAULT_REPEAT_MAX_VALUES
+    """Limit on the number of values (objects, lists and atoms) in a cached object."""
+
+    hits: int = 0
+    """Number of objects whose output was copied from the cache."""
+
+    misses: int = 0
+    """Number of small objects that were not cached, and were rendered."""
+
+    evictions: int = 0
+    """Number of fragments dropped to stay within ``max_size``."""
+
+    size: int = 0
+    """Total length of the cached fragments."""
+
+    _entries: "OrderedDict[str, str]" = field(default_factory=OrderedDict, repr=False)
+    _values: Dict[int, Optional[Tuple[str, int]]] = field(default_factory=dict, repr=False)
+    _seen: Set[str] = field(default_factory=set, repr=False)
+
+    def start(self) -> None:
+        """Begin a render, with an empty cache."""
+        self._entries.clear()
+        self._values = {}
+        self._seen = set()
+        self.size = 0
+
+    def reset(self) -> None:
+        """Empty the cache and zero the statistics."""
+        self.start()
+        self.hits = self.misses = self.evictions = 0
+
+    def for_render(self) -> "RepeatCache":
+        """
+        An empty cache with the same limits, for the use of one render.
+
+        :return: new cache
+        """
+        return RepeatCache(max_size=self.max_size, max_values=self.max_values)
+
+    def merge(self, render: "RepeatCache") -> None:
+        """
+        Add the statistics of a finished render, and keep its fragments for inspection.
+
+        :param render: from :meth:`for_render`
+        """
+        with _merge_lock:
+            self.hits += render.hits
+            self.misses += render.misses
+            self.evictions += render.evictions
+            self._entries = render._entries
+            self.size = render.size
+
+    def key(self, element: Any, class_name: str, state: str) -> Optional[str]:
+        """
+        Key of an object about to be written, if it is small enough to be cached.
+
+        :param element: the object
+        :param class_name: class the object is rendered as
+        :param state: state of the backend, from ``fragment_state``
+        :return: key, or None if the object is too large
+        """
+        token = _small_token(element, self._values, self.max_values)
+        if token is None:
+            return None
+        return f"{token[0]}|{class_name}|{state}"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        The output of an object, if it is cached.
+
+        :param key: from :meth:`key`
+        :return: output, or None
+        """
+        text = self._entries.get(key)
+        if text is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return text
+
+    def admit(self, key: str) -> bool:
+        """
+        Whether to cache the output of an object that is not cached.
+
+        Only objects seen before are cached, so that objects that occur once, usually
+        most of them, cost neither the copying of their output nor room in the cache.
+
+        :param key: from :meth:`key`
+        :return: True if the output should be passed to :meth:`put`
+        """
+        self.misses += 1
+        if key in self._seen:
+            return True
+        if len(self._seen) >= _MAX_SEEN:
+            self._seen.clear()
+        self._seen.add(key)
+        return False
+
+    def put(self, key: str, text: str) -> None:
+        """
+        Cache the output of an object, dropping the least recently used fragments if
+        the cache is full.
+
+        :param key: from :meth:`key`
+        :param text: output of the object
+        """
+        if len(text) > self.max_size:
+            return
+        self._entries[key] = text
+        self.size += len(text)
+        while self.size > self.max_size:
+            _, dropped = self._entries.popitem(last=False)
+            self.size -= len(dropped)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Statistics of the cache.
+
+        :return: hits, misses, evictions, and the number and total length of the fragments
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "size": self.size,
+        }
+
+
+def manifest_path(output_path: Union[str, Path]) -> Path:
+    """
+    Where the manifest of an output file is kept.
+
+    :param output_path: output file
+    :return: path of its manifest
+    """
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + MANIFEST_SUFFIX)
+
+
+class CapturingSink:
+    """
+    A text sink that forwards everything written to it, and copies it into any open
+    captures, for backends that write straight to a stream.
+    """
+
+    def __init__(self, stream: IO[str]):
+        self.stream = stream
+        self.captures: List[List[str]] = []
+
+    def write(self, text: str) -> int:
+        for capture in self.captures:
+            capture.append(text)
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        flush = getattr(self.stream, "flush", None)
+        if flush is not None:
+            flush()
+
+    def start_capture(self) -> None:
+        """Begin copying output."""
+        self.captures.append([])
+
+    def end_capture(self) -> str:
+        """
+        Stop the most recent capture.
+
+        :return: output written since the matching :meth:`start_capture`
+        """
+        return "".join(self.captures.pop())
@@ -1,16 +1,22 @@
 """Rendering of LinkML instances as HTML."""
 import logging
-from typing import Any, List, Optional, Tuple, Union
+from io import StringIO
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 from airium import Airium
 from linkml_runtime import SchemaView
-from linkml_runtime.utils.yamlutils import YAMLRoot
-from pydantic import BaseModel
+from linkml_runtime.linkml_model import SlotDefinition
 
-from linkml_renderer.paths.html_context import HTMLContext
+from linkml_renderer.paths.context import Context
+from linkml_renderer.renderers.events import EVENT, replay
 from linkml_renderer.renderers.mermaid_renderer import MermaidRenderer
-from linkml_renderer.renderers.renderer import LINKML_INSTANCE, Renderer, _dict, _empty
-from linkml_renderer.style.model import RenderElementType
+from linkml_renderer.renderers.pagination import TablePage, TablePager
+from linkml_renderer.renderers.render_plan import render_plan_cache
+from linkml_renderer.renderers.renderer import LINKML_INSTANCE, Renderer
+from linkml_renderer.renderers.streaming import DEFAULT_CHUNK_SIZE, SINK, StreamingAirium
+from linkml_renderer.renderers.traversal import COLLECTION, Descend, TraversalBackend
+from linkml_renderer.style.model import RenderElementType, RenderType
 
 BOOTSTRAP_VERSION = "5.3.0-alpha1"
 
@@ -18,6 +24,17 @@ PRIMITIVE = Union[str, int, float, bool]
 
 logger = logging.getLogger(__name__)
 
+# how the children of a frame are laid out
+_VALUE = "value"
+_ROW = "row"
+_LIST = "list"
+_BADGE = "badge"
+_DL = "dl"
+_TUPLE = "tuple"
+
+# how the slots of an object are laid out
+_OBJECT = "object"
+
 
 class HTMLRenderer(Renderer):
     """
@@ -42,11 +59,14 @@ class HTMLRenderer(Renderer):
 
     """
 
+    render_type = RenderType.HTML
+
     def render(
         self,
         element: LINKML_INSTANCE,
         schemaview: SchemaView,
         source_element_name: Optional[str] = None,
+        pager: Optional[TablePager] = None,
         **kwargs,
     ) -> str:
         """
@@ -60,358 +80,639 @@ class HTMLRenderer(Renderer):
         :param element: instance to render
         :param schemaview: describes the structure of the instance to render
         :param source_element_name: name of the element type the instance instantiates.
+        :param pager: if set, pages of large tables after the first are written to files
         :param kwargs:
         :return: HTML string
         """
-        a = Airium()
-        ctxt = HTMLContext(airium=a, schemaview=schemaview)
-        if source_element_name:
-            ctxt.set_root(source_element_name)
-        self.generate(element, ctxt)
-        return str(a)
-
-    def generate(self, element: Union[YAMLRoot, BaseModel], context: HTMLContext) -> None:
+        stream = StringIO()
+        self.render_to(stream, element, schemaview, source_element_name, pager=pager)
+        return stream.getvalue()
+
+    def render_to(
+        self,
+        stream: SINK,
+        element: LINKML_INSTANCE,
+        schemaview: SchemaView,
+        source_element_name: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        pager: Optional[TablePager] = None,
+        **kwargs,
+    ) -> None:
         """
-        Generate HTML for a YAMLRoot object.
+        Write HTML for a YAMLRoot object to a stream as it is generated.
 
-        May be top level, in which case head/body tags are generated.
+        The output is identical to :meth:`render`, but memory use is bounded by
+        ``chunk_size`` rather than by the size of the document.
 
-        :param element:
-        :param context:
-        :return:
-        """
-        if not isinstance(element, (YAMLRoot, BaseModel, dict, list)):
-            return self.generate_atom(element, context)
-        if context.source_path is None:
-            if isinstance(element, YAMLRoot):
-                root = type(element).class_name
-            else:
-                roots = [c.name for c in context.schemaview.all_classes().values() if c.tree_root]
-                if len(roots) != 1:
-                    raise ValueError(f"Cannot determine root class for {element}")
-                root = roots[0]
-            context.set_root(root)
-        logger.info(f"Current context: {context}")
-        if context.current.slot:
-            render_as = self.style_engine.slot_render_as(context.current.slot.name)
-        else:
-            render_as = None
-        if context.target_depth == 0:
-            return self.generate_document(element, context)
-        elif element is None:
-            return
-        elif context.in_collection:
-            if isinstance(element, list):
-                elements = list(enumerate(element))
-            elif isinstance(element, dict):
-                elements = list(element.items())
-            else:
-                raise TypeError(f"Unexpected type for collection: {type(element)}")
-            logger.debug(f"Collection {context.current.slot.name} render_as={render_as}")
-            if render_as is None:
-                if context.in_object:
-                    render_as = RenderElementType.table
-                else:
-                    render_as = RenderElementType.simple_list
-            if render_as == RenderElementType.table:
-                if "table" in context.target_path:
-                    logger.debug(f"Will not nest table in table for {context}")
-                    context.airium("TRUNCATED")
-                    return
-                return self.elements_to_table(elements, context)
-            elif render_as == RenderElementType.simple_list:
-                return self.elements_to_unordered_list(elements, context)
-            elif render_as == RenderElementType.description_list:
-                return self.elements_to_description_lists(elements, context)
-            elif render_as == RenderElementType.TUPLE:
-                return self.elements_to_tuples(elements, context)
-            else:
-                raise ValueError(f"Unknown render_as {render_as}")
-        elif context.in_object:
-            if not isinstance(element, (dict, YAMLRoot, BaseModel)):
-                raise TypeError(f"Unexpected type for class: {type(element)}")
-            if render_as == RenderElementType.TUPLE:
-                return self.generate_tuple(element, context)
-            else:
-                return self.generate_object(element, context)
-        elif context.in_object_reference:
-            return self.generate_reference(element, context)
-        else:
-            # TODO: enums
-            return self.generate_atom(element, context)
+        If a pager is given, the main document (including the first page of every large
+        table) is written out in full before the remaining pages are written.
 
-    def generate_document(self, element: Union[YAMLRoot, BaseModel], context: HTMLContext) -> None:
+        :param stream: text or binary file-like object to write to
+        :param element: instance to render
+        :param schemaview: describes the structure of the instance to render
+        :param source_element_name: name of the element type the instance instantiates.
+        :param chunk_size: approximate number of characters to buffer between writes
+        :param pager: if set, pages of large tables after the first are written to files
+        :param kwargs:
         """
-        Generate HTML top level document for a YAMLRoot object.
+        diagram = None
+        if self.include_diagrams:
+            diagram = self.diagram(element, schemaview, source_element_name)
+        backend = self.create_backend(
+            stream, schemaview, chunk_size=chunk_size, pager=pager, diagram=diagram
+        )
+        self.traversal_engine(schemaview).walk(element, backend, source_element_name)
+        backend.finish()
+
+    def create_backend(
+        self,
+        stream: SINK,
+        schemaview: SchemaView,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        pager: Optional[TablePager] = None,
+        diagram: Optional[str] = None,
+        **kwargs,
+    ) -> "HTMLBackend":
+        """
+        Create a backend that writes an HTML document to a stream.
 
-        :param element:
-        :param context:
-        :return:
+        :param stream: text or binary file-like object to write to
+        :param schemaview: describes the structure of the instance to render
+        :param chunk_size: approximate number of characters to buffer between writes
+        :param pager: if set, pages of large tables after the first are written to files
+        :param diagram: Mermaid diagram to include at the top of the document, if any
+        :param kwargs:
+        :return: backend
         """
-        a = context.airium
-        title = "DEFAULT"
-        if self.style_engine:
-            title_slot = self.style_engine.title_slot(context.current_element_type.name)
-            if title_slot:
-                title = _dict(element).get(title_slot, "NO TITLE")
-        a("<!DOCTYPE html>")
-        with a.html(lang="en"):
-            with a.head():
-                a.meta(charset="utf-8")
-                a.meta(name="viewport", content="width=device-width, initial-scale=1")
-                a.link(
-                    rel="stylesheet",
-                    href=f"https://cdn.jsdelivr.net/npm/bootstrap@{BOOTSTRAP_VERSION}/dist/css/bootstrap.min.css",
-                )
-                a.title(_t=title)
-            with a.body():
-                a.script(
-                    src=f"https://cdn.jsdelivr.net/npm/bootstrap@{BOOTSTRAP_VERSION}/dist/js/bootstrap.bundle.min.js"
-                )
-                if self.style_engine.configuration.include_diagrams:
-                    with a.div():
-                        a.h3("Diagram")
-                        mermaid_renderer = MermaidRenderer()
-                        with a.div(class_="mermaid"):
-                            a(
-                                mermaid_renderer.render(
-                                    element,
-                                    context.schemaview,
-                                    source_element_name=context.current_element_type.name,
-                                )
-                            )
-                        with a.script(src="https://unpkg.com/mermaid@8.8.0/dist/mermaid.min.js"):
-                            a("mermaid.initialize({});")
-                self.generate(element, context.extend(None, "body"))
-
-    def generate_object(self, element: Union[YAMLRoot, dict], context: HTMLContext) -> None:
+        a = StreamingAirium(self.output_sink(stream), chunk_size=chunk_size)
+        return HTMLBackend(self, a, schemaview, pager=pager, diagram=diagram)
+
+    def render_events_to(
+        self,
+        stream: SINK,
+        events: Iterable[EVENT],
+        schemaview: SchemaView,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        pager: Optional[TablePager] = None,
+        **kwargs,
+    ) -> None:
         """
-        Generate HTML for an inner YAMLRoot object.
+        Write HTML for a recorded traversal to a stream.
 
-        Not top level, so no head/body tags are generated.
+        Pages of large tables are only split off during a live traversal; when replaying,
+        every page stays in the document as a separate table.
 
-        :param element:
-        :param context:
-        :return:
+        :param stream: text or binary file-like object to write to
+        :param events: events from an :class:`EventRecorder` or :func:`load_events`
+        :param schemaview: SchemaView the events were recorded against
+        :param chunk_size: approximate number of characters to buffer between writes
+        :param pager: not used for splitting tables when replaying; see above
+        :param kwargs:
         """
-        a = context.airium
-        sv = context.schemaview
-        element_dict = _dict(element)
-        with a.div():
-            title_slot = self.style_engine.title_slot(context.current_element_type.name)
-            if title_slot:
-                title = _dict(element).get(title_slot, None)
-                if title:
-                    with a.h2():
-                        a(title)
-            description_slot = self.style_engine.description_slot(context.current_element_type.name)
-            if description_slot:
-                description = _dict(element).get(description_slot, None)
-                if description:
-                    with a.div():
-                        a(description)
-            with a.dl(class_="row"):
-                for block in self.attribute_blocks(context):
-                    for slot in block.attributes:
-                        if slot.name not in element_dict:
-                            continue
-                        v = element_dict[slot.name]
-                        if v is None:
-                            continue
-                        if slot.readonly:
-                            continue
-                        with a.dt(class_="col-sm-3"):
-                            with a.span():
-                                a(slot.name)
-                                url = sv.get_uri(slot, expand=True)
-                                desc = slot.description
-                                args = {
-                                    "data-bs-toggle": "tooltip",
-                                    "title": desc,
-                                }
-                                with a.a(href=url, **args):
-                                    with a.sup():
-                                        a("?")
-                        with a.dd(class_="col-sm-9"):
-                            logger.debug(f" - Object[{slot.name}] type {type(v)}")
-                            self.generate(v, context.extend(slot))
-
-    def elements_to_unordered_list(
-        self, indexed_elements: List[Tuple[Any, Any]], context: HTMLContext
-    ) -> None:
+        diagram = None
+        if self.include_diagrams:
+            # the events are read twice: once for the diagram, once for the document
+            events = list(events)
+            diagram = MermaidRenderer(
+                style_engine=self.style_engine, profile=self.profile
+            ).render_events(events, schemaview)
+        backend = self.create_backend(
+            stream, schemaview, chunk_size=chunk_size, pager=pager, diagram=diagram
+        )
+        replay(events, backend, schemaview)
+        backend.finish()
+
+    @property
+    def include_diagrams(self) -> bool:
+        """True if documents start with a Mermaid diagram of the instance."""
+        return self.style_engine is not None and bool(
+            self.style_engine.configuration.include_diagrams
+        )
+
+    def diagram(
+        self,
+        element: LINKML_INSTANCE,
+        schemaview: SchemaView,
+        source_element_name: Optional[str] = None,
+    ) -> str:
         """
-        Generate HTML for a list of objects.
+        Mermaid diagram of an instance, as included in documents.
 
-        :param indexed_elements:
-        :param context:
-        :return:
+        :param element: instance to render
+        :param schemaview: describes the structure of the instance to render
+        :param source_element_name: name of the element type the instance instantiates.
+        :return: Mermaid source
         """
-        logger.debug(f"Generating list of {len(indexed_elements)} elements")
-        a = context.airium
-        with a.div():
-            if not context.in_object_reference and context.current_element_type.name == "string":
-                for _, element in indexed_elements:
-                    with a.span(class_="badge rounded-pill bg-light text-dark"):
-                        a(element)
-            else:
-                with a.ul(class_="list-group"):
-                    for ix, element in indexed_elements:
-                        element_context = context.index_extend(ix)
-                        with a.li(class_="list-group-item"):
-                            self.generate(element, element_context)
-
-    def elements_to_table(
-        self, indexed_elements: List[Tuple[Any, YAMLRoot]], context: HTMLContext
+        mermaid_renderer = MermaidRenderer(style_engine=self.style_engine, profile=self.profile)
+        if self.profile is not None:
+            with self.profile.phase("diagram"):
+                return mermaid_renderer.render(element, schemaview, source_element_name)
+        return mermaid_renderer.render(element, schemaview, source_element_name)
+
+    def render_many_to(
+        self,
+        stream: SINK,
+        elements: Iterable[LINKML_INSTANCE],
+        schemaview: SchemaView,
+        source_element_name: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        title: str = "DEFAULT",
+        pager: Optional[TablePager] = None,
+        **kwargs,
     ) -> None:
         """
-        Generate HTML table for a list of objects.
-
-        :param elements:
-        :param context:
-        :return:
+        Write a single HTML document with one section per element.
+
+        Elements are consumed lazily and the document is streamed, so memory use is
+        bounded by the largest element rather than by the number of elements.
+
+        :param stream: text or binary file-like object to write to
+        :param elements: instances to render
+        :param schemaview: describes the structure of the instances to render
+        :param source_element_name: name of the element type each instance instantiates.
+        :param chunk_size: approximate number of characters to buffer between writes
+        :param title: title of the document
+        :param pager: if set, pages of large tables after the first are written to files
+        :param kwargs:
         """
-        if len(indexed_elements) == 0:
-            return
-        logger.debug(f"Generating table for {indexed_elements}")
-        a = context.airium
-        populated_slots = set()
-        all_slots = list(self.slots(context))
-        slots_to_check = list(all_slots)
-        for _, element in indexed_elements:
-            for slot in slots_to_check:
-                if not _empty(_dict(element).get(slot.name, None)):
-                    populated_slots.add(slot.name)
-            slots_to_check = [slot for slot in slots_to_check if slot.name not in populated_slots]
-        slots = []
-        for block in self.attribute_blocks(context):
-            for slot in block.attributes:
-                if slot.name in populated_slots:
-                    slots.append(slot)
+        a = StreamingAirium(self.output_sink(stream), chunk_size=chunk_size)
+        engine = self.traversal_engine(schemaview)
+        include_diagrams = self.include_diagrams
+        a("<!DOCTYPE html>")
+        with a.html(lang="en"):
+            self._write_head(a, title)
+            with a.body():
+                self._write_body_scripts(a)
+                for element in elements:
+                    with a.section():
+                        if include_diagrams:
+                            diagram = self.diagram(element, schemaview, source_element_name)
+                            self._write_diagram(a, diagram, include_script=False)
+                        backend = HTMLBackend(self, a, schemaview, pager=pager)
+                        engine.walk(element, backend, source_element_name, document=False)
+                if include_diagrams:
+                    self._write_diagram_script(a)
+        a.finish()
+        if pager:
+            pager.write_pages(self, schemaview)
+
+    def _write_head(self, a: Airium, title: str) -> None:
+        with a.head():
+            a.meta(charset="utf-8")
+            a.meta(name="viewport", content="width=device-width, initial-scale=1")
+            a.link(
+                rel="stylesheet",
+                href=f"https://cdn.jsdelivr.net/npm/bootstrap@{BOOTSTRAP_VERSION}/dist/css/bootstrap.min.css",
+            )
+            a.title(_t=title)
+
+    def _write_body_scripts(self, a: Airium) -> None:
+        a.script(
+            src=f"https://cdn.jsdelivr.net/npm/bootstrap@{BOOTSTRAP_VERSION}/dist/js/bootstrap.bundle.min.js"
+        )
+
+    def _write_diagram(self, a: Airium, diagram: str, include_script: bool = True) -> None:
         with a.div():
-            with a.table(class_="table table-striped"):
-                with a.tr():
-                    for slot in slots:
-                        with a.th():
-                            a(slot.alias)
-                for _, element in indexed_elements:
-                    element_dict = _dict(element)
-                    with a.tr():
-                        for slot in slots:
-                            v = element_dict.get(slot.name, None)
-                            with a.td():
-                                self.generate(v, context.extend(slot, "table"))
-
-    def elements_to_description_lists(
-        self, indexed_elements: List[Tuple[Any, YAMLRoot]], context: HTMLContext
-    ) -> None:
+            a.h3("Diagram")
+            with a.div(class_="mermaid"):
+                a(diagram)
+            if include_script:
+                self._write_diagram_script(a)
+
+    def _write_diagram_script(self, a: Airium) -> None:
+        with a.script(src="https://unpkg.com/mermaid@8.8.0/dist/mermaid.min.js"):
+            a("mermaid.initialize({});")
+
+    def _write_pager_links(self, a: Airium, links: List[Tuple[str, str]], current: int) -> None:
+        with a.nav(**{"aria-label": "Pages"}):
+            with a.ul(class_="pagination flex-wrap"):
+                for n, (label, href) in enumerate(links, start=1):
+                    with a.li(class_="page-item active" if n == current else "page-item"):
+                        with a.a(class_="page-link", href=href):
+                            a(label)
+
+    def write_table_page(self, stream: SINK, page: TablePage, schemaview: SchemaView) -> None:
         """
-        Generate description lists for a list of objects.
+        Write a page of a large table as a standalone HTML document.
 
-        :param elements:
-        :param context:
-        :return:
+        :param stream: text or binary file-like object to write to
+        :param page: page queued while rendering the main document
+        :param schemaview: schema the rows conform to
         """
-        if len(indexed_elements) == 0:
-            return
-        logger.debug(f"Generating DLs for {indexed_elements}")
-        a = context.airium
-        slots = list(self.slots(context))
-        with a.div():
+        a = StreamingAirium(self.output_sink(stream))
+        context = Context(schemaview=schemaview, source_path=page.source_path)
+        a("<!DOCTYPE html>")
+        with a.html(lang="en"):
+            self._write_head(a, page.title)
+            with a.body():
+                self._write_body_scripts(a)
+                with a.div():
+                    self._write_pager_links(a, page.links, page.number)
+                    backend = HTMLBackend(self, a, schemaview, page=page)
+                    rows = [element for _, element in page.rows]
+                    self.traversal_engine(schemaview).walk_collection(rows, context, backend)
+        a.finish()
+
+
+class _Frame:
+    """State of an open node of the document."""
+
+    __slots__ = (
+        "layout",
+        "mode",
+        "in_table",
+        "slot",
+        "slot_uri",
+        "columns",
+        "next_column",
+        "closers",
+        "table",
+        "key",
+        "page_size",
+        "stop_after_page",
+        "count",
+    )
+
+    def __init__(
+        self,
+        layout: str = _VALUE,
+        in_table: bool = False,
+        slot: Optional[SlotDefinition] = None,
+        slot_uri: Optional[str] = None,
+    ):
+        self.layout = layout
+        self.mode: Optional[str] = None
+        self.in_table = in_table
+        self.slot = slot
+        self.slot_uri = slot_uri
+        self.columns: Optional[Dict[str, Tuple[int, SlotDefinition]]] = None
+        self.next_column = 0
+        self.closers: List[Any] = []
+        self.table: Any = None
+        self.key: Optional[str] = None
+        self.page_size: Optional[int] = None
+        self.stop_after_page = False
+        self.count = 0
+
+
+class HTMLBackend(TraversalBackend):
+    """
+    Writes the structure of an instance as HTML.
+
+    Objects are written as description lists headed by their title, collections of
+    objects as tables, and other collections as lists, unless the style engine says
+    otherwise. Tags are opened when a node starts and closed when it ends.
+    """
+
+    def __init__(
+        self,
+        renderer: HTMLRenderer,
+        airium: Airium,
+        schemaview: SchemaView,
+        pager: Optional[TablePager] = None,
+        diagram: Optional[str] = None,
+        page: Optional[TablePage] = None,
+    ):
+        self.renderer = renderer
+        self.airium = airium
+        self.schemaview = schemaview
+        self.pager = pager
+        self.diagram = diagram
+        self.page = page
+        self.stack: List[_Frame] = [_Frame()]
+
+    def _enter(self, frame: _Frame, tag: Any) -> None:
+        tag.__enter__()
+        frame.closers.append(tag)
+
+    def _close(self, frame: _Frame) -> None:
+        if frame.table is not None:
+            frame.table.__exit__(None, None, None)
+            frame.table = None
+        for tag in reversed(frame.closers):
+            tag.__exit__(None, None, None)
+
+    def _push(self, frame: _Frame) -> Descend:
+        self.stack.append(frame)
+        return Descend.VISIT
+
+    def _pop(self) -> _Frame:
+        frame = self.stack.pop()
+        self._close(frame)
+        return frame
+
+    def _anchor_id(self, frame: _Frame, index: Any) -> str:
+        return f"{frame.slot.range}__{index}"
+
+    def start_document(self, class_name, title_slot, title) -> None:
+        a = self.airium
+        document_title = "DEFAULT"
+        if title_slot:
+            document_title = "NO TITLE" if title is None else title
+        frame = _Frame()
+        a("<!DOCTYPE html>")
+        self._enter(frame, a.html(lang="en"))
+        self.renderer._write_head(a, document_title)
+        self._enter(frame, a.body())
+        self.renderer._write_body_scripts(a)
+        if self.diagram is not None:
+            self.renderer._write_diagram(a, self.diagram)
+        self.stack.append(frame)
+
+    def end_document(self) -> None:
+        self._pop()
+
+    def start_object(self, class_name, identifier, title, description) -> Descend:
+        a = self.airium
+        parent = self.stack[-1]
+        frame = _Frame(in_table=parent.in_table)
+        if parent.layout == _ROW:
+            frame.mode = _ROW
+            frame.columns = parent.columns
+        elif parent.layout == _DL:
+            frame.mode = _DL
+            self._enter(frame, a.dl(class_="row"))
+        elif parent.layout == _TUPLE or (
+            self.renderer.render_as(parent.slot, parent.slot_uri) == RenderElementType.TUPLE
+        ):
+            frame.mode = _TUPLE
+            self._enter(frame, a.span())
+        else:
+            frame.mode = _OBJECT
+            self._enter(frame, a.div())
+            if title:
+                with a.h2():
+                    a(title)
+            if description:
+                with a.div():
+                    a(description)
+            self._enter(frame, a.dl(class_="row"))
+        return self._push(frame)
+
+    def end_object(self) -> None:
+        frame = self.stack[-1]
+        if frame.mode == _ROW:
+            self._missing_cells(frame, len(frame.columns))
+        self._pop()
+
+    def _missing_cells(self, frame: _Frame, up_to: int) -> None:
+        a = self.airium
+        for _ in range(frame.next_column, up_to):
+            with a.td():
+                a("None")
+        frame.next_column = up_to
+
+    def start_slot(self, slot, slot_uri, empty) -> Descend:
+        a = self.airium
+        obj = self.stack[-1]
+        frame = _Frame(in_table=obj.in_table, slot=slot, slot_uri=slot_uri)
+        if obj.mode == _OBJECT:
+            if slot.readonly:
+                return Descend.SKIP
+            with a.dt(class_="col-sm-3"):
+                with a.span():
+                    a(slot.name)
+                    args = {
+                        "data-bs-toggle": "tooltip",
+                        "title": slot.description,
+                    }
+                    with a.a(href=slot_uri, **args):
+                        with a.sup():
+                            a("?")
+            self._enter(frame, a.dd(class_="col-sm-9"))
+        elif obj.mode == _ROW:
+            column = obj.columns.get(slot.name)
+            if column is None:
+                return Descend.SKIP
+            self._missing_cells(obj, column[0])
+            obj.next_column += 1
+            frame.in_table = True
+            self._enter(frame, a.td())
+        elif empty:
+            return Descend.SKIP
+        elif obj.mode == _DL:
+            with a.dt(class_="col-sm-3"):
+                a(slot.alias)
+            self._enter(frame, a.dd(class_="col-sm-9"))
+        return self._push(frame)
+
+    def end_slot(self) -> None:
+        self._pop()
+
+    def _open_table(self, frame: _Frame, **kwargs) -> None:
+        a = self.airium
+        frame.table = a.table(class_="table table-striped", **kwargs)
+        frame.table.__enter__()
+        with a.tr():
+            for _, slot in frame.columns.values():
+                with a.th():
+                    a(slot.alias)
+
+    def start_collection(
+        self, size, keys, columns, collection=None, context=None, stats=None
+    ) -> Descend:
+        a = self.airium
+        parent = self.stack[-1]
+        frame = _Frame(in_table=parent.in_table, slot=parent.slot, slot_uri=parent.slot_uri)
+        if self.page is not None and len(self.stack) == 1:
+            frame.slot = self.page.source_path.head.slot
+            plan = render_plan_cache.get(self.schemaview, frame.slot.range)
+            slots = {slot.name: slot for slot in plan.slots}
+            frame.layout = _ROW
+            frame.columns = _columns([slots[name] for name in self.page.slot_names])
+            self._open_table(frame)
+            return self._push(frame)
+        render_as = self.renderer.render_as(parent.slot, parent.slot_uri)
+        if render_as is None:
+            if columns is not None:
+                render_as = RenderElementType.table
+            else:
+                render_as = RenderElementType.simple_list
+        if render_as == RenderElementType.table:
+            if parent.in_table:
+                logger.debug(f"Will not nest table in table for {parent.slot.name}")
+                a("TRUNCATED")
+                return Descend.SKIP
+            if size == 0:
+                return Descend.SKIP
+            frame.layout = _ROW
+            frame.columns = _columns(columns or [])
+            self._enter(frame, a.div())
+            page_size = self._page_size()
+            if page_size and size > page_size:
+                self._start_pages(frame, size, page_size, keys, collection, context)
+            else:
+                self._open_table(frame)
+        elif render_as == RenderElementType.simple_list:
+            self._enter(frame, a.div())
+            if parent.slot.range == "string":
+                frame.layout = _BADGE
+            else:
+                frame.layout = _LIST
+                self._enter(frame, a.ul(class_="list-group"))
+        elif render_as == RenderElementType.description_list:
+            if size == 0:
+                return Descend.SKIP
+            frame.layout = _DL
+            self._enter(frame, a.div())
             with a.div():
-                anchor_id = self.anchor_id(context, "TOC")
-                a.a(id=anchor_id)
-                for ix, _ in indexed_elements:
+                a.a(id=self._anchor_id(frame, "TOC"))
+                for ix in keys if keys is not None else range(size):
                     with a.a(
-                        class_="btn btn-outline-primary", href=f"#{self.anchor_id(context, ix)}"
+                        class_="btn btn-outline-primary", href=f"#{self._anchor_id(frame, ix)}"
                     ):
                         a(ix)
                     a(" ")
-            for ix, element in indexed_elements:
-                anchor_id = self.anchor_id(context, ix)
-                a.a(id=anchor_id)
-                element_dict = _dict(element)
-                with a.h3():
-                    a(ix)
-                with a.dl(class_="row"):
-                    for slot in slots:
-                        v = element_dict.get(slot.name, None)
-                        if not _empty(v):
-                            with a.dt(class_="col-sm-3"):
-                                a(slot.alias)
-                            with a.dd(class_="col-sm-9"):
-                                self.generate(v, context.extend(slot, "dl"))
-
-    def elements_to_tuples(
-        self, indexed_elements: List[Tuple[Any, YAMLRoot]], context: HTMLContext
-    ) -> None:
-        """
-        Generate simple tuples for a list of objects.
+        elif render_as == RenderElementType.TUPLE:
+            if size == 0:
+                return Descend.SKIP
+            frame.layout = _TUPLE
+            self._enter(frame, a.div())
+        else:
+            raise ValueError(f"Unknown render_as {render_as}")
+        return self._push(frame)
 
-        When writing tuples, the attributes/keys are omitted, as the position of the value is
-        intended to be sufficient to identify it.
+    def _page_size(self) -> Optional[int]:
+        style = self.renderer.style_engine
+        page_size = style.configuration.table_page_size if style else None
+        return page_size if page_size and page_size > 0 else None
 
-        :param elements:
-        :param context:
-        :return:
-        """
-        if len(indexed_elements) == 0:
-            return
-        logger.debug(f"Generating tuples for {indexed_elements}")
-        a = context.airium
-        with a.div():
-            for _, element in indexed_elements:
-                self.generate_tuple(element, context)
-
-    def generate_tuple(self, element: Any, context: HTMLContext) -> None:
-        element_dict = _dict(element)
-        a = context.airium
-        slots = list(self.ordered_slots(context))
-        with a.span():
-            for slot in slots:
-                v = element_dict.get(slot.name, None)
-                if not _empty(v):
-                    self.generate(v, context.extend(slot, "span"))
-
-    def generate_atom(self, element: PRIMITIVE, context: HTMLContext) -> None:
+    def _start_pages(
+        self,
+        frame: _Frame,
+        size: int,
+        page_size: int,
+        keys: Optional[List[Any]],
+        collection: Optional[COLLECTION],
+        context: Optional[Context],
+    ) -> None:
         """
-        Generate HTML for an atom.
+        Start a table split into pages of at most page_size rows, with a pager.
 
-        :param element:
-        :param context:
-        :return:
+        If there is a pager, only the first page is written to the document; the others
+        are handed to the pager, to be written to their own files once the document is
+        complete. Otherwise all pages are written to the document as separate tables.
         """
-        a = context.airium
-        sv = context.schemaview
-        url = None
-        et = context.current.element_type
-        if et in sv.all_types():
-            all_elt_types = sv.type_ancestors(et)
-            if "uri" in all_elt_types:
-                url = element
-            if "uriorcurie" in all_elt_types:
-                url = context.schemaview.expand_curie(element)
-            if url:
-                with a.a(href=url):
-                    a(element)
+        pager = self.pager if collection is not None and context is not None else None
+        if pager is not None:
+            key = pager.collection_key(context.source_path)
+        else:
+            key = self._anchor_id(frame, frame.slot.name)
+        n_pages = (size + page_size - 1) // page_size
+        links = []
+        for n in range(1, n_pages + 1):
+            if pager is None or n == 1:
+                links.append((str(n), f"#{key}-{n}"))
             else:
-                a(str(element))
-        elif et in sv.all_enums():
-            a(str(element))
+                links.append((str(n), pager.page_file_name(key, n)))
+        logger.debug(f"Splitting table {key} of {size} rows into {n_pages}")
+        self.renderer._write_pager_links(self.airium, links, 1)
+        if pager is not None:
+            # from page files, the first page is found in the main document
+            page_links = [(links[0][0], f"{pager.index_href or ''}{links[0][1]}")] + links[1:]
+            indexed = list(collection.items() if keys is not None else enumerate(collection))
+            for n in range(2, n_pages + 1):
+                pager.add(
+                    TablePage(
+                        path=Path(pager.directory) / pager.page_file_name(key, n),
+                        title=f"{key} ({n} of {n_pages})",
+                        rows=indexed[(n - 1) * page_size : n * page_size],
+                        slot_names=list(frame.columns),
+                        source_path=context.source_path,
+                        links=page_links,
+                        number=n,
+                    )
+                )
+            frame.stop_after_page = True
+        frame.key = key
+        frame.page_size = page_size
+        self._open_table(frame, id=f"{key}-1")
+
+    def end_collection(self, remaining) -> None:
+        self._pop()
+
+    def start_item(self, key) -> Descend:
+        a = self.airium
+        coll = self.stack[-1]
+        frame = _Frame(in_table=coll.in_table, slot=coll.slot, slot_uri=coll.slot_uri)
+        if coll.page_size and coll.count and coll.count % coll.page_size == 0:
+            if coll.stop_after_page:
+                return Descend.STOP
+            coll.table.__exit__(None, None, None)
+            self._open_table(coll, id=f"{coll.key}-{coll.count // coll.page_size + 1}")
+        coll.count += 1
+        if coll.layout == _ROW:
+            frame.layout = _ROW
+            frame.columns = coll.columns
+            self._enter(frame, a.tr())
+        elif coll.layout == _LIST:
+            self._enter(frame, a.li(class_="list-group-item"))
+        elif coll.layout == _BADGE:
+            frame.layout = _BADGE
+            self._enter(frame, a.span(class_="badge rounded-pill bg-light text-dark"))
+        elif coll.layout == _DL:
+            frame.layout = _DL
+            a.a(id=self._anchor_id(coll, key))
+            with a.h3():
+                a(key)
+        elif coll.layout == _TUPLE:
+            frame.layout = _TUPLE
+        return self._push(frame)
+
+    def end_item(self) -> None:
+        self._pop()
+
+    def atom(self, value, url) -> None:
+        a = self.airium
+        if self.stack[-1].layout == _BADGE:
+            a(value)
+        elif url:
+            with a.a(href=url):
+                a(value)
         else:
-            a(str(element))
-            # raise ValueError(f"ELEMENT {element}")
-
-    def generate_reference(self, element: str, context: HTMLContext) -> None:
-        """
-        Generate HTML for a reference.
+            a(str(value))
+
+    def reference(self, value) -> None:
+        self.airium(str(value))
+
+    def fragment_state(self) -> Optional[str]:
+        # pages of large tables are queued for the pager while rendering, so tables that
+        # may be paged are always rendered
+        if self.page is not None or (self.pager is not None and self._page_size()):
+            return None
+        if not isinstance(self.airium, StreamingAirium):
+            return None
+        parent = self.stack[-1]
+        return repr(
+            (
+                self.airium.current_level,
+                parent.layout,
+                parent.in_table,
+                parent.slot.name if parent.slot else None,
+                parent.slot_uri,
+                tuple(parent.columns) if parent.columns is not None else None,
+            )
+        )
+
+    def start_fragment(self) -> None:
+        self.airium.start_capture()
+
+    def end_fragment(self) -> str:
+        return self.airium.end_capture()
+
+    def splice(self, fragment: str) -> None:
+        self.airium.splice(fragment)
+
+    def finish(self) -> None:
+        self.airium.finish()
+        if self.pager:
+            profile = self.renderer.profile
+            if profile is not None:
+                with profile.phase("pages"):
+                    self.pager.write_pages(self.renderer, self.schemaview)
+            else:
+                self.pager.write_pages(self.renderer, self.schemaview)
 
-        :param element:
-        :param context:
-        :return:
-        """
-        a = context.airium
-        with a.a(href=element):
-            a(element)
 
-    def anchor_id(self, context: HTMLContext, index: str) -> str:
-        return f"{context.current_element_type.name}__{index}"
+def _columns(slots: List[SlotDefinition]) -> Dict[str, Tuple[int, SlotDefinition]]:
+    return {slot.name: (i, slot) for i, slot in enumerate(slots)}
@@ -1,22 +1,43 @@
 import logging
 from dataclasses import dataclass, field
 from io import StringIO
-from typing import Any, List, Optional, Tuple, Union
+from typing import Dict, List, Optional, TextIO, Union
 
 from linkml_runtime import SchemaView
+from linkml_runtime.linkml_model import SlotDefinition
 from linkml_runtime.utils.yamlutils import YAMLRoot
 from pydantic import BaseModel
 
-from linkml_renderer.paths.context import Context
-from linkml_renderer.renderers.renderer import Renderer, _dict, _empty
-from linkml_renderer.style.model import RenderElementType
+from linkml_renderer.renderers.fragments import CapturingSink
+from linkml_renderer.renderers.renderer import Renderer
+from linkml_renderer.renderers.streaming import SINK
+from linkml_renderer.renderers.traversal import Descend, TraversalBackend
+from linkml_renderer.style.model import RenderElementType, RenderType
 
 logger = logging.getLogger(__name__)
 
+# how the children of a frame are laid out
+_VALUE = "value"
+_SLOT_ROWS = "slot_rows"
+_ROW = "row"
+_LIST = "list"
+_DL = "dl"
+_TUPLE = "tuple"
+
+# how the slots of an object are laid out
+_OBJECT = "object"
+
 
 @dataclass
 class MarkdownWriter:
-    s: StringIO = field(default_factory=lambda: StringIO())
+    """
+    Writes Markdown constructs to a text sink.
+
+    By default output is collected in memory, but any writable text stream may be
+    passed in, in which case output goes straight to the stream.
+    """
+
+    s: TextIO = field(default_factory=lambda: StringIO())
 
     def h(self, level: int, text: str):
         self.block(f"{'#' * level} {text}")
@@ -54,14 +75,6 @@ class MarkdownWriter:
         return self.s.getvalue()
 
 
-@dataclass
-class MarkdownContext(Context):
-    markdown_writer: MarkdownWriter = field(default_factory=lambda: MarkdownWriter())
-
-    def __repr__(self) -> str:
-        return super().__repr__()
-
-
 @dataclass
 class MarkdownRenderer(Renderer):
     """
@@ -79,6 +92,8 @@ class MarkdownRenderer(Renderer):
     >>>     print(renderer.render(instance, sv))
     """
 
+    render_type = RenderType.MARKDOWN
+
     def render(
         self,
         element: Union[YAMLRoot, BaseModel],
@@ -106,289 +121,291 @@ class MarkdownRenderer(Renderer):
         :param kwargs: additional args
         :return: Markdown string
         """
-        ctxt = MarkdownContext(schemaview=schemaview)
-        if source_element_name:
-            ctxt.set_root(source_element_name)
-        self.generate(element, ctxt)
-        return str(ctxt.markdown_writer)
-
-    def generate(self, element: Union[YAMLRoot, BaseModel], context: MarkdownContext) -> None:
-        """
-        Generate markdown for a YAMLRoot object.
+        stream = StringIO()
+        self.render_to(stream, element, schemaview, source_element_name)
+        return stream.getvalue()
 
-        May be top level, in which case head/body tags are generated.
-
-        :param element:
-        :param context:
-        :return:
-        """
-        if context.source_path is None:
-            # TODO: refactor
-            if isinstance(element, YAMLRoot):
-                root = type(element).class_name
-            else:
-                roots = [c.name for c in context.schemaview.all_classes().values() if c.tree_root]
-                if len(roots) != 1:
-                    raise ValueError(f"Cannot determine root class for {element}")
-                root = roots[0]
-            context.set_root(root)
-        logger.info(f"Current context: {context}")
-        if context.current.slot:
-            render_as = self.style_engine.slot_render_as(context.current.slot.name)
-        else:
-            render_as = None
-        if context.target_depth == 0:
-            return self.generate_document(element, context)
-        elif element is None:
-            return
-        elif context.in_collection:
-            if isinstance(element, list):
-                elements = list(enumerate(element))
-            elif isinstance(element, dict):
-                elements = list(element.items())
-            else:
-                raise TypeError(f"Unexpected type for collection: {type(element)}")
-            logger.debug(f"Collection {context.current.slot.name} render_as={render_as}")
-            if render_as is None:
-                if context.in_object:
-                    render_as = RenderElementType.table
-                else:
-                    render_as = RenderElementType.simple_list
-            if render_as == RenderElementType.table:
-                if "table" in context.target_path:
-                    logger.debug(f"Will not nest table in table for {context}")
-                    return
-                return self.elements_to_table(elements, context)
-            elif render_as == RenderElementType.simple_list:
-                return self.elements_to_unordered_list(elements, context)
-            elif render_as == RenderElementType.description_list:
-                return self.elements_to_description_lists(elements, context)
-            elif render_as == RenderElementType.TUPLE:
-                return self.elements_to_tuples(elements, context)
-            else:
-                raise ValueError(f"Unknown render_as {render_as}")
-        elif context.in_object:
-            if not isinstance(element, (dict, YAMLRoot, BaseModel)):
-                raise TypeError(f"Unexpected type for class: {type(element)}")
-            if render_as == RenderElementType.TUPLE:
-                return self.generate_tuple(element, context)
-            else:
-                return self.generate_object(element, context)
-        elif context.in_object_reference:
-            return self.generate_reference(element, context)
-        else:
-            # TODO: enums
-            return self.generate_atom(element, context)
-
-    def generate_document(
-        self, element: Union[YAMLRoot, BaseModel], context: MarkdownContext
+    def render_to(
+        self,
+        stream: SINK,
+        element: Union[YAMLRoot, BaseModel],
+        schemaview: SchemaView,
+        source_element_name: Optional[str] = None,
+        **kwargs,
     ) -> None:
         """
-        Generate markdown top level document for a YAMLRoot object.
+        Write markdown for a YAMLRoot object to a stream as it is generated.
 
-        :param element:
-        :param context:
-        :return:
-        """
-        # TODO: add any frontmatter here
-        title = "DEFAULT"
-        if self.style_engine:
-            title_slot = self.style_engine.title_slot(context.current_element_type.name)
-            if title_slot:
-                title = _dict(element).get(title_slot, None)
-                if title:
-                    context.markdown_writer.h1(title)
-        self.generate(element, context.extend(None, "body"))
-
-    def generate_object(self, element: Union[YAMLRoot, dict], context: MarkdownContext) -> None:
+        :param stream: text or binary file-like object to write to
+        :param element: LinkML instance to render
+        :param schemaview: SchemaView which the element conforms to
+        :param source_element_name: Root element name, inferred from tree_root if not present
+        :param kwargs: additional args
         """
-        Generate markdown for an inner YAMLRoot object.
-
-        Not top level, so no head/body tags are generated.
+        backend = self.create_backend(stream, schemaview)
+        self.traversal_engine(schemaview).walk(element, backend, source_element_name)
+        backend.finish()
 
-        :param element:
-        :param context:
-        :return:
+    def create_backend(self, stream: SINK, schemaview: SchemaView, **kwargs) -> "MarkdownBackend":
         """
-        a = context.markdown_writer
-        sv = context.schemaview
-        element_dict = _dict(element)
-        in_table = False
-
-        for slot in self.slots(context):
-            if slot.name not in element_dict:
-                continue
-            v = element_dict.get(slot.name, None)
-            if _empty(v):
-                continue
-            if slot.readonly:
-                continue
-            # print(f"Slot {slot.name} v={v}")
-
-            url = sv.get_uri(slot, expand=True)
-            if slot.range in sv.all_classes() and slot.inlined:
-                in_table = False
-                a.h(context.target_depth + 1, slot.name)
-                self.generate(v, context.extend(slot, "dl"))
-            else:
-                if not in_table:
-                    a.table_header(["Slot", "Value"])
-                    in_table = True
-                new_context = context.extend(slot, "table")
-                if new_context.in_collection:
-                    if isinstance(v, list):
-                        vs = list(enumerate(v))
-                    elif isinstance(v, dict):
-                        vs = list(v.items())
-                    else:
-                        raise TypeError(f"Unexpected type for collection: {type(v)}")
-                    for ix, v in vs:
-                        a.w("|")
-                        a.w(f"{slot.name}[?]({url})")
-                        a.w("|")
-                        self.generate(v, new_context.index_extend(ix, v))
-                        a.w("|\n")
-                else:
-                    a.w("|")
-                    a.w(f"{slot.name}[?]({url})")
-                    a.w("|")
-                    self.generate(v, new_context)
-                    a.w("|\n")
-
-    def elements_to_unordered_list(
-        self, indexed_elements: List[Tuple[Any, Any]], context: MarkdownContext
-    ) -> None:
-        """
-        Generate Markdown for a list of objects.
+        Create a backend that writes Markdown to a stream.
 
-        :param indexed_elements:
-        :param context:
-        :return:
+        :param stream: text or binary file-like object to write to
+        :param schemaview: SchemaView which the elements conform to
+        :param kwargs: additional args
+        :return: backend
         """
-        logger.debug(f"Generating list of {len(indexed_elements)} elements")
-        a = context.markdown_writer
-        if context.target_depth < 1:
-            for ix, element in indexed_elements:
-                element_context = context.index_extend(ix, "li")
-                a.w("\n * ")
-                self.generate(element, element_context)
-                a.w("\n")
-        else:
-            for ix, element in indexed_elements:
-                element_context = context.index_extend(ix)
-                a.w(" ")
-                self.generate(element, element_context)
+        return MarkdownBackend(self, MarkdownWriter(self.output_sink(stream)), schemaview)
+
+
+class _Frame:
+    """State of an open node of the document."""
+
+    __slots__ = (
+        "layout",
+        "mode",
+        "depth",
+        "in_table",
+        "slot",
+        "slot_uri",
+        "columns",
+        "next_column",
+        "in_slot_table",
+        "count",
+        "closing",
+    )
+
+    def __init__(
+        self,
+        layout: str = _VALUE,
+        depth: int = 0,
+        in_table: bool = False,
+        slot: Optional[SlotDefinition] = None,
+        slot_uri: Optional[str] = None,
+    ):
+        self.layout = layout
+        self.mode: Optional[str] = None
+        self.depth = depth
+        self.in_table = in_table
+        self.slot = slot
+        self.slot_uri = slot_uri
+        self.columns: Optional[Dict[str, int]] = None
+        self.next_column = 0
+        self.in_slot_table = False
+        self.count = 0
+        self.closing: Optional[str] = None
+
+
+class MarkdownBackend(TraversalBackend):
+    """
+    Writes the structure of an instance as Markdown.
 
-    def elements_to_description_lists(
-        self, indexed_elements: List[Tuple[Any, YAMLRoot]], context: MarkdownContext
-    ) -> None:
-        a = context.markdown_writer
-        if len(indexed_elements) == 0:
-            return
-        for ix, element in indexed_elements:
-            a.h3(ix)
-            self.generate_object(element, context.index_extend(ix, "h"))
+    Atomic slots of an object are written as rows of a Slot/Value table, and inlined
+    objects under a heading one level below their parent. Headings are nested
+    according to how deeply the output is nested, as in the HTML rendering.
+    """
 
-    def elements_to_table(
-        self, indexed_elements: List[Tuple[Any, YAMLRoot]], context: MarkdownContext
-    ) -> None:
-        """
-        Generate markdown table for a list of objects.
+    def __init__(self, renderer: MarkdownRenderer, writer: MarkdownWriter, schemaview: SchemaView):
+        self.renderer = renderer
+        self.writer = writer
+        self.schemaview = schemaview
+        self.stack: List[_Frame] = [_Frame()]
 
-        :param elements:
-        :param context:
-        :return:
-        """
-        if len(indexed_elements) == 0:
-            return
-        logger.debug(f"Generating table for {indexed_elements}")
-        a = context.markdown_writer
-        populated_slots = set()
-        all_slots = list(self.slots(context))
-        slots_to_check = list(all_slots)
-        for _, element in indexed_elements:
-            for slot in slots_to_check:
-                if not _empty(_dict(element).get(slot.name, None)):
-                    populated_slots.add(slot.name)
-            slots_to_check = [slot for slot in slots_to_check if slot.name not in populated_slots]
-        slots = [slot for slot in all_slots if slot.name in populated_slots]
-        a.table_header([slot.name for slot in slots])
-        for _, element in indexed_elements:
-            element_dict = _dict(element)
-            a.w("|")
-            for slot in slots:
-                self.generate(element_dict.get(slot.name, None), context.extend(slot, "table"))
-                a.w("|")
-            a.w("\n")
-
-    def elements_to_tuples(
-        self, indexed_elements: List[Tuple[Any, YAMLRoot]], context: MarkdownContext
-    ) -> None:
-        """
-        Generate simple tuples for a list of objects.
+    def _push(self, frame: _Frame) -> Descend:
+        self.stack.append(frame)
+        return Descend.VISIT
 
-        When writing tuples, the attributes/keys are omitted, as the position of the value is
-        intended to be sufficient to identify it.
+    def _pop(self) -> _Frame:
+        frame = self.stack.pop()
+        if frame.closing:
+            self.writer.w(frame.closing)
+        return frame
 
-        :param elements:
-        :param context:
-        :return:
-        """
-        if len(indexed_elements) == 0:
-            return
-        logger.debug(f"Generating tuples for {indexed_elements}")
-        a = context.markdown_writer
-        n = 0
-        for _, element in indexed_elements:
-            if n:
-                a.w(", ")
-            n += 1
-            self.generate_tuple(element, context)
-
-    def generate_tuple(self, element: Any, context: MarkdownContext) -> None:
-        element_dict = _dict(element)
-        a = context.markdown_writer
-        slots = list(self.slots(context))
-        for slot in slots:
-            v = element_dict.get(slot.name, None)
-            if not _empty(v):
-                self.generate(v, context.extend(slot, "span"))
+    def start_document(self, class_name, title_slot, title) -> None:
+        # TODO: add any frontmatter here
+        if title_slot and title:
+            self.writer.h1(title)
+        self.stack.append(_Frame(depth=self.stack[-1].depth + 1))
+
+    def end_document(self) -> None:
+        self._pop()
+
+    def start_object(self, class_name, identifier, title, description) -> Descend:
+        parent = self.stack[-1]
+        frame = _Frame(depth=parent.depth, in_table=parent.in_table)
+        if parent.layout == _ROW:
+            frame.mode = _ROW
+            frame.columns = parent.columns
+        elif parent.layout == _DL:
+            frame.mode = _OBJECT
+        elif parent.layout == _TUPLE or (
+            self.renderer.render_as(parent.slot, parent.slot_uri) == RenderElementType.TUPLE
+        ):
+            frame.mode = _TUPLE
+        else:
+            frame.mode = _OBJECT
+        return self._push(frame)
+
+    def end_object(self) -> None:
+        frame = self.stack[-1]
+        if frame.mode == _ROW:
+            self.writer.w("|" * (len(frame.columns) - frame.next_column))
+        self._pop()
+
+    def start_slot(self, slot, slot_uri, empty) -> Descend:
+        a = self.writer
+        obj = self.stack[-1]
+        frame = _Frame(depth=obj.depth + 1, in_table=obj.in_table, slot=slot, slot_uri=slot_uri)
+        if obj.mode == _ROW:
+            column = obj.columns.get(slot.name)
+            if column is None:
+                return Descend.SKIP
+            a.w("|" * (column - obj.next_column))
+            obj.next_column = column + 1
+            frame.in_table = True
+            frame.closing = "|"
+        elif empty:
+            return Descend.SKIP
+        elif obj.mode == _TUPLE:
+            frame.closing = " "
+        elif slot.readonly:
+            return Descend.SKIP
+        elif slot.range in self.schemaview.all_classes() and slot.inlined:
+            obj.in_slot_table = False
+            a.h(obj.depth + 1, slot.name)
+        else:
+            if not obj.in_slot_table:
+                a.table_header(["Slot", "Value"])
+                obj.in_slot_table = True
+            frame.in_table = True
+            if slot.multivalued:
+                # each member of the collection gets its own row
+                frame.layout = _SLOT_ROWS
+            else:
+                a.w("|")
+                a.w(f"{slot.name}[?]({slot_uri})")
+                a.w("|")
+                frame.closing = "|\n"
+        return self._push(frame)
+
+    def end_slot(self) -> None:
+        self._pop()
+
+    def start_collection(
+        self, size, keys, columns, collection=None, context=None, stats=None
+    ) -> Descend:
+        parent = self.stack[-1]
+        frame = _Frame(
+            depth=parent.depth,
+            in_table=parent.in_table,
+            slot=parent.slot,
+            slot_uri=parent.slot_uri,
+        )
+        if parent.layout == _SLOT_ROWS:
+            frame.layout = _SLOT_ROWS
+            return self._push(frame)
+        render_as = self.renderer.render_as(parent.slot, parent.slot_uri)
+        if render_as is None:
+            if columns is not None:
+                render_as = RenderElementType.table
+            else:
+                render_as = RenderElementType.simple_list
+        if render_as == RenderElementType.table:
+            if parent.in_table:
+                logger.debug(f"Will not nest table in table for {parent.slot.name}")
+                return Descend.SKIP
+            if size == 0:
+                return Descend.SKIP
+            columns = columns or []
+            self.writer.table_header([slot.name for slot in columns])
+            frame.layout = _ROW
+            frame.columns = {slot.name: i for i, slot in enumerate(columns)}
+        elif render_as == RenderElementType.simple_list:
+            frame.layout = _LIST
+        elif render_as == RenderElementType.description_list:
+            if size == 0:
+                return Descend.SKIP
+            frame.layout = _DL
+        elif render_as == RenderElementType.TUPLE:
+            if size == 0:
+                return Descend.SKIP
+            frame.layout = _TUPLE
+        else:
+            raise ValueError(f"Unknown render_as {render_as}")
+        return self._push(frame)
+
+    def end_collection(self, remaining) -> None:
+        self._pop()
+
+    def start_item(self, key) -> Descend:
+        a = self.writer
+        coll = self.stack[-1]
+        frame = _Frame(
+            depth=coll.depth, in_table=coll.in_table, slot=coll.slot, slot_uri=coll.slot_uri
+        )
+        if coll.layout == _SLOT_ROWS:
+            a.w("|")
+            a.w(f"{coll.slot.name}[?]({coll.slot_uri})")
+            a.w("|")
+            frame.depth += 1
+            frame.closing = "|\n"
+        elif coll.layout == _ROW:
+            a.w("|")
+            frame.layout = _ROW
+            frame.columns = coll.columns
+            frame.closing = "\n"
+        elif coll.layout == _LIST:
+            if coll.depth < 1:
+                a.w("\n * ")
+                frame.depth += 1
+                frame.closing = "\n"
+            else:
                 a.w(" ")
+        elif coll.layout == _DL:
+            a.h3(key)
+            frame.layout = _DL
+            frame.depth += 1
+        elif coll.layout == _TUPLE:
+            if coll.count:
+                a.w(", ")
+            frame.layout = _TUPLE
+        coll.count += 1
+        return self._push(frame)
 
-    def generate_reference(self, element: str, context: MarkdownContext) -> None:
-        """
-        Generate Markdown for a reference.
-
-        :param element:
-        :param context:
-        :return:
-        """
-        a = context.markdown_writer
-        a.link(element, element)
-
-    def generate_atom(self, element: Any, context: MarkdownContext) -> None:
-        """
-        Generate HTML for an atom.
+    def end_item(self) -> None:
+        self._pop()
 
-        :param element:
-        :param context:
-        :return:
-        """
-        a = context.markdown_writer
-        sv = context.schemaview
-        url = None
-        et = context.current.element_type
-        if et in sv.all_types():
-            all_elt_types = sv.type_ancestors(et)
-            if "uri" in all_elt_types:
-                url = element
-            if "uriorcurie" in all_elt_types:
-                url = context.schemaview.expand_curie(element)
-            if url:
-                a.link(url, element)
-            else:
-                a.w(str(element))
-        elif et in sv.all_enums():
-            a.w(str(element))
+    def atom(self, value, url) -> None:
+        if value is None:
+            return
+        if url:
+            self.writer.link(url, value)
         else:
-            raise ValueError(f"ELEMENT {element}")
+            self.writer.w(str(value))
+
+    def reference(self, value) -> None:
+        self.writer.link(value, value)
+
+    def fragment_state(self) -> Optional[str]:
+        parent = self.stack[-1]
+        return repr(
+            (
+                parent.layout,
+                parent.depth,
+                parent.in_table,
+                parent.slot.name if parent.slot else None,
+                parent.slot_uri,
+                tuple(parent.columns) if parent.columns is not None else None,
+            )
+        )
+
+    def start_fragment(self) -> None:
+        if not isinstance(self.writer.s, CapturingSink):
+            self.writer.s = CapturingSink(self.writer.s)
+        self.writer.s.start_capture()
+
+    def end_fragment(self) -> str:
+        return self.writer.s.end_capture()
+
+    def splice(self, fragment: str) -> None:
+        self.writer.w(fragment)
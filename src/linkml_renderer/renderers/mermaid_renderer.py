@@ -1,18 +1,25 @@
 import logging
 from dataclasses import dataclass, field
 from io import StringIO
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional
 
 from linkml_runtime import SchemaView
-from linkml_runtime.utils.yamlutils import YAMLRoot
-from pydantic import BaseModel
+from linkml_runtime.linkml_model import SlotDefinition
 
-from linkml_renderer.paths.context import Context
-from linkml_renderer.renderers.renderer import LINKML_INSTANCE, Renderer, _dict, _empty
-from linkml_renderer.style.model import LineStyle, Shape
+from linkml_renderer.renderers.renderer import LINKML_INSTANCE, Renderer
+from linkml_renderer.renderers.streaming import SINK
+from linkml_renderer.renderers.traversal import Descend, TraversalBackend
+from linkml_renderer.style.model import LineStyle, RenderType, Shape
 
 logger = logging.getLogger(__name__)
 
+# kinds of frame
+_OBJECT = "object"
+_SLOT = "slot"
+_COLLECTION = "collection"
+_VALUES = "values"
+_ITEM = "item"
+
 
 def _escape(v: Any):
     v = str(v)
@@ -70,11 +77,42 @@ class MermaidWriter:
 
 
 @dataclass
-class MermaidContext(Context):
-    mermaid_writer: MermaidWriter = field(default_factory=lambda: MermaidWriter())
+class DiagramBudget:
+    """
+    Limits on the size of a diagram, and how much of them has been used in a render.
+
+    Parts of the instance beyond a limit are not traversed; they are shown as a single
+    summary node such as "+ 4,812 more". A limit of None means no limit.
+    """
+
+    max_nodes: Optional[int] = None
+    """Maximum number of object and collection nodes, not counting summary nodes."""
+
+    max_depth: Optional[int] = None
+    """Maximum number of slots between the root and a node."""
+
+    max_fan_out: Optional[int] = None
+    """Maximum number of members of a collection shown."""
 
-    def __repr__(self) -> str:
-        return super().__repr__()
+    nodes: int = 0
+    """Nodes drawn so far."""
+
+    summaries: int = 0
+    """Summary nodes drawn so far."""
+
+    @property
+    def exhausted(self) -> bool:
+        """True if no more nodes may be drawn."""
+        return self.max_nodes is not None and self.nodes >= self.max_nodes
+
+    def too_deep(self, depth: int) -> bool:
+        """
+        True if a node at a given depth would exceed the depth limit.
+
+        :param depth: number of slots between the root and the node
+        :return:
+        """
+        return self.max_depth is not None and depth > self.max_depth
 
 
 @dataclass
@@ -83,8 +121,7 @@ class MermaidRenderer(Renderer):
     A renderer that generates mermaid.
     """
 
-    element_to_id: Dict[str, str] = field(default_factory=lambda: {})
-    last_id: int = field(default_factory=lambda: 0)
+    render_type = RenderType.MERMAID
 
     def render(
         self,
@@ -113,108 +150,207 @@ class MermaidRenderer(Renderer):
         :param kwargs: additional args
         :return: mermaid serialization of the element as a string
         """
-        ctxt = MermaidContext(schemaview=schemaview)
-        if source_element_name:
-            ctxt.set_root(source_element_name)
-        self.generate(element, ctxt)
-        return str(ctxt.mermaid_writer)
+        stream = StringIO()
+        self.render_to(stream, element, schemaview, source_element_name)
+        return stream.getvalue()
 
-    def generate(self, element: Union[YAMLRoot, BaseModel], context: MermaidContext) -> None:
+    def render_to(
+        self,
+        stream: SINK,
+        element: LINKML_INSTANCE,
+        schemaview: SchemaView,
+        source_element_name: Optional[str] = None,
+        **kwargs,
+    ) -> None:
         """
-        Generate mermaid for a YAMLRoot object.
-
-        May be top level, in which case head/body tags are generated.
+        Write mermaid for a YAMLRoot object to a stream as it is generated.
 
-        :param element:
-        :param context:
-        :return:
+        :param stream: text or binary file-like object to write to
+        :param element: LinkML instance to render
+        :param schemaview: SchemaView which the element conforms to
+        :param source_element_name: Root element name, inferred from tree_root if not present
+        :param kwargs: additional args
         """
-        if context.source_path is None:
-            # TODO: refactor
-            if isinstance(element, YAMLRoot):
-                root = type(element).class_name
-            else:
-                roots = [c.name for c in context.schemaview.all_classes().values() if c.tree_root]
-                if len(roots) != 1:
-                    raise ValueError(f"Cannot determine root class for {element}")
-                root = roots[0]
-            context.set_root(root)
-        logger.info(f"Current context: {context}")
-        if context.target_depth == 0:
-            return self.generate_document(element, context)
-        else:
-            self.generate_node(element, context)
+        backend = self.create_backend(stream, schemaview)
+        self.traversal_engine(schemaview).walk(element, backend, source_element_name)
+        backend.finish()
 
-    def generate_document(
-        self, element: Union[YAMLRoot, BaseModel], context: MermaidContext
-    ) -> None:
+    def create_backend(self, stream: SINK, schemaview: SchemaView, **kwargs) -> "MermaidBackend":
         """
-        Generate mermaid top level document for a YAMLRoot object.
+        Create a backend that writes a mermaid diagram to a stream.
 
-        :param element:
-        :param context:
-        :return:
-        """
-        # TODO: add any frontmatter here
-        a = context.mermaid_writer
-        a.header("graph TB")
-        self.generate(element, context.extend(None, "body"))
-
-    def _id(self, element: Any, context: MermaidContext) -> str:
-        sv = context.schemaview
-        et = context.current_element_type.name
-        id_slot = sv.get_identifier_slot(et)
-        if id_slot and not context.in_collection:
-            element_dict = _dict(element)
-            id_val = _escape(element_dict.get(id_slot.name)).replace(" ", "_")
-            return id_val
-        element_str = str(element)
-        if element_str not in self.element_to_id:
-            self.last_id += 1
-            self.element_to_id[element_str] = f"{et}_{self.last_id}"
-        return f"ANON__f{self.element_to_id[element_str]}"
-
-    def generate_node(
-        self, element: Union[YAMLRoot, dict], context: MermaidContext
-    ) -> Optional[str]:
+        :param stream: text or binary file-like object to write to
+        :param schemaview: SchemaView which the elements conform to
+        :param kwargs: additional args
+        :return: backend, with a fresh budget
         """
-        Generate mermaid for an inner YAMLRoot object.
+        return MermaidBackend(MermaidWriter(self.output_sink(stream)), self.diagram_budget())
 
-        Not top level, so no head/body tags are generated.
+    def diagram_budget(self) -> DiagramBudget:
+        """
+        A fresh budget with the limits from the configuration.
 
-        :param element:
-        :param context:
         :return:
         """
-        if not context.in_object:
-            return None
-        a = context.mermaid_writer
-        et = context.current_element_type.name
-        id_value = self._id(element, context)
-        if context.in_collection:
-            a.entity(id_value, " ", Shape.DIAMOND)
-            vals = element.values() if isinstance(element, dict) else element
-            for val in vals:
-                obj_id = self.generate_node(val, context.index_extend("item"))
-                if obj_id:
-                    a.edge(id_value, None, obj_id, LineStyle.DASHED)
-            return id_value
-        local_atts = {}
-        for slot in self.slots(context):
-            element_dict = _dict(element)
-            if slot.name not in element_dict:
-                continue
-            v = element_dict.get(slot.name, None)
-            if _empty(v):
-                continue
-            if slot.readonly:
-                continue
-            new_context = context.extend(slot)
-            obj_id = self.generate_node(v, new_context)
-            if obj_id:
-                a.edge(id_value, slot.name, obj_id)
+        if self.style_engine is None:
+            return DiagramBudget()
+        config = self.style_engine.configuration
+        return DiagramBudget(
+            max_nodes=config.diagram_max_nodes,
+            max_depth=config.diagram_max_depth,
+            max_fan_out=config.diagram_max_fan_out,
+        )
+
+
+class _Frame:
+    """State of an open node of the diagram."""
+
+    __slots__ = ("kind", "id", "class_name", "atts", "has_slots", "slot", "child_id", "values")
+
+    def __init__(self, kind: str, id: Optional[str] = None, slot: Optional[SlotDefinition] = None):
+        self.kind = kind
+        self.id = id
+        self.class_name: Optional[str] = None
+        self.atts: Dict[str, str] = {}
+        self.has_slots = False
+        self.slot = slot
+        self.child_id: Optional[str] = None
+        self.values: Any = None
+
+
+class MermaidBackend(TraversalBackend):
+    """
+    Writes the structure of an instance as a mermaid graph.
+
+    Each inlined object is a node, showing its atomic slots; slots holding objects are
+    edges. Collections of objects are diamond nodes, with a dashed edge to each member.
+    Nodes beyond the limits of the budget are replaced by summary nodes.
+    """
+
+    def __init__(self, writer: MermaidWriter, budget: Optional[DiagramBudget] = None):
+        self.writer = writer
+        self.budget = budget or DiagramBudget()
+        self.stack: List[_Frame] = [_Frame(_ITEM)]
+        self._last_id = 0
+        self._depth = 0
+
+    def _anonymous_id(self, class_name: str) -> str:
+        self._last_id += 1
+        return f"ANON__f{class_name}_{self._last_id}"
+
+    def _summary(self, n: int) -> str:
+        budget = self.budget
+        budget.summaries += 1
+        summary_id = f"MORE__{budget.summaries}"
+        self.writer.entity(summary_id, f'"+ {n:,} more"', Shape.SQUARE)
+        return summary_id
+
+    def _set_value(self, value: Any) -> None:
+        parent = self.stack[-1]
+        if parent.kind == _SLOT:
+            parent.values = value
+        elif parent.kind == _ITEM and len(self.stack) > 1 and self.stack[-2].kind == _VALUES:
+            values = self.stack[-2].values
+            if isinstance(values, dict):
+                values[parent.id] = value
             else:
-                local_atts[slot.name] = str(v)
-            atts_str = "<br>".join([f"<b>{k}</b> {_escape(v)}" for k, v in local_atts.items()])
-            a.entity(id_value, f"{et}<br>{atts_str}")
-        return id_value
+                values.append(value)
+
+    def _over_budget(self) -> bool:
+        return self.budget.exhausted or self.budget.too_deep(self._depth)
+
+    def start_document(self, class_name, title_slot, title) -> None:
+        # TODO: add any frontmatter here
+        self.writer.header("graph TB")
+
+    def start_object(self, class_name, identifier, title, description) -> Descend:
+        parent = self.stack[-1]
+        if self._over_budget():
+            parent.child_id = self._summary(1)
+            return Descend.SKIP
+        self.budget.nodes += 1
+        if identifier is not None:
+            node_id = _escape(identifier).replace(" ", "_")
+        else:
+            node_id = self._anonymous_id(class_name)
+        parent.child_id = node_id
+        frame = _Frame(_OBJECT, node_id)
+        frame.class_name = class_name
+        self.stack.append(frame)
+        return Descend.VISIT
+
+    def end_object(self) -> None:
+        frame = self.stack.pop()
+        if frame.has_slots:
+            atts_str = "<br>".join([f"<b>{k}</b> {_escape(v)}" for k, v in frame.atts.items()])
+            self.writer.entity(frame.id, f"{frame.class_name}<br>{atts_str}")
+
+    def start_slot(self, slot, slot_uri, empty) -> Descend:
+        if empty or slot.readonly:
+            return Descend.SKIP
+        self.stack[-1].has_slots = True
+        self.stack.append(_Frame(_SLOT, slot=slot))
+        self._depth += 1
+        return Descend.VISIT
+
+    def end_slot(self) -> None:
+        frame = self.stack.pop()
+        self._depth -= 1
+        obj = self.stack[-1]
+        if frame.child_id:
+            self.writer.edge(obj.id, frame.slot.name, frame.child_id)
+        else:
+            obj.atts[frame.slot.name] = str(frame.values)
+
+    def start_collection(
+        self, size, keys, columns, collection=None, context=None, stats=None
+    ) -> Descend:
+        parent = self.stack[-1]
+        if columns is None:
+            frame = _Frame(_VALUES)
+            frame.values = {} if keys is not None else []
+            self.stack.append(frame)
+            return Descend.VISIT
+        if self._over_budget():
+            parent.child_id = self._summary(size)
+            return Descend.SKIP
+        self.budget.nodes += 1
+        node_id = self._anonymous_id(parent.slot.range)
+        parent.child_id = node_id
+        self.writer.entity(node_id, " ", Shape.DIAMOND)
+        frame = _Frame(_COLLECTION, node_id)
+        frame.values = 0
+        self.stack.append(frame)
+        return Descend.VISIT
+
+    def end_collection(self, remaining) -> None:
+        frame = self.stack.pop()
+        if frame.kind == _VALUES:
+            self._set_value(frame.values)
+        elif remaining:
+            summary_id = self._summary(remaining)
+            self.writer.edge(frame.id, None, summary_id, LineStyle.DASHED)
+
+    def start_item(self, key) -> Descend:
+        coll = self.stack[-1]
+        if coll.kind == _COLLECTION:
+            budget = self.budget
+            if budget.exhausted or (
+                budget.max_fan_out is not None and coll.values >= budget.max_fan_out
+            ):
+                return Descend.STOP
+            coll.values += 1
+        self.stack.append(_Frame(_ITEM, key))
+        return Descend.VISIT
+
+    def end_item(self) -> None:
+        frame = self.stack.pop()
+        coll = self.stack[-1]
+        if coll.kind == _COLLECTION and frame.child_id:
+            self.writer.edge(coll.id, None, frame.child_id, LineStyle.DASHED)
+
+    def atom(self, value, url) -> None:
+        self._set_value(value)
+
+    def reference(self, value) -> None:
+        self._set_value(value)
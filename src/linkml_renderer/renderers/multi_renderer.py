@@ -0,0 +1,195 @@
+"""Rendering of LinkML instances to several formats at once."""
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from io import StringIO
+from pathlib import Path
+from typing import Dict, Optional, Type, Union
+
+from linkml_runtime import SchemaView
+
+from linkml_renderer.renderers.mermaid_renderer import MermaidRenderer
+from linkml_renderer.renderers.pagination import TablePager, pager_for
+from linkml_renderer.renderers.profiling import RenderProfile
+from linkml_renderer.renderers.renderer import LINKML_INSTANCE, Renderer
+from linkml_renderer.renderers.streaming import DEFAULT_CHUNK_SIZE, SINK
+from linkml_renderer.renderers.traversal import TeeBackend, TraversalEngine
+from linkml_renderer.style.model import RenderType
+from linkml_renderer.style.style_engine import StyleEngine
+
+
+@dataclass
+class MultiRenderer:
+    """
+    Renders LinkML instances to several formats with a single traversal of each instance.
+
+    Schema, render plan and style lookups are done once per node and shared by the
+    backends of all formats, so producing HTML, Markdown and Mermaid together costs little
+    more than producing one of them. All renderers should share a style engine.
+
+    An HTML document that includes a diagram needs it before its body. If Mermaid is also
+    one of the formats, the diagram is rendered first and written as the Mermaid output;
+    otherwise the HTML renderer draws its own diagram in a separate pass.
+
+    >>> multi = MultiRenderer.for_formats({"html": HTMLRenderer, "markdown": MarkdownRenderer})
+    >>> outputs = multi.render(instance, sv)
+    >>> outputs["markdown"]
+    """
+
+    renderers: Dict[str, Renderer] = field(default_factory=dict)
+    """Renderer for each output format, by format name."""
+
+    @classmethod
+    def for_formats(
+        cls,
+        renderer_classes: Dict[str, Type[Renderer]],
+        style_engine: Optional[StyleEngine] = None,
+        profile: Optional[RenderProfile] = None,
+    ) -> "MultiRenderer":
+        """
+        Create renderers for several formats sharing a style engine.
+
+        :param renderer_classes: renderer class for each format
+        :param style_engine: configuration shared by all renderers
+        :param profile: if set, all renderers are profiled into it
+        :return: renderer for all formats
+        """
+        return cls(
+            {
+                fmt: rc(style_engine=style_engine, profile=profile)
+                for fmt, rc in renderer_classes.items()
+            }
+        )
+
+    @property
+    def style_engine(self) -> Optional[StyleEngine]:
+        """Style engine used for traversal, from the first renderer."""
+        for renderer in self.renderers.values():
+            return renderer.style_engine
+        return None
+
+    @property
+    def profile(self) -> Optional[RenderProfile]:
+        """Profile the shared traversal is counted in, from the first renderer."""
+        for renderer in self.renderers.values():
+            return renderer.profile
+        return None
+
+    def render(
+        self,
+        element: LINKML_INSTANCE,
+        schemaview: SchemaView,
+        source_element_name: Optional[str] = None,
+        **kwargs,
+    ) -> Dict[str, str]:
+        """
+        Render an element to every format.
+
+        :param element: LinkML instance to render
+        :param schemaview: SchemaView which the element conforms to
+        :param source_element_name: Root element name, inferred from tree_root if not present
+        :param kwargs: additional args
+        :return: rendering for each format
+        """
+        streams = {fmt: StringIO() for fmt in self.renderers}
+        self.render_to(streams, element, schemaview, source_element_name, **kwargs)
+        return {fmt: stream.getvalue() for fmt, stream in streams.items()}
+
+    def render_to(
+        self,
+        streams: Dict[str, SINK],
+        element: LINKML_INSTANCE,
+        schemaview: SchemaView,
+        source_element_name: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        pagers: Optional[Dict[str, TablePager]] = None,
+        **kwargs,
+    ) -> None:
+        """
+        Render an element to several streams, one per format, in a single traversal.
+
+        :param streams: stream to write each format to; formats without a stream are skipped
+        :param element: LinkML instance to render
+        :param schemaview: SchemaView which the element conforms to
+        :param source_element_name: Root element name, inferred from tree_root if not present
+        :param chunk_size: approximate number of characters to buffer between writes
+        :param pagers: pager for each HTML format, for pages of large tables
+        :param kwargs: additional args
+        """
+        pagers = pagers or {}
+        renderers = {fmt: r for fmt, r in self.renderers.items() if fmt in streams}
+        mermaid_format = None
+        for fmt, renderer in renderers.items():
+            if isinstance(renderer, MermaidRenderer):
+                mermaid_format = fmt
+                break
+        diagram = None
+        if mermaid_format is not None:
+            mermaid = renderers[mermaid_format]
+            if any(
+                getattr(r, "include_diagrams", False) and r.style_engine is mermaid.style_engine
+                for r in renderers.values()
+            ):
+                diagram = mermaid.render(element, schemaview, source_element_name)
+                mermaid.output_sink(streams[mermaid_format]).write(diagram)
+        backends = []
+        for fmt, renderer in renderers.items():
+            if fmt == mermaid_format and diagram is not None:
+                continue
+            backend_kwargs = {}
+            if getattr(renderer, "include_diagrams", False):
+                if diagram is not None and renderer.style_engine is mermaid.style_engine:
+                    backend_kwargs["diagram"] = diagram
+                else:
+                    backend_kwargs["diagram"] = renderer.diagram(
+                        element, schemaview, source_element_name
+                    )
+            backends.append(
+                renderer.create_backend(
+                    streams[fmt],
+                    schemaview,
+                    chunk_size=chunk_size,
+                    pager=pagers.get(fmt),
+                    **backend_kwargs,
+                )
+            )
+        if not backends:
+            return
+        backend = backends[0] if len(backends) == 1 else TeeBackend(backends)
+        engine = TraversalEngine(schemaview, self.style_engine, self.profile)
+        engine.walk(element, backend, source_element_name)
+        backend.finish()
+
+    def render_to_files(
+        self,
+        paths: Dict[str, Union[str, Path]],
+        element: LINKML_INSTANCE,
+        schemaview: SchemaView,
+        source_element_name: Optional[str] = None,
+        jobs: int = 1,
+        **kwargs,
+    ) -> None:
+        """
+        Render an element to one file per format, in a single traversal.
+
+        Pages of large HTML tables are written next to the HTML file.
+
+        :param paths: file to write each format to
+        :param element: LinkML instance to render
+        :param schemaview: SchemaView which the element conforms to
+        :param source_element_name: Root element name, inferred from tree_root if not present
+        :param jobs: number of worker processes used to write pages of large tables
+        :param kwargs: additional args
+        """
+        pagers = {
+            fmt: pager_for(path, jobs=jobs)
+            for fmt, path in paths.items()
+            if self.renderers[fmt].render_type == RenderType.HTML
+        }
+        with ExitStack() as stack:
+            streams = {
+                fmt: stack.enter_context(open(path, "w", encoding="utf-8"))
+                for fmt, path in paths.items()
+            }
+            self.render_to(
+                streams, element, schemaview, source_element_name, pagers=pagers, **kwargs
+            )
@@ -0,0 +1,169 @@
+"""Splitting of large collection tables into separate pages."""
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from linkml_runtime import SchemaView
+
+from linkml_renderer.paths.context import ObjectPath
+
+_worker_state: Optional[Tuple[Any, SchemaView]] = None
+"""Renderer and schema loaded once per page-writing worker process."""
+
+
+@dataclass
+class TablePage:
+    """A page of rows of a collection table, to be written to its own file."""
+
+    path: Path
+    """File the page is written to."""
+
+    title: str
+    """Title of the page document."""
+
+    rows: List[Tuple[Any, Any]]
+    """Indexed elements on this page."""
+
+    slot_names: List[str]
+    """Columns of the table, shared by all pages of the collection."""
+
+    source_path: ObjectPath
+    """Path to the collection slot, used to render the rows in context."""
+
+    links: List[Tuple[str, str]]
+    """Label and href of every page of the collection, for the pager."""
+
+    number: int
+    """Number of this page, counting from 1."""
+
+
+@dataclass
+class TablePager:
+    """
+    Collects pages of large tables and writes each one to a file.
+
+    Tables with more rows than the configured ``table_page_size`` keep their first page in
+    the main document, followed by links to the other pages. The remaining pages are queued
+    here while the main document is rendered, and written afterwards by :meth:`write_pages`,
+    optionally across a pool of worker processes.
+
+    Page files are named after the main document and the path to the collection, e.g.
+    ``report-persons-2.html`` for the second page of the ``persons`` table in ``report.html``.
+    """
+
+    directory: Union[str, Path]
+    """Directory page files are written to, usually that of the main document."""
+
+    prefix: str = ""
+    """Prepended to the name of each page file, usually the stem of the main document."""
+
+    index_href: Optional[str] = None
+    """Link from page files back to the main document."""
+
+    jobs: int = 1
+    """Number of worker processes used to write pages; 1 writes them in this process."""
+
+    pending: List[TablePage] = field(default_factory=list)
+    """Pages queued but not yet written."""
+
+    written: List[Path] = field(default_factory=list)
+    """Files written so far."""
+
+    _keys: Dict[str, int] = field(default_factory=dict, repr=False)
+
+    def collection_key(self, source_path: ObjectPath) -> str:
+        """
+        A name for a collection that is unique within the document.
+
+        :param source_path: path to the collection slot
+        :return: name made of the slot names and indexes along the path
+        """
+        parts = []
+        for component in source_path.components:
+            if component.slot is not None:
+                parts.append(component.slot.name)
+            if component.index is not None:
+                parts.append(str(component.index))
+        key = re.sub(r"[^A-Za-z0-9_.-]+", "_", "-".join(parts)) or "table"
+        n = self._keys.get(key, 0) + 1
+        self._keys[key] = n
+        return key if n == 1 else f"{key}_{n}"
+
+    def page_file_name(self, key: str, number: int) -> str:
+        """
+        The file name of a page of a collection.
+
+        :param key: from :meth:`collection_key`
+        :param number: page number, counting from 1
+        :return: file name, relative to the directory
+        """
+        stem = f"{self.prefix}-{key}" if self.prefix else key
+        return f"{stem}-{number}.html"
+
+    def add(self, page: TablePage) -> None:
+        """
+        Queue a page to be written.
+
+        :param page:
+        """
+        self.pending.append(page)
+
+    def write_pages(self, renderer: Any, schemaview: SchemaView) -> List[Path]:
+        """
+        Write all queued pages.
+
+        :param renderer: HTML renderer used for the main document
+        :param schemaview: schema the rows conform to
+        :return: files written, in page order
+        """
+        pages, self.pending = self.pending, []
+        if not pages:
+            return []
+        Path(self.directory).mkdir(parents=True, exist_ok=True)
+        if self.jobs <= 1 or len(pages) <= 1:
+            for page in pages:
+                _write_page(renderer, schemaview, page)
+        else:
+            chunk_size = max(1, len(pages) // (self.jobs * 4))
+            with ProcessPoolExecutor(
+                max_workers=self.jobs, initializer=_init_worker, initargs=(renderer, schemaview)
+            ) as executor:
+                for _ in executor.map(_write_page_in_worker, pages, chunksize=chunk_size):
+                    pass
+        paths = [page.path for page in pages]
+        self.written.extend(paths)
+        return paths
+
+
+def pager_for(output_path: Union[str, Path], jobs: int = 1) -> TablePager:
+    """
+    Create a pager that writes page files next to a main document.
+
+    :param output_path: file the main document is written to
+    :param jobs: number of worker processes used to write pages
+    :return: pager
+    """
+    output_path = Path(output_path)
+    return TablePager(
+        directory=output_path.parent,
+        prefix=output_path.stem,
+        index_href=output_path.name,
+        jobs=jobs,
+    )
+
+
+def _write_page(renderer: Any, schemaview: SchemaView, page: TablePage) -> None:
+    with open(page.path, "w", encoding="utf-8") as stream:
+        renderer.write_table_page(stream, page, schemaview)
+
+
+def _init_worker(renderer: Any, schemaview: SchemaView) -> None:
+    global _worker_state
+    _worker_state = (renderer, schemaview)
+
+
+def _write_page_in_worker(page: TablePage) -> None:
+    renderer, schemaview = _worker_state
+    _write_page(renderer, schemaview, page)
@@ -0,0 +1,233 @@
+"""
+Rendering of the large top-level collections of a single document on a pool of processes.
+
+A document such as a container of hundreds of thousands of persons is mostly made of the
+members of a few collections held by the root object. With a :class:`ParallelRender` set
+on a renderer, each such collection is split into work units of consecutive members, and
+the units are rendered by worker processes while the main process renders the rest of
+the document. Workers walk the document restricted to the members of their unit, and
+capture the output of each member as a fragment, together with the state of the backend
+it was written in. The main process splices the fragments in, in the original order, as
+it reaches each member; a member whose fragment was written in another state than that of
+the main render is rendered again in the main process, so the output is always the same
+as that of a serial render.
+
+This works for backends that support fragments, such as HTML and Markdown, when tables
+are not split into pages. Workers receive the instance when they start: with the default
+``fork`` start method on Linux it is inherited, elsewhere it is pickled for each worker.
+"""
+import io
+import math
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from copy import copy
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+from linkml_runtime import SchemaView
+from linkml_runtime.linkml_model import SlotDefinition
+
+from linkml_renderer.renderers.accessor import slot_getter
+from linkml_renderer.renderers.render_plan import render_plan_cache
+from linkml_renderer.renderers.traversal import DocumentParts, TraversalBackend
+
+DEFAULT_MIN_MEMBERS = 1000
+"""Collections with fewer members than this are rendered in the main process."""
+
+UNITS_PER_JOB = 4
+"""Number of work units a collection is split into per worker, unless a unit size is set."""
+
+PART = Tuple[str, str]
+"""State of the backend a member was written in, and its output."""
+
+_worker_state: Optional[Tuple[Any, SchemaView, Any, str]] = None
+"""Renderer, schema, instance and root class, set once per worker process."""
+
+
+@dataclass(frozen=True)
+class WorkUnit:
+    """Consecutive members of a top-level collection, rendered by one worker."""
+
+    slot_name: str
+    """Slot of the root object holding the collection."""
+
+    start: int
+    """Position of the first member of the unit."""
+
+    stop: int
+    """Position after the last member of the unit."""
+
+
+@dataclass
+class ParallelRender:
+    """
+    Settings for rendering the large top-level collections of a document in parallel.
+
+    >>> renderer = HTMLRenderer(parallel=ParallelRender(jobs=8))
+    >>> renderer.render_to(stream, container, sv)
+    """
+
+    jobs: int
+    """Number of worker processes; 1 renders everything in the main process."""
+
+    min_members: int = DEFAULT_MIN_MEMBERS
+    """Collections with fewer members are rendered in the main process."""
+
+    unit_size: Optional[int] = None
+    """Members per work unit; by default, a collection is split into
+    :data:`UNITS_PER_JOB` units per worker."""
+
+    def parts(self, renderer: Any, schemaview: SchemaView) -> Optional[DocumentParts]:
+        """
+        Create the parts of one render, for a traversal engine.
+
+        :param renderer: renderer of the document
+        :param schemaview: schema of the document
+        :return: parts, or None if there is a single job
+        """
+        if self.jobs <= 1:
+            return None
+        return ParallelParts(self, renderer, schemaview)
+
+    def units(self, slot_name: str, size: int) -> List[WorkUnit]:
+        """
+        Split a collection into work units.
+
+        :param slot_name: slot of the root object holding the collection
+        :param size: number of members of the collection
+        :return: units covering all members, in order; none for a small collection
+        """
+        if size < max(self.min_members, 1):
+            return []
+        unit_size = self.unit_size or math.ceil(size / (self.jobs * UNITS_PER_JOB))
+        return [
+            WorkUnit(slot_name, start, min(start + unit_size, size))
+            for start in range(0, size, unit_size)
+        ]
+
+
+class ParallelParts(DocumentParts):
+    """
+    Members of the large top-level collections of one document, rendered by workers.
+
+    The pool is started when the walk reaches the root object, and stopped when the walk
+    is over; units not needed by then are cancelled.
+    """
+
+    def __init__(self, options: ParallelRender, renderer: Any, schemaview: SchemaView):
+        """
+        :param options: settings
+        :param renderer: renderer of the document, copied for the workers
+        :param schemaview: schema of the document
+        """
+        self.options = options
+        self.renderer = renderer
+        self.schemaview = schemaview
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._units: Dict[str, Deque[Tuple[WorkUnit, Union[Future, Dict[int, PART]]]]] = {}
+
+    def _collection_slots(self, class_name: str) -> List[SlotDefinition]:
+        classes = self.schemaview.all_classes()
+        return [
+            slot
+            for slot in render_plan_cache.get(self.schemaview, class_name).ordered_slots
+            if slot.multivalued and slot.inlined and slot.range in classes
+        ]
+
+    def start(self, element: Any, class_name: str, backend: TraversalBackend) -> None:
+        # a backend that cannot splice fragments renders everything itself
+        if backend.fragment_state() is None:
+            return
+        get = slot_getter(element)
+        units = []
+        for slot in self._collection_slots(class_name):
+            value = get(slot.name)
+            if isinstance(value, (list, dict)):
+                units.extend(self.options.units(slot.name, len(value)))
+        if not units:
+            return
+        # workers render without the settings that record what the main render does
+        worker_renderer = copy(self.renderer)
+        worker_renderer.parallel = None
+        worker_renderer.profile = None
+        worker_renderer.fragments = None
+        self._executor = ProcessPoolExecutor(
+            max_workers=min(self.options.jobs, len(units)),
+            initializer=_init_worker,
+            initargs=(worker_renderer, self.schemaview, element, class_name),
+        )
+        for unit in units:
+            future = self._executor.submit(_render_unit, unit)
+            self._units.setdefault(unit.slot_name, deque()).append((unit, future))
+
+    def finish(self) -> None:
+        if self._executor is not None:
+            for units in self._units.values():
+                for _, result in units:
+                    if isinstance(result, Future):
+                        result.cancel()
+            self._executor.shutdown()
+            self._executor = None
+        self._units = {}
+
+    def get(self, slot_name: str, position: int, state: str) -> Optional[str]:
+        units = self._units.get(slot_name)
+        # members are reached in order, so units before the current one are done with
+        while units:
+            unit, result = units[0]
+            if position < unit.start:
+                return None
+            if position < unit.stop:
+                break
+            units.popleft()
+        else:
+            return None
+        if isinstance(result, Future):
+            result = result.result()
+            units[0] = (unit, result)
+        part = result.get(position)
+        if part is None or part[0] != state:
+            return None
+        return part[1]
+
+
+class _UnitParts(DocumentParts):
+    """The members of one work unit, captured by a walk in a worker."""
+
+    def __init__(self, unit: WorkUnit):
+        self.unit = unit
+        self.captured: Dict[int, PART] = {}
+
+    def root_slots(self, slots: List[SlotDefinition]) -> List[SlotDefinition]:
+        return [slot for slot in slots if slot.name == self.unit.slot_name]
+
+    def members(self, slot_name: str, size: int) -> Optional[range]:
+        if slot_name != self.unit.slot_name:
+            return None
+        return range(self.unit.start, min(self.unit.stop, size))
+
+    def put(self, slot_name: str, position: int, state: str, text: str) -> None:
+        self.captured[position] = (state, text)
+
+
+class _NullSink(io.TextIOBase):
+    """Discards the output of a walk in a worker; only captured fragments are kept."""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+
+def _init_worker(renderer: Any, schemaview: SchemaView, element: Any, class_name: str) -> None:
+    global _worker_state
+    _worker_state = (renderer, schemaview, element, class_name)
+
+
+def _render_unit(unit: WorkUnit) -> Dict[int, PART]:
+    renderer, schemaview, element, class_name = _worker_state
+    parts = _UnitParts(unit)
+    engine = renderer.traversal_engine(schemaview)
+    engine.parts = parts
+    backend = renderer.create_backend(_NullSink(), schemaview)
+    engine.walk(element, backend, class_name)
+    backend.finish()
+    return parts.captured
@@ -0,0 +1,292 @@
+"""
+Counters and timers for finding out where the time of a render goes.
+
+Profiling is off unless a :class:`RenderProfile` is set on a renderer. While it is on, the
+schema and style lookups of a render are counted and timed by wrapping the methods of the
+SchemaView and StyleEngine in use, the traversal is counted by a backend that forwards
+every call, and output is counted by a sink that measures what each writer writes. When
+it is off, none of these wrappers exist, so rendering costs nothing extra.
+"""
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional
+
+from linkml_runtime import SchemaView
+
+from linkml_renderer.paths.context import Context
+from linkml_renderer.renderers.traversal import Descend, TraversalBackend
+from linkml_renderer.style.style_engine import StyleEngine
+
+SCHEMA_LOOKUPS = [
+    "class_induced_slots",
+    "induced_slot",
+    "get_uri",
+    "get_identifier_slot",
+    "type_ancestors",
+    "expand_curie",
+]
+"""SchemaView methods that are counted and timed."""
+
+STYLE_LOOKUPS = ["slot_render_as", "title_slot", "description_slot", "matching_rule"]
+"""StyleEngine methods that are counted and timed."""
+
+
+@dataclass
+class RenderProfile:
+    """
+    Counters and timers accumulated over one or more renders.
+
+    Counters are named by what they count: ``schema.get_uri`` for calls to a SchemaView
+    method, ``style.slot_render_as`` for style lookups, ``context.copies``,
+    ``visit.objects``, ``visit.atoms`` and so on for the traversal, and ``bytes.html``
+    for output written by a writer. Timers hold seconds per phase (``phase.traverse``,
+    ``phase.diagram``, ``phase.pages``) or per lookup (``schema.get_uri``).
+
+    >>> renderer = HTMLRenderer(profile=RenderProfile())
+    >>> html = renderer.render(instance, sv)
+    >>> print(renderer.profile.summary())
+    """
+
+    counters: Dict[str, int] = field(default_factory=dict)
+    timers: Dict[str, float] = field(default_factory=dict)
+    _instrumented: int = field(default=0, repr=False)
+
+    def count(self, name: str, n: int = 1) -> None:
+        """
+        Add to a counter.
+
+        :param name: counter name
+        :param n: amount to add
+        """
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """
+        Add to a timer.
+
+        :param name: timer name
+        :param seconds: time to add
+        """
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time a phase of rendering.
+
+        :param name: phase name, recorded as ``phase.<name>``
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(f"phase.{name}", time.perf_counter() - start)
+
+    @contextmanager
+    def instrument(
+        self, schemaview: SchemaView, style_engine: Optional[StyleEngine] = None
+    ) -> Iterator[None]:
+        """
+        Count and time schema lookups, style lookups and context copies within a block.
+
+        Methods are wrapped on the given objects only, and restored when the block ends.
+        Nested blocks, such as the diagram drawn inside an HTML render, share the wrappers
+        of the outermost block.
+
+        :param schemaview: schema used by the render
+        :param style_engine: style used by the render, if any
+        """
+        if self._instrumented:
+            self._instrumented += 1
+            try:
+                yield
+            finally:
+                self._instrumented -= 1
+            return
+        patched = []
+        for name in SCHEMA_LOOKUPS:
+            patched.append(self._wrap(schemaview, name, f"schema.{name}"))
+        if style_engine is not None:
+            for name in STYLE_LOOKUPS:
+                patched.append(self._wrap(style_engine, name, f"style.{name}"))
+        original_copy = Context._copy
+
+        def counted_copy(context: Context) -> Context:
+            self.count("context.copies")
+            return original_copy(context)
+
+        Context._copy = counted_copy
+        self._instrumented = 1
+        try:
+            yield
+        finally:
+            self._instrumented = 0
+            Context._copy = original_copy
+            for obj, name in patched:
+                del obj.__dict__[name]
+
+    def _wrap(self, obj: Any, name: str, counter: str) -> Any:
+        method = getattr(obj, name)
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.add_time(counter, time.perf_counter() - start)
+                self.count(counter)
+
+        obj.__dict__[name] = wrapper
+        return obj, name
+
+    def backend(self, backend: TraversalBackend) -> TraversalBackend:
+        """
+        Wrap a backend so that the nodes of a traversal are counted.
+
+        :param backend: backend to forward calls to
+        :return: counting backend
+        """
+        return _CountingBackend(self, backend)
+
+    def sink(self, stream: IO[str], name: str) -> IO[str]:
+        """
+        Wrap a text sink so that the bytes written to it are counted.
+
+        :param stream: text sink, from :func:`text_sink`
+        :param name: writer name, recorded as ``bytes.<name>``
+        :return: counting sink
+        """
+        return _CountingSink(self, stream, f"bytes.{name}")
+
+    def merge(self, other: "RenderProfile") -> None:
+        """
+        Add the counters and timers of another profile to this one.
+
+        :param other: e.g. the profile of a worker process
+        """
+        for name, n in other.counters.items():
+            self.count(name, n)
+        for name, seconds in other.timers.items():
+            self.add_time(name, seconds)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """
+        The profile as plain data.
+
+        :return: counters and timers, by name
+        """
+        return {
+            "counters": dict(sorted(self.counters.items())),
+            "timers": dict(sorted(self.timers.items())),
+        }
+
+    def to_json(self) -> str:
+        """
+        The profile as JSON.
+
+        :return: JSON text
+        """
+        return json.dumps(self.to_dict(), indent=2)
+
+    def summary(self) -> str:
+        """
+        A plain text summary: counters, then timers, slowest first.
+
+        :return: summary
+        """
+        lines: List[str] = ["Counters:"]
+        for name, n in sorted(self.counters.items()):
+            lines.append(f"  {name:<32} {n:>12,}")
+        lines.append("Timers (s):")
+        for name, seconds in sorted(self.timers.items(), key=lambda kv: -kv[1]):
+            lines.append(f"  {name:<32} {seconds:>12.4f}")
+        return "\n".join(lines)
+
+
+class _CountingSink:
+    """Counts the UTF-8 size of text written to a sink."""
+
+    def __init__(self, profile: RenderProfile, stream: IO[str], counter: str):
+        self.profile = profile
+        self.stream = stream
+        self.counter = counter
+
+    def write(self, text: str) -> int:
+        self.profile.count(self.counter, len(text.encode("utf-8")))
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        flush: Optional[Callable[[], None]] = getattr(self.stream, "flush", None)
+        if flush is not None:
+            flush()
+
+
+class _CountingBackend(TraversalBackend):
+    """Counts the nodes of a traversal, and forwards every call to another backend."""
+
+    def __init__(self, profile: RenderProfile, backend: TraversalBackend):
+        self.profile = profile
+        self.backend = backend
+
+    def start_document(self, class_name, title_slot, title) -> None:
+        self.profile.count("visit.documents")
+        self.backend.start_document(class_name, title_slot, title)
+
+    def end_document(self) -> None:
+        self.backend.end_document()
+
+    def start_object(self, class_name, identifier, title, description) -> Descend:
+        self.profile.count("visit.objects")
+        return self.backend.start_object(class_name, identifier, title, description)
+
+    def end_object(self) -> None:
+        self.backend.end_object()
+
+    def start_slot(self, slot, slot_uri, empty) -> Descend:
+        self.profile.count("visit.slots")
+        return self.backend.start_slot(slot, slot_uri, empty)
+
+    def end_slot(self) -> None:
+        self.backend.end_slot()
+
+    def start_collection(
+        self, size, keys, columns, collection=None, context=None, stats=None
+    ) -> Descend:
+        self.profile.count("visit.collections")
+        return self.backend.start_collection(size, keys, columns, collection, context, stats)
+
+    def end_collection(self, remaining) -> None:
+        self.backend.end_collection(remaining)
+
+    def start_item(self, key) -> Descend:
+        self.profile.count("visit.items")
+        return self.backend.start_item(key)
+
+    def end_item(self) -> None:
+        self.backend.end_item()
+
+    def atom(self, value, url) -> None:
+        self.profile.count("visit.atoms")
+        self.backend.atom(value, url)
+
+    def reference(self, value) -> None:
+        self.profile.count("visit.references")
+        self.backend.reference(value)
+
+    def finish(self) -> None:
+        self.backend.finish()
+
+    def fragment_state(self) -> Optional[str]:
+        return self.backend.fragment_state()
+
+    def start_fragment(self) -> None:
+        self.backend.start_fragment()
+
+    def end_fragment(self) -> str:
+        return self.backend.end_fragment()
+
+    def splice(self, fragment: str) -> None:
+        self.profile.count("fragments.spliced")
+        self.backend.splice(fragment)
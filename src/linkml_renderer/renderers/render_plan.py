@@ -0,0 +1,198 @@
+"""Compiled, per-class metadata shared by all renderers."""
+import threading
+import weakref
+from collections import defaultdict
+from copy import copy
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from linkml_runtime import SchemaView
+from linkml_runtime.linkml_model import ClassDefinitionName, SlotDefinition, SlotDefinitionName
+
+DEFAULT_TITLE_CURIES = ["dcterms:title"]
+DEFAULT_DESCRIPTION_CURIES = ["dcterms:description", "skos:definition"]
+
+
+@dataclass
+class AttributeBlock:
+    """A block of attributes"""
+
+    name: str
+    """Name of the block. This may be the name of the slot group."""
+
+    attributes: List[SlotDefinition]
+    """Ordering of attributes within a block."""
+
+    title: Optional[str] = None
+    """Display title for the block."""
+
+    def __repr__(self):
+        return f"{self.name}: {[s.name for s in self.attributes]}"
+
+
+@dataclass
+class RenderPlan:
+    """
+    Everything a renderer needs to know about a class, computed once per class.
+
+    Renderers visit many instances of the same class; the plan moves all schema
+    lookups (induced slots, inlining, ordering, URIs) out of the per-object path.
+    A plan is shared by all renders, in all threads, and is not modified once compiled.
+    """
+
+    class_name: ClassDefinitionName
+    """Name of the class this plan was compiled for."""
+
+    slots: List[SlotDefinition] = field(default_factory=list)
+    """Induced slots in schema order, with inlining resolved."""
+
+    attribute_blocks: List[AttributeBlock] = field(default_factory=list)
+    """Induced slots grouped into blocks, ordered by rank."""
+
+    ordered_slots: List[SlotDefinition] = field(default_factory=list)
+    """Induced slots in display order (flattened attribute blocks)."""
+
+    slot_uris: Dict[SlotDefinitionName, str] = field(default_factory=dict)
+    """Expanded URI for each slot."""
+
+    slot_curies: Dict[SlotDefinitionName, str] = field(default_factory=dict)
+    """Unexpanded URI (typically a CURIE) for each slot."""
+
+    identifier_slot: Optional[SlotDefinition] = None
+    """Identifier slot of the class, if any."""
+
+    title_slot: Optional[SlotDefinitionName] = None
+    """First slot mapped to a title CURIE, if any."""
+
+    description_slot: Optional[SlotDefinitionName] = None
+    """First slot mapped to a description CURIE, if any."""
+
+    def slot_by_curie(self, curies: List[str]) -> Optional[SlotDefinitionName]:
+        """
+        Find the first slot whose URI is one of the given CURIEs.
+
+        :param curies: CURIEs to match against
+        :return: slot name, or None if no slot matches
+        """
+        for slot in self.slots:
+            if self.slot_curies[slot.name] in curies:
+                return slot.name
+        return None
+
+
+def _rank(slot: SlotDefinition) -> int:
+    if slot.rank is not None:
+        return slot.rank
+    if slot.key or slot.identifier:
+        return 0
+    return 9999
+
+
+def compile_render_plan(schemaview: SchemaView, class_name: ClassDefinitionName) -> RenderPlan:
+    """
+    Compile a render plan for a class.
+
+    The induced slots of the SchemaView are not modified; slots whose inlining is
+    resolved here are copies.
+
+    :param schemaview: schema the class belongs to
+    :param class_name: name of the class
+    :return: a new plan
+    """
+    sv = schemaview
+    all_classes = sv.all_classes()
+    slots = []
+    # TODO: move to schemaview
+    for slot in sv.class_induced_slots(class_name):
+        if not slot.inlined and (
+            slot.inlined_as_list
+            or (slot.range in all_classes and not sv.get_identifier_slot(slot.range))
+        ):
+            # the SchemaView caches its induced slots, and hands the same ones to everyone
+            slot = copy(slot)
+            slot.inlined = True
+        slots.append(slot)
+    groups = defaultdict(list)
+    for slot in sorted(slots, key=_rank):
+        slot_group = slot.slot_group
+        if slot_group is None:
+            if slot.identifier or slot.key:
+                slot_group = "key"
+        groups[slot_group].append(slot)
+    blocks = [AttributeBlock(name=group, attributes=members) for group, members in groups.items()]
+    plan = RenderPlan(
+        class_name=class_name,
+        slots=slots,
+        attribute_blocks=blocks,
+        ordered_slots=[s for b in blocks for s in b.attributes],
+        slot_uris={s.name: sv.get_uri(s, expand=True) for s in slots},
+        slot_curies={s.name: sv.get_uri(s.name) for s in slots},
+        identifier_slot=sv.get_identifier_slot(class_name),
+    )
+    plan.title_slot = plan.slot_by_curie(DEFAULT_TITLE_CURIES)
+    plan.description_slot = plan.slot_by_curie(DEFAULT_DESCRIPTION_CURIES)
+    return plan
+
+
+class RenderPlanCache:
+    """
+    Cache of render plans, keyed by (SchemaView, class).
+
+    Entries for a SchemaView are dropped when it is garbage collected, and
+    recompiled when it reports a modification. The cache may be used from several
+    threads at once; threads compiling the same plan at the same time all get the plan
+    that was cached first.
+    """
+
+    def __init__(self):
+        self._by_schema: Dict[int, Tuple[weakref.ref, int, Dict[str, RenderPlan]]] = {}
+        self._lock = threading.Lock()
+
+    def _plans(self, schemaview: SchemaView) -> Dict[str, RenderPlan]:
+        key = id(schemaview)
+        entry = self._by_schema.get(key)
+        if entry is None or entry[0]() is not schemaview or entry[1] != schemaview.modifications:
+            with self._lock:
+                entry = self._by_schema.get(key)
+                if (
+                    entry is None
+                    or entry[0]() is not schemaview
+                    or entry[1] != schemaview.modifications
+                ):
+                    ref = weakref.ref(schemaview, lambda _, k=key: self._by_schema.pop(k, None))
+                    entry = (ref, schemaview.modifications, {})
+                    self._by_schema[key] = entry
+        return entry[2]
+
+    def get(self, schemaview: SchemaView, class_name: ClassDefinitionName) -> RenderPlan:
+        """
+        Get the plan for a class, compiling it on first use.
+
+        :param schemaview: schema the class belongs to
+        :param class_name: name of the class
+        :return: cached plan
+        """
+        plans = self._plans(schemaview)
+        plan = plans.get(class_name)
+        if plan is None:
+            plan = plans.setdefault(class_name, compile_render_plan(schemaview, class_name))
+        return plan
+
+    def add(self, schemaview: SchemaView, plans: Iterable[RenderPlan]) -> None:
+        """
+        Cache plans compiled earlier, e.g. loaded with a snapshot of their schema.
+
+        :param schemaview: schema the plans were compiled from
+        :param plans: plans for any of its classes
+        """
+        entry = self._plans(schemaview)
+        for plan in plans:
+            entry[plan.class_name] = plan
+
+    def clear(self) -> None:
+        """Remove all cached plans."""
+        self._by_schema.clear()
+
+
+render_plan_cache = RenderPlanCache()
+"""Process-wide plan cache shared by all renderers."""
@@ -1,46 +1,83 @@
 """Base class for renderers that render LinkML instances to a format such as HTML, Markdown, etc."""
 from abc import ABC, abstractmethod
-from collections import defaultdict
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Union
+from io import StringIO
+from typing import (
+    IO,
+    Any,
+    AsyncIterator,
+    ClassVar,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
 
 from linkml_runtime import SchemaView
-from linkml_runtime.linkml_model import ClassDefinition, SlotDefinition
+from linkml_runtime.linkml_model import ClassDefinition, SlotDefinition, SlotDefinitionName
 from linkml_runtime.utils.yamlutils import YAMLRoot
 from pydantic import BaseModel
 
 from linkml_renderer.paths.context import Context
+from linkml_renderer.renderers.events import EVENT, replay
+from linkml_renderer.renderers.fragments import FragmentCache, RepeatCache
+from linkml_renderer.renderers.parallel import ParallelRender
+from linkml_renderer.renderers.profiling import RenderProfile
+from linkml_renderer.renderers.render_plan import AttributeBlock, RenderPlan, render_plan_cache
+from linkml_renderer.renderers.streaming import (
+    DEFAULT_CHUNK_SIZE,
+    SINK,
+    aiter_chunks,
+    iter_chunks,
+    text_sink,
+)
+from linkml_renderer.renderers.traversal import (  # noqa: F401
+    TraversalBackend,
+    TraversalEngine,
+    _empty,
+    infer_root,
+)
+from linkml_renderer.style.model import RenderElementType, RenderType
 from linkml_renderer.style.style_engine import StyleEngine
 
 LINKML_INSTANCE = Union[YAMLRoot, BaseModel, Dict[str, Any]]
 
 
-@dataclass
-class AttributeBlock:
-    """A block of attributes"""
-
-    name: str
-    """Name of the block. This may be the name of the slot group."""
-
-    attributes: List[SlotDefinition]
-    """Ordering of attributes within a block."""
-
-    title: Optional[str] = None
-    """Display title for the block."""
-
-    def __repr__(self):
-        return f"{self.name}: {[s.name for s in self.attributes]}"
-
-
 @dataclass
 class Renderer(ABC):
     """
     Base class for engines that render LinkML instances to a format such as HTML, Markdown, etc.
+
+    A renderer holds configuration only; the state of a render is kept by the traversal
+    engine and backend made for it. One renderer, with its style engine and SchemaView,
+    can therefore render in many threads at once, e.g. in a thread pool serving requests.
+    The exceptions are :attr:`profile` and :attr:`fragments`, which record what a render
+    did, and are meant for one render at a time.
     """
 
     style_engine: Optional[StyleEngine] = None
     """Configuration for mappings between schema elements and render engine elements."""
 
+    profile: Optional[RenderProfile] = None
+    """If set, counters and timers of every render are accumulated here."""
+
+    fragments: Optional[FragmentCache] = None
+    """If set, renders reuse the output of objects unchanged since the previous render."""
+
+    repeat_cache: Optional[RepeatCache] = None
+    """If set, the output of small objects that occur many times is rendered once per render."""
+
+    parallel: Optional[ParallelRender] = None
+    """If set, large top-level collections are rendered on a pool of worker processes."""
+
+    render_type: ClassVar[Optional[RenderType]] = None
+    """The type of output this renderer produces, used to select style rules."""
+
+    record_separator: ClassVar[str] = "\n"
+    """Written between renderings of consecutive elements by :meth:`render_many_to`."""
+
     @abstractmethod
     def render(
         self,
@@ -60,59 +97,300 @@ class Renderer(ABC):
         """
         raise NotImplementedError
 
-    def slots(self, context: Context) -> List[SlotDefinition]:
-        sv = context.schemaview
+    def render_to(
+        self,
+        stream: SINK,
+        element: LINKML_INSTANCE,
+        schemaview: SchemaView,
+        source_element_name: Optional[str] = None,
+        **kwargs,
+    ) -> None:
+        """
+        Render an element and all its children, writing the output to a stream.
+
+        Renderers that can write incrementally override this so that the full
+        output is never held in memory; by default the output of :meth:`render`
+        is written in one go.
+
+        :param stream: text or binary file-like object to write to
+        :param element: LinkML instance to render
+        :param schemaview: SchemaView which the element conforms to
+        :param source_element_name: Root element name, inferred from tree_root if not present
+        :param kwargs: additional args
+        """
+        text_sink(stream).write(self.render(element, schemaview, source_element_name, **kwargs))
+
+    def create_backend(self, stream: SINK, schemaview: SchemaView, **kwargs) -> TraversalBackend:
+        """
+        Create a backend that writes this renderer's output to a stream.
+
+        The backend is driven by a :class:`TraversalEngine`, possibly alongside the
+        backends of other renderers; call its ``finish`` method once the traversal is done.
+
+        :param stream: text or binary file-like object to write to
+        :param schemaview: SchemaView which the elements conform to
+        :param kwargs: additional args
+        :return: backend
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not render from a traversal")
+
+    def render_events(self, events: Iterable[EVENT], schemaview: SchemaView, **kwargs) -> str:
+        """
+        Render a recorded traversal.
+
+        :param events: events from an :class:`EventRecorder` or :func:`load_events`
+        :param schemaview: SchemaView the events were recorded against
+        :param kwargs: additional args
+        :return: rendering as a string, as :meth:`render` gives for the recorded instance
+        """
+        stream = StringIO()
+        self.render_events_to(stream, events, schemaview, **kwargs)
+        return stream.getvalue()
+
+    def render_events_to(
+        self, stream: SINK, events: Iterable[EVENT], schemaview: SchemaView, **kwargs
+    ) -> None:
+        """
+        Render a recorded traversal, writing the output to a stream.
+
+        The instance itself is not needed; the events are replayed into this renderer's
+        backend, so one traversal can be rendered many times, in any format.
+
+        :param stream: text or binary file-like object to write to
+        :param events: events from an :class:`EventRecorder` or :func:`load_events`
+        :param schemaview: SchemaView the events were recorded against
+        :param kwargs: additional args, passed to :meth:`create_backend`
+        """
+        backend = self.create_backend(stream, schemaview, **kwargs)
+        replay(events, backend, schemaview)
+        backend.finish()
+
+    def traversal_engine(self, schemaview: SchemaView) -> TraversalEngine:
+        """
+        Create an engine that walks instances using this renderer's style.
+
+        :param schemaview: SchemaView which the elements conform to
+        :return: engine
+        """
+        parts = None
+        # fragments of incremental renders are only kept for objects visited in this process
+        if self.parallel is not None and self.fragments is None:
+            parts = self.parallel.parts(self, schemaview)
+        return TraversalEngine(
+            schemaview, self.style_engine, self.profile, self.fragments, self.repeat_cache, parts
+        )
+
+    def output_sink(self, stream: SINK) -> IO[str]:
+        """
+        A text sink for a stream, which counts the bytes written when profiling.
+
+        :param stream: text or binary file-like object to write to
+        :return: object with a text ``write`` method
+        """
+        sink = text_sink(stream)
+        if self.profile is not None and self.render_type is not None:
+            sink = self.profile.sink(sink, self.render_type.value.lower())
+        return sink
+
+    def render_many(
+        self,
+        elements: Iterable[LINKML_INSTANCE],
+        schemaview: SchemaView,
+        source_element_name: Optional[str] = None,
+        **kwargs,
+    ) -> Iterator[str]:
+        """
+        Render a stream of elements, one at a time.
+
+        Elements are consumed lazily, and schema and style lookups are shared
+        across all of them.
+
+        :param elements: LinkML instances to render
+        :param schemaview: SchemaView which the elements conform to
+        :param source_element_name: Root element name, inferred from tree_root if not present
+        :param kwargs: additional args
+        :return: iterator over the rendering of each element
+        """
+        for element in elements:
+            yield self.render(element, schemaview, source_element_name, **kwargs)
+
+    def render_many_to(
+        self,
+        stream: SINK,
+        elements: Iterable[LINKML_INSTANCE],
+        schemaview: SchemaView,
+        source_element_name: Optional[str] = None,
+        **kwargs,
+    ) -> None:
+        """
+        Render a stream of elements into one output, with a section per element.
+
+        By default, renderings are written one after the other, separated by
+        :attr:`record_separator`.
+
+        :param stream: text or binary file-like object to write to
+        :param elements: LinkML instances to render
+        :param schemaview: SchemaView which the elements conform to
+        :param source_element_name: Root element name, inferred from tree_root if not present
+        :param kwargs: additional args
+        """
+        sink = text_sink(stream)
+        for i, element in enumerate(elements):
+            if i:
+                sink.write(self.record_separator)
+            self.render_to(sink, element, schemaview, source_element_name, **kwargs)
+
+    def render_iter(
+        self,
+        element: LINKML_INSTANCE,
+        schemaview: SchemaView,
+        source_element_name: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        **kwargs,
+    ) -> Iterator[str]:
+        """
+        Render an element and all its children, yielding the output in chunks.
+
+        Chunks are yielded as soon as they are produced, so the first chunk is
+        available before the whole tree has been visited, and at most a few chunks
+        are held in memory at a time. Concatenating the chunks gives the same
+        output as :meth:`render`.
+
+        :param element: LinkML instance to render
+        :param schemaview: SchemaView which the element conforms to
+        :param source_element_name: Root element name, inferred from tree_root if not present
+        :param chunk_size: approximate number of characters per chunk
+        :param kwargs: additional args
+        :return: iterator over chunks of the rendering
+        """
+
+        def produce(sink: IO[str]) -> None:
+            self.render_to(
+                sink, element, schemaview, source_element_name, chunk_size=chunk_size, **kwargs
+            )
+
+        return iter_chunks(produce, chunk_size=chunk_size)
+
+    def arender(
+        self,
+        element: LINKML_INSTANCE,
+        schemaview: SchemaView,
+        source_element_name: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        **kwargs,
+    ) -> AsyncIterator[str]:
+        """
+        Render an element and all its children, yielding the output in chunks to an event loop.
+
+        The asynchronous counterpart of :meth:`render_iter`, e.g. for the body of a
+        streaming response in an ASGI application:
+
+        .. code-block:: python
+
+            async for chunk in renderer.arender(obj, schemaview):
+                await send(chunk)
+
+        The render runs in a background thread, so the event loop is never blocked
+        by it, and is handed back control between chunks. Stopping early stops the
+        render.
+
+        :param element: LinkML instance to render
+        :param schemaview: SchemaView which the element conforms to
+        :param source_element_name: Root element name, inferred from tree_root if not present
+        :param chunk_size: approximate number of characters per chunk
+        :param kwargs: additional args
+        :return: asynchronous iterator over chunks of the rendering
+        """
+
+        def produce(sink: IO[str]) -> None:
+            self.render_to(
+                sink, element, schemaview, source_element_name, chunk_size=chunk_size, **kwargs
+            )
+
+        return aiter_chunks(produce, chunk_size=chunk_size)
+
+    def infer_root(self, element: LINKML_INSTANCE, context: Context) -> None:
+        """
+        Set the root of the context, if not already set.
+
+        The root is the class of a YAMLRoot instance, or else the single tree_root
+        class of the schema.
+
+        :param element: instance at the root of the tree
+        :param context: context to set the root on
+        """
+        infer_root(element, context)
+
+    def render_plan(self, context: Context) -> RenderPlan:
+        """
+        Compiled plan for the class at the current position.
+
+        :param context: current traversal context
+        :return: cached plan, shared across renderers
+        """
         cls = context.current_element_type
         if not isinstance(cls, ClassDefinition):
             raise TypeError(f"Expected ClassDefinition, got {cls}")
-        slots = sv.class_induced_slots(cls.name)
-        # TODO: move to schemaview
-        for slot in slots:
-            if slot.inlined_as_list:
-                slot.inlined = True
-            if not slot.inlined:
-                if slot.range in sv.all_classes():
-                    if not sv.get_identifier_slot(slot.range):
-                        slot.inlined = True
-        return slots
+        return render_plan_cache.get(context.schemaview, cls.name)
 
-    def attribute_blocks(self, context: Context) -> List[AttributeBlock]:
-        slots = self.slots(context)
-        blocks = []
-        groups = defaultdict(list)
-
-        def rank(slot: SlotDefinition) -> int:
-            if slot.rank is not None:
-                return slot.rank
-            if slot.key or slot.identifier:
-                return 0
-            return 9999
-
-        slots = sorted(slots, key=lambda s: rank(s))
-        for slot in slots:
-            slot_group = slot.slot_group
-            if slot_group is None:
-                if slot.identifier or slot.key:
-                    slot_group = "key"
-            groups[slot_group].append(slot)
-        for group, slots in groups.items():
-            blocks.append(AttributeBlock(name=group, attributes=slots))
-        return blocks
+    def slot_render_as(self, context: Context) -> Optional[RenderElementType]:
+        """
+        Configured rendering for the slot at the current position.
 
-    def ordered_slots(self, context: Context) -> List[SlotDefinition]:
-        return [s for b in self.attribute_blocks(context) for s in b.attributes]
+        :param context: current traversal context
+        :return: element type from the style engine, or None
+        """
+        slot = context.current.slot
+        if slot is None or self.style_engine is None:
+            return None
+        slot_uri = None
+        parent = context.source_path.parent
+        if parent is not None:
+            parent_plan = render_plan_cache.get(context.schemaview, parent.head.element_type)
+            slot_uri = parent_plan.slot_uris.get(slot.name)
+        return self.render_as(slot, slot_uri)
 
+    def render_as(
+        self, slot: Optional[SlotDefinition], slot_uri: Optional[str] = None
+    ) -> Optional[RenderElementType]:
+        """
+        Configured rendering for a slot.
 
-def _empty(v: Any) -> bool:
-    return v is None or v == [] or v == {}
+        :param slot: induced slot, or None at the root
+        :param slot_uri: URI of the slot, if known
+        :return: element type from the style engine, or None
+        """
+        if slot is None or self.style_engine is None:
+            return None
+        return self.style_engine.slot_render_as(slot.name, slot_uri, self.render_type)
 
+    def title_slot(self, context: Context) -> Optional[SlotDefinitionName]:
+        """
+        Slot holding the title of the object at the current position.
+
+        :param context: current traversal context
+        :return: slot name, or None
+        """
+        if self.style_engine is None:
+            return self.render_plan(context).title_slot
+        return self.style_engine.title_slot(context.current_element_type.name)
 
-def _dict(obj: Union[BaseModel, YAMLRoot, dict]) -> dict:
-    if isinstance(obj, BaseModel):
-        return obj.dict()
-    elif isinstance(obj, YAMLRoot):
-        return obj.__dict__
-    elif isinstance(obj, dict):
-        return obj
-    else:
-        raise ValueError(f"Cannot convert {obj} to dict")
+    def description_slot(self, context: Context) -> Optional[SlotDefinitionName]:
+        """
+        Slot holding the description of the object at the current position.
+
+        :param context: current traversal context
+        :return: slot name, or None
+        """
+        if self.style_engine is None:
+            return self.render_plan(context).description_slot
+        return self.style_engine.description_slot(context.current_element_type.name)
+
+    def slots(self, context: Context) -> List[SlotDefinition]:
+        return self.render_plan(context).slots
+
+    def attribute_blocks(self, context: Context) -> List[AttributeBlock]:
+        return self.render_plan(context).attribute_blocks
+
+    def ordered_slots(self, context: Context) -> List[SlotDefinition]:
+        return self.render_plan(context).ordered_slots
@@ -0,0 +1,326 @@
+"""Support for writing rendered output incrementally to a file-like sink."""
+import asyncio
+import io
+import queue
+import threading
+from typing import IO, Any, AsyncIterator, Callable, Iterator, List, Optional, Union
+
+from airium import Airium
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+"""Approximate number of characters buffered before output is written to a sink."""
+
+DEFAULT_MAX_PENDING_CHUNKS = 4
+"""Number of chunks a producer may get ahead of the consumer of a chunk iterator."""
+
+SINK = Union[IO[str], IO[bytes]]
+
+
+class _EncodingSink:
+    """Adapts a binary stream so that it accepts text."""
+
+    def __init__(self, stream: IO[bytes], encoding: str = "utf-8"):
+        self.stream = stream
+        self.encoding = encoding
+
+    def write(self, text: str) -> int:
+        self.stream.write(text.encode(self.encoding))
+        return len(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def _is_binary(stream: Any) -> bool:
+    if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)):
+        return True
+    if isinstance(stream, io.TextIOBase):
+        return False
+    return "b" in getattr(stream, "mode", "")
+
+
+def text_sink(stream: SINK, encoding: str = "utf-8") -> IO[str]:
+    """
+    Wrap a stream so that text can be written to it.
+
+    Text streams are returned unchanged; binary streams are wrapped so that text
+    is encoded on write. The underlying stream is never closed.
+
+    :param stream: text or binary file-like object
+    :param encoding: encoding used for binary streams
+    :return: object with a text ``write`` method
+    """
+    if _is_binary(stream):
+        return _EncodingSink(stream, encoding)
+    return stream
+
+
+class StreamingAirium(Airium):
+    """
+    An Airium document that writes completed lines to a sink as it goes.
+
+    Airium keeps every line of the document in memory until it is converted to a
+    string. This subclass writes out all but the most recent line whenever the
+    buffered text exceeds ``chunk_size`` characters. The most recent line is always
+    retained, as Airium may still append closing tags to it.
+
+    Call :meth:`finish` once the document is complete to write the remainder.
+    The concatenated output is identical to ``str()`` of a regular Airium document.
+
+    Output can also be captured, to be written again later with :meth:`splice`.
+    """
+
+    def __init__(self, sink: SINK, chunk_size: int = DEFAULT_CHUNK_SIZE, **kwargs):
+        super().__init__(**kwargs)
+        self._sink = text_sink(sink)
+        self._chunk_size = chunk_size
+        self._buffered = 0
+        self._captures: List[List[str]] = []
+
+    def append(self, element: str, new_line: bool = True) -> None:
+        # Airium accepts any object as text, and stringifies it when appending
+        element = str(element)
+        super().append(element, new_line)
+        self._buffered += len(element)
+        if self._buffered > self._chunk_size:
+            self._write_completed()
+
+    def _append_with_whitespaces(self, element: str) -> None:
+        super()._append_with_whitespaces(element)
+        if self._captures:
+            text = self._doc_elements[-1]
+            if len(self._doc_elements) > 1:
+                text = self.source_line_break_character + text
+            for capture in self._captures:
+                capture.append(text)
+
+    def _append_no_whitespaces(self, element: str) -> None:
+        super()._append_no_whitespaces(element)
+        for capture in self._captures:
+            capture.append(str(element))
+
+    def start_capture(self) -> None:
+        """Begin capturing the text added to the document."""
+        self.flush_()
+        self._captures.append([])
+
+    def end_capture(self) -> str:
+        """
+        Stop the most recent capture.
+
+        :return: text added since the matching :meth:`start_capture`
+        """
+        self.flush_()
+        return "".join(self._captures.pop())
+
+    def splice(self, text: str) -> None:
+        """
+        Add text captured earlier, as if it were being generated again.
+
+        The text is added as is, so it must have been captured at the same indentation.
+
+        :param text: from :meth:`end_capture`
+        """
+        self.flush_()
+        lines = text.split(self.source_line_break_character)
+        if self._doc_elements:
+            self._doc_elements[-1] += lines[0]
+        else:
+            self._doc_elements.append(lines[0])
+        self._doc_elements.extend(lines[1:])
+        for capture in self._captures:
+            capture.append(text)
+        self._buffered += len(text)
+        if self._buffered > self._chunk_size:
+            self._write_completed()
+
+    def _write_completed(self) -> None:
+        elements = self._doc_elements
+        if len(elements) > 1:
+            self._sink.write(self.source_line_break_character.join(elements[:-1]))
+            self._sink.write(self.source_line_break_character)
+            del elements[:-1]
+        self._buffered = len(elements[0]) if elements else 0
+
+    def finish(self) -> None:
+        """Close any dangling tags, write everything still buffered and flush the sink."""
+        self.flush_()
+        self._sink.write(self.source_line_break_character.join(self._doc_elements))
+        self._doc_elements.clear()
+        self._buffered = 0
+        if hasattr(self._sink, "flush"):
+            self._sink.flush()
+
+
+class _Cancelled(Exception):
+    """Raised in a producer when the consumer of its chunks has gone away."""
+
+
+_DONE = object()
+
+
+class _ChunkQueueSink:
+    """A text sink that groups writes into chunks and hands them to a bounded queue."""
+
+    def __init__(
+        self,
+        chunks: queue.Queue,
+        chunk_size: int,
+        cancelled: threading.Event,
+        notify: Optional[Callable[[], None]] = None,
+    ):
+        self._chunks = chunks
+        self._chunk_size = chunk_size
+        self._cancelled = cancelled
+        self._notify = notify
+        self._buffer: List[str] = []
+        self._buffered = 0
+
+    def write(self, text: str) -> int:
+        if self._cancelled.is_set():
+            raise _Cancelled()
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self._chunk_size:
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self.put("".join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+
+    def put(self, item: Any) -> None:
+        # block while the consumer is behind, but notice if it stops consuming
+        while True:
+            try:
+                self._chunks.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                if self._cancelled.is_set():
+                    raise _Cancelled() from None
+        if self._notify is not None:
+            self._notify()
+
+
+def _run_producer(
+    produce: Callable[[IO[str]], None], sink: _ChunkQueueSink, errors: List[BaseException]
+) -> None:
+    try:
+        try:
+            produce(sink)
+            sink.flush()
+        except _Cancelled:
+            return
+        except BaseException as e:
+            errors.append(e)
+        sink.put(_DONE)
+    except _Cancelled:
+        pass
+
+
+def iter_chunks(
+    produce: Callable[[IO[str]], None],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_pending: int = DEFAULT_MAX_PENDING_CHUNKS,
+) -> Iterator[str]:
+    """
+    Turn a function that writes to a stream into an iterator of chunks.
+
+    The producer runs in a background thread and writes to a sink that groups its
+    output into chunks of roughly ``chunk_size`` characters. At most ``max_pending``
+    chunks are held at any time; the producer blocks until the consumer catches up.
+    Exceptions raised by the producer are re-raised by the iterator. If the iterator
+    is closed early, the producer is stopped at its next write.
+
+    :param produce: function that writes all its output to the stream it is passed
+    :param chunk_size: approximate number of characters per chunk
+    :param max_pending: maximum number of chunks buffered between producer and consumer
+    :return: iterator over chunks of output, in order
+    """
+    chunks: queue.Queue = queue.Queue(maxsize=max_pending)
+    cancelled = threading.Event()
+    errors: List[BaseException] = []
+
+    sink = _ChunkQueueSink(chunks, chunk_size, cancelled)
+    thread = threading.Thread(
+        target=_run_producer,
+        args=(produce, sink, errors),
+        name="linkml-render-producer",
+        daemon=True,
+    )
+    thread.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is _DONE:
+                break
+            yield chunk
+    finally:
+        cancelled.set()
+    thread.join()
+    if errors:
+        raise errors[0]
+
+
+async def aiter_chunks(
+    produce: Callable[[IO[str]], None],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_pending: int = DEFAULT_MAX_PENDING_CHUNKS,
+) -> AsyncIterator[str]:
+    """
+    Turn a function that writes to a stream into an asynchronous iterator of chunks.
+
+    As :func:`iter_chunks`, but for use in an event loop: the producer runs in a
+    background thread, and the consumer awaits each chunk without blocking the loop.
+    Control is handed back to the loop between chunks, even when the producer is
+    ahead, so other tasks keep running during a long render. If the iterator is
+    closed early, or the task consuming it is cancelled, the producer is stopped at
+    its next write.
+
+    :param produce: function that writes all its output to the stream it is passed
+    :param chunk_size: approximate number of characters per chunk
+    :param max_pending: maximum number of chunks buffered between producer and consumer
+    :return: asynchronous iterator over chunks of output, in order
+    """
+    loop = asyncio.get_running_loop()
+    chunks: queue.Queue = queue.Queue(maxsize=max_pending)
+    cancelled = threading.Event()
+    ready = asyncio.Event()
+    errors: List[BaseException] = []
+
+    def notify() -> None:
+        try:
+            loop.call_soon_threadsafe(ready.set)
+        except RuntimeError:
+            # the loop has been closed under the consumer
+            raise _Cancelled() from None
+
+    sink = _ChunkQueueSink(chunks, chunk_size, cancelled, notify)
+    thread = threading.Thread(
+        target=_run_producer,
+        args=(produce, sink, errors),
+        name="linkml-render-producer",
+        daemon=True,
+    )
+    thread.start()
+    try:
+        while True:
+            try:
+                chunk = chunks.get_nowait()
+            except queue.Empty:
+                ready.clear()
+                # the producer may have put a chunk between the two calls
+                if chunks.empty():
+                    await ready.wait()
+                continue
+            if chunk is _DONE:
+                break
+            yield chunk
+            await asyncio.sleep(0)
+    finally:
+        cancelled.set()
+    # the producer has nothing left to do after handing over the end marker
+    if errors:
+        raise errors[0]
@@ -0,0 +1,701 @@
+"""
+Traversal of LinkML instances.
+
+A :class:`TraversalEngine` walks an instance once, and reports its structure to a
+:class:`TraversalBackend` as a sequence of calls: objects, their slots, collections and
+their items, atoms and references. The engine does all schema and style lookups; a
+backend only decides how to lay out what it is told about. Renderers are thin wrappers
+that create a backend for their output format and run the engine over it, and a
+:class:`TeeBackend` feeds several backends from a single traversal.
+"""
+import logging
+from dataclasses import dataclass, field
+from enum import IntEnum
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from linkml_runtime import SchemaView
+from linkml_runtime.linkml_model import SlotDefinition, SlotDefinitionName
+from linkml_runtime.utils.yamlutils import YAMLRoot
+
+from linkml_renderer.paths.context import Context
+from linkml_renderer.renderers.accessor import is_object, slot_getter, slot_value
+from linkml_renderer.renderers.columns import ColumnStats, scan_columns
+from linkml_renderer.renderers.render_plan import RenderPlan, render_plan_cache
+from linkml_renderer.style.style_engine import StyleEngine
+
+if TYPE_CHECKING:
+    from linkml_renderer.renderers.fragments import FragmentCache, RepeatCache
+    from linkml_renderer.renderers.profiling import RenderProfile
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = Union[list, dict]
+
+
+class Descend(IntEnum):
+    """What a backend wants the engine to do with a node it has just been told about."""
+
+    SKIP = 0
+    """Do not visit the contents of the node, and do not call its end hook."""
+
+    VISIT = 1
+    """Visit the contents of the node, then call its end hook."""
+
+    STOP = 2
+    """For items only: skip this item and all remaining items of the collection."""
+
+
+class TraversalBackend:
+    """
+    Receives the structure of an instance from a :class:`TraversalEngine`.
+
+    Every ``start_`` hook returns a :class:`Descend` (or a bool); if it is falsy, the
+    contents of the node are skipped and the matching ``end_`` hook is not called.
+    The default implementation of each hook does nothing and visits everything.
+    """
+
+    def start_document(
+        self, class_name: str, title_slot: Optional[SlotDefinitionName], title: Any
+    ) -> None:
+        """
+        Called before the root object of a document.
+
+        :param class_name: class of the root object
+        :param title_slot: slot holding the title of the root object, if any
+        :param title: value of the title slot, or None
+        """
+
+    def end_document(self) -> None:
+        """Called after the root object of a document."""
+
+    def start_object(
+        self, class_name: str, identifier: Any, title: Any, description: Any
+    ) -> Descend:
+        """
+        Called before the slots of an object.
+
+        :param class_name: class of the object
+        :param identifier: value of the identifier slot, or None
+        :param title: value of the title slot, or None
+        :param description: value of the description slot, or None
+        :return: whether to visit the slots
+        """
+        return Descend.VISIT
+
+    def end_object(self) -> None:
+        """Called after the slots of an object."""
+
+    def start_slot(self, slot: SlotDefinition, slot_uri: str, empty: bool) -> Descend:
+        """
+        Called before the value of a slot. Slots are visited in render plan order,
+        and slots with no value are not visited.
+
+        :param slot: induced slot
+        :param slot_uri: URI of the slot
+        :param empty: True if the value is an empty collection
+        :return: whether to visit the value
+        """
+        return Descend.VISIT
+
+    def end_slot(self) -> None:
+        """Called after the value of a slot."""
+
+    def start_collection(
+        self,
+        size: int,
+        keys: Optional[List[Any]],
+        columns: Optional[List[SlotDefinition]],
+        collection: Optional[COLLECTION] = None,
+        context: Optional[Context] = None,
+        stats: Optional[List[ColumnStats]] = None,
+    ) -> Descend:
+        """
+        Called before the items of a multivalued slot.
+
+        :param size: number of items
+        :param keys: keys of a dict collection, or None for a list
+        :param columns: slots populated in at least one item, in render plan order,
+            or None if the items are not inlined objects
+        :param collection: the collection itself; only available during a traversal
+        :param context: position of the collection; only available during a traversal
+        :param stats: occupancy, width and types of each column, in the same order;
+            only available during a traversal
+        :return: whether to visit the items
+        """
+        return Descend.VISIT
+
+    def end_collection(self, remaining: int) -> None:
+        """
+        Called after the items of a collection.
+
+        :param remaining: number of items not visited because a backend returned STOP
+        """
+
+    def start_item(self, key: Any) -> Descend:
+        """
+        Called before an item of a collection.
+
+        :param key: list index or dict key
+        :return: whether to visit the item, or STOP to end the collection here
+        """
+        return Descend.VISIT
+
+    def end_item(self) -> None:
+        """Called after an item of a collection."""
+
+    def atom(self, value: Any, url: Optional[str]) -> None:
+        """
+        Called for a value of a type or enum.
+
+        :param value: the value, which may be None for missing table cells
+        :param url: link for values of uri and uriorcurie types, else None
+        """
+
+    def reference(self, value: Any) -> None:
+        """
+        Called for a reference to an object that is not inlined.
+
+        :param value: identifier of the referenced object
+        """
+
+    def finish(self) -> None:
+        """Called once all traversals feeding this backend are done."""
+
+    def fragment_state(self) -> Optional[str]:
+        """
+        Called before an object when rendering incrementally: the state that the output
+        of the object depends on, besides the object itself.
+
+        Two objects with the same contents started in the same state must be written
+        the same, and writing an object must leave the backend in the state it found it.
+        By default output cannot be reused, and every object is visited.
+
+        :return: state, or None if the output of the object cannot be reused
+        """
+        return None
+
+    def start_fragment(self) -> None:
+        """Called before an object whose output is to be captured as a fragment."""
+        raise NotImplementedError
+
+    def end_fragment(self) -> str:
+        """
+        Called after an object whose output is being captured.
+
+        :return: output written since the matching ``start_fragment``
+        """
+        raise NotImplementedError
+
+    def splice(self, fragment: str) -> None:
+        """
+        Called instead of visiting an object whose output is known: write it as is.
+
+        :param fragment: from ``end_fragment``, in an earlier render
+        """
+        raise NotImplementedError
+
+
+class DocumentParts:
+    """
+    Members of the top-level collections of a document, rendered apart from the rest.
+
+    Set on a :class:`TraversalEngine`, this decides how the members of collections held
+    by slots of the root object are visited. A walk may be restricted to some members,
+    whose output is captured as fragments (see :meth:`TraversalBackend.fragment_state`)
+    and handed to :meth:`put`; a full walk splices in the fragments of members rendered
+    apart, as given by :meth:`get`, and visits the others. This is how
+    :mod:`linkml_renderer.renderers.parallel` renders large collections in worker
+    processes. By default, nothing is rendered apart.
+    """
+
+    def start(self, element: Any, class_name: str, backend: TraversalBackend) -> None:
+        """
+        Called when a walk of a document reaches the root object.
+
+        :param element: the root object
+        :param class_name: class of the root object
+        :param backend: receives the walk
+        """
+
+    def finish(self) -> None:
+        """Called when the walk begun by ``start`` is over, even if it failed."""
+
+    def root_slots(self, slots: List[SlotDefinition]) -> List[SlotDefinition]:
+        """
+        The slots of the root object to visit.
+
+        :param slots: all slots of the root object, in order
+        :return: slots to visit; all of them by default
+        """
+        return slots
+
+    def members(self, slot_name: str, size: int) -> Optional[range]:
+        """
+        The members of a top-level collection to visit, and to capture the output of.
+
+        :param slot_name: slot of the root object holding the collection
+        :param size: number of members of the collection
+        :return: positions of the members, or None to visit all without capturing them
+        """
+        return None
+
+    def get(self, slot_name: str, position: int, state: str) -> Optional[str]:
+        """
+        The output of a member of a top-level collection, if it was rendered apart.
+
+        :param slot_name: slot of the root object holding the collection
+        :param position: position of the member in the collection
+        :param state: state of the backend, from ``fragment_state``
+        :return: fragment, or None if the member was not rendered apart in this state
+        """
+        return None
+
+    def put(self, slot_name: str, position: int, state: str, text: str) -> None:
+        """
+        Keep the output of a member captured by a walk restricted by :meth:`members`.
+
+        :param slot_name: slot of the root object holding the collection
+        :param position: position of the member in the collection
+        :param state: state of the backend the member was written in
+        :param text: output of the member
+        """
+
+
+class TeeBackend(TraversalBackend):
+    """
+    Feeds one traversal to several backends.
+
+    Each backend sees exactly the calls it would have seen on its own: a node skipped
+    by one backend is only visited for the others, and a backend that stops a
+    collection early is told how many items it did not see.
+    """
+
+    def __init__(self, backends: Iterable[TraversalBackend]):
+        self.backends = list(backends)
+        self._depth = 0
+        self._muted: List[Optional[int]] = [None] * len(self.backends)
+        self._stopped: List[Optional[int]] = [None] * len(self.backends)
+        self._collections: List[List[int]] = []
+
+    def _active(self) -> Iterable[Tuple[int, TraversalBackend]]:
+        return ((i, b) for i, b in enumerate(self.backends) if self._muted[i] is None)
+
+    def _start(self, hook: str, *args) -> Descend:
+        self._depth += 1
+        result = Descend.SKIP
+        for i, backend in self._active():
+            if getattr(backend, hook)(*args):
+                result = Descend.VISIT
+            else:
+                self._muted[i] = self._depth
+        if not result:
+            self._end(None)
+        return result
+
+    def _end(self, hook: Optional[str], *args) -> None:
+        for i, backend in enumerate(self.backends):
+            if self._muted[i] is None:
+                if hook is not None:
+                    getattr(backend, hook)(*args)
+            elif self._muted[i] == self._depth:
+                if self._stopped[i] is not None:
+                    backend.end_collection(self._stopped[i])
+                    self._stopped[i] = None
+                self._muted[i] = None
+        self._depth -= 1
+
+    def start_document(self, class_name, title_slot, title) -> None:
+        for _, backend in self._active():
+            backend.start_document(class_name, title_slot, title)
+
+    def end_document(self) -> None:
+        for _, backend in self._active():
+            backend.end_document()
+
+    def start_object(self, class_name, identifier, title, description) -> Descend:
+        return self._start("start_object", class_name, identifier, title, description)
+
+    def end_object(self) -> None:
+        self._end("end_object")
+
+    def start_slot(self, slot, slot_uri, empty) -> Descend:
+        return self._start("start_slot", slot, slot_uri, empty)
+
+    def end_slot(self) -> None:
+        self._end("end_slot")
+
+    def start_collection(
+        self, size, keys, columns, collection=None, context=None, stats=None
+    ) -> Descend:
+        result = self._start("start_collection", size, keys, columns, collection, context, stats)
+        if result:
+            self._collections.append([size, 0])
+        return result
+
+    def end_collection(self, remaining: int) -> None:
+        self._collections.pop()
+        self._end("end_collection", remaining)
+
+    def start_item(self, key) -> Descend:
+        size, index = self._collections[-1]
+        self._collections[-1][1] += 1
+        self._depth += 1
+        visit = False
+        stopped = True
+        for i, backend in self._active():
+            result = backend.start_item(key)
+            if result == Descend.STOP:
+                # muted until the end of the collection, one level up
+                self._muted[i] = self._depth - 1
+                self._stopped[i] = size - index
+                continue
+            stopped = False
+            if result:
+                visit = True
+            else:
+                self._muted[i] = self._depth
+        if visit:
+            return Descend.VISIT
+        self._end(None)
+        return Descend.STOP if stopped else Descend.SKIP
+
+    def end_item(self) -> None:
+        self._end("end_item")
+
+    def atom(self, value, url) -> None:
+        for _, backend in self._active():
+            backend.atom(value, url)
+
+    def reference(self, value) -> None:
+        for _, backend in self._active():
+            backend.reference(value)
+
+    def finish(self) -> None:
+        for backend in self.backends:
+            backend.finish()
+
+
+def infer_root(element: Any, context: Context) -> None:
+    """
+    Set the root of the context, if not already set.
+
+    The root is the class of a YAMLRoot instance, or else the single tree_root
+    class of the schema.
+
+    :param element: instance at the root of the tree
+    :param context: context to set the root on
+    """
+    if context.source_path is not None:
+        return
+    if isinstance(element, YAMLRoot):
+        root = type(element).class_name
+    else:
+        roots = [c.name for c in context.schemaview.all_classes().values() if c.tree_root]
+        if len(roots) != 1:
+            raise ValueError(f"Cannot determine root class for {element}")
+        root = roots[0]
+    context.set_root(root)
+
+
+@dataclass
+class TraversalEngine:
+    """
+    Walks LinkML instances, reporting their structure to a backend.
+
+    Slots of each object are visited in the order of the class's render plan
+    (:attr:`RenderPlan.ordered_slots`), so every backend fed by the engine sees the same
+    order. An engine may be reused, but walks one instance at a time, as it keeps the
+    repeat cache of the walk in progress; renderers create an engine per render, so that a
+    renderer can render in several threads at once.
+    """
+
+    schemaview: SchemaView
+    style_engine: Optional[StyleEngine] = None
+    profile: Optional["RenderProfile"] = None
+    """If set, lookups, nodes and time of each traversal are counted here."""
+
+    fragments: Optional["FragmentCache"] = None
+    """If set, the output of unchanged objects is reused from the previous traversal."""
+
+    repeats: Optional["RepeatCache"] = None
+    """If set, the output of small objects is reused for identical objects."""
+
+    parts: Optional[DocumentParts] = None
+    """If set, members of top-level collections may be rendered apart and spliced in."""
+
+    _url_types: Dict[str, Tuple[bool, bool]] = field(default_factory=dict, repr=False)
+    _repeats: Optional["RepeatCache"] = field(default=None, repr=False)
+
+    def walk(
+        self,
+        element: Any,
+        backend: TraversalBackend,
+        source_element_name: Optional[str] = None,
+        document: bool = True,
+    ) -> None:
+        """
+        Visit an instance and everything it contains.
+
+        :param element: LinkML instance
+        :param backend: receives the structure of the instance
+        :param source_element_name: root class, inferred from tree_root if not present
+        :param document: if True, the instance is wrapped in start/end document calls
+        """
+        profile = self.profile
+        if profile is not None:
+            with profile.instrument(self.schemaview, self.style_engine), profile.phase("traverse"):
+                self._walk(element, profile.backend(backend), source_element_name, document)
+        else:
+            self._walk(element, backend, source_element_name, document)
+
+    def _walk(
+        self,
+        element: Any,
+        backend: TraversalBackend,
+        source_element_name: Optional[str],
+        document: bool,
+    ) -> None:
+        if self.fragments is not None:
+            self.fragments.start(self.schemaview, self.style_engine)
+        context = Context(schemaview=self.schemaview)
+        if source_element_name:
+            context.set_root(source_element_name)
+        infer_root(element, context)
+        if document:
+            class_name = context.current.element_type
+            title_slot, _ = self._roles(render_plan_cache.get(self.schemaview, class_name))
+            title = slot_value(element, title_slot) if title_slot else None
+            backend.start_document(class_name, title_slot, title)
+        self._start_repeats()
+        try:
+            if self.parts is not None:
+                self.parts.start(element, context.current.element_type, backend)
+            self._visit(element, context, backend)
+        finally:
+            self._end_repeats()
+            if self.parts is not None:
+                self.parts.finish()
+        if document:
+            backend.end_document()
+
+    def _start_repeats(self) -> None:
+        # the renderer's cache may be shared by renders in other threads
+        if self.repeats is not None:
+            self._repeats = self.repeats.for_render()
+
+    def _end_repeats(self) -> None:
+        if self._repeats is not None:
+            self.repeats.merge(self._repeats)
+            self._repeats = None
+
+    def walk_collection(
+        self, collection: COLLECTION, context: Context, backend: TraversalBackend
+    ) -> None:
+        """
+        Visit part of an instance: a collection at a known position.
+
+        :param collection: list or dict of members
+        :param context: position of the collection, as passed to ``start_collection``
+        :param backend: receives the structure of the collection
+        """
+        self._start_repeats()
+        try:
+            profile = self.profile
+            if profile is not None:
+                instrumented = profile.instrument(self.schemaview, self.style_engine)
+                with instrumented, profile.phase("traverse"):
+                    self._visit_collection(collection, context, profile.backend(backend))
+            else:
+                self._visit_collection(collection, context, backend)
+        finally:
+            self._end_repeats()
+
+    def _roles(
+        self, plan: RenderPlan
+    ) -> Tuple[Optional[SlotDefinitionName], Optional[SlotDefinitionName]]:
+        if self.style_engine is None:
+            return plan.title_slot, plan.description_slot
+        return (
+            self.style_engine.title_slot(plan.class_name),
+            self.style_engine.description_slot(plan.class_name),
+        )
+
+    def _url(self, value: Any, context: Context) -> Optional[str]:
+        if value is None:
+            return None
+        element_type = context.current.element_type
+        try:
+            is_uri, is_uriorcurie = self._url_types[element_type]
+        except KeyError:
+            is_uri = is_uriorcurie = False
+            if element_type in self.schemaview.all_types():
+                ancestors = self.schemaview.type_ancestors(element_type)
+                is_uri = "uri" in ancestors
+                is_uriorcurie = "uriorcurie" in ancestors
+            self._url_types[element_type] = (is_uri, is_uriorcurie)
+        url = None
+        if is_uri:
+            url = value
+        if is_uriorcurie:
+            url = self.schemaview.expand_curie(value)
+        return url
+
+    def _visit(self, element: Any, context: Context, backend: TraversalBackend) -> None:
+        # formatted only if INFO is enabled
+        logger.info("Current context: %s", context)
+        if not isinstance(element, list) and not is_object(element):
+            if element is not None and context.in_object_reference:
+                backend.reference(element)
+            else:
+                backend.atom(element, self._url(element, context))
+        elif context.in_collection:
+            self._visit_collection(element, context, backend)
+        elif context.in_object or context.in_object_reference:
+            self._visit_object(element, context, backend)
+        else:
+            backend.atom(element, None)
+
+    def _visit_object(self, element: Any, context: Context, backend: TraversalBackend) -> None:
+        if not is_object(element):
+            raise TypeError(f"Unexpected type for class: {type(element)}")
+        if self.fragments is not None or self.repeats is not None:
+            state = backend.fragment_state()
+            if state is not None:
+                self._visit_fragment(element, context, backend, state)
+                return
+        self._write_object(element, context, backend)
+
+    def _visit_fragment(
+        self, element: Any, context: Context, backend: TraversalBackend, state: str
+    ) -> None:
+        # write an object whose output may be reused, or may be reused later
+        fragments, repeats = self.fragments, self._repeats
+        class_name = context.current.element_type
+        text = path = key = repeat_key = None
+        if fragments is not None:
+            path = context.source_path_str
+            key = fragments.key(element, class_name, state)
+            text = fragments.reuse(path, key)
+        if text is None and repeats is not None:
+            repeat_key = repeats.key(element, class_name, state)
+            if repeat_key is not None:
+                text = repeats.get(repeat_key)
+                if text is not None and fragments is not None:
+                    fragments.add(path, key, text)
+        if text is not None:
+            backend.splice(text)
+            return
+        if repeat_key is not None and not repeats.admit(repeat_key):
+            repeat_key = None
+        if fragments is None and repeat_key is None:
+            self._write_object(element, context, backend)
+            return
+        if fragments is not None:
+            fragments.open()
+        backend.start_fragment()
+        self._write_object(element, context, backend)
+        text = backend.end_fragment()
+        if fragments is not None:
+            fragments.close(path, key, text)
+        if repeat_key is not None:
+            repeats.put(repeat_key, text)
+
+    def _write_object(self, element: Any, context: Context, backend: TraversalBackend) -> None:
+        plan = render_plan_cache.get(self.schemaview, context.current.element_type)
+        get = slot_getter(element)
+        title_slot, description_slot = self._roles(plan)
+        identifier = None
+        if plan.identifier_slot is not None:
+            identifier = get(plan.identifier_slot.name)
+        if not backend.start_object(
+            plan.class_name,
+            identifier,
+            get(title_slot) if title_slot else None,
+            get(description_slot) if description_slot else None,
+        ):
+            return
+        slots = plan.ordered_slots
+        if self.parts is not None and context.source_path.depth == 1:
+            slots = self.parts.root_slots(slots)
+        for slot in slots:
+            v = get(slot.name)
+            if v is None:
+                continue
+            if backend.start_slot(slot, plan.slot_uris[slot.name], _empty(v)):
+                self._visit(v, context.extend(slot), backend)
+                backend.end_slot()
+        backend.end_object()
+
+    def _columns(self, collection: COLLECTION, context: Context) -> List[ColumnStats]:
+        plan = render_plan_cache.get(self.schemaview, context.current.element_type)
+        members = collection.values() if isinstance(collection, dict) else collection
+        return scan_columns(members, plan.ordered_slots)
+
+    def _visit_collection(
+        self, collection: COLLECTION, context: Context, backend: TraversalBackend
+    ) -> None:
+        if isinstance(collection, list):
+            items = enumerate(collection)
+            keys = None
+        elif isinstance(collection, dict):
+            items = collection.items()
+            keys = list(collection.keys())
+        else:
+            raise TypeError(f"Unexpected type for collection: {type(collection)}")
+        columns = stats = None
+        if context.in_object:
+            stats = self._columns(collection, context)
+            columns = [column.slot for column in stats]
+        if not backend.start_collection(len(collection), keys, columns, collection, context, stats):
+            return
+        remaining = 0
+        if self.parts is not None and context.source_path.depth == 2 and context.in_object:
+            remaining = self._visit_parts(self.parts, items, len(collection), context, backend)
+        else:
+            for n, (key, item) in enumerate(items):
+                descend = backend.start_item(key)
+                if descend == Descend.STOP:
+                    remaining = len(collection) - n
+                    break
+                if descend:
+                    self._visit(item, context.index_extend(key), backend)
+                    backend.end_item()
+        backend.end_collection(remaining)
+
+    def _visit_parts(
+        self,
+        parts: DocumentParts,
+        items: Iterable[Tuple[Any, Any]],
+        size: int,
+        context: Context,
+        backend: TraversalBackend,
+    ) -> int:
+        # members of a top-level collection, which may be rendered apart from the rest
+        slot_name = context.current.slot.name
+        positions = parts.members(slot_name, size)
+        indexed = enumerate(items)
+        if positions is not None:
+            indexed = islice(indexed, positions.start, positions.stop)
+        for n, (key, item) in indexed:
+            descend = backend.start_item(key)
+            if descend == Descend.STOP:
+                return size - n
+            if not descend:
+                continue
+            state = backend.fragment_state()
+            text = parts.get(slot_name, n, state) if state is not None else None
+            if text is not None:
+                backend.splice(text)
+            elif positions is not None and state is not None:
+                backend.start_fragment()
+                self._visit(item, context.index_extend(key), backend)
+                parts.put(slot_name, n, state, backend.end_fragment())
+            else:
+                self._visit(item, context.index_extend(key), backend)
+            backend.end_item()
+        return 0
+
+
+def _empty(v: Any) -> bool:
+    return v is None or v == [] or v == {}
@@ -0,0 +1,189 @@
+"""
+An on-disk cache of loaded schemas, to skip parsing and compiling them on every run.
+
+Loading a schema means reading and merging all of its imports, and rendering starts by
+compiling a :class:`RenderPlan` for each class it visits, which calls on induced slot and
+ancestor computations. A :class:`SchemaCache` keeps a snapshot of the loaded SchemaView,
+the render plans of all of its classes and the parsed style configuration, and loads the
+snapshot instead when neither the schema files nor the configuration file have changed.
+
+Snapshots are pickles: only use a cache directory that no one else can write to.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import yaml
+from linkml_runtime import SchemaView
+
+from linkml_renderer.renderers.render_plan import RenderPlan, render_plan_cache
+from linkml_renderer.style.model import Configuration
+from linkml_renderer.style.style_engine import StyleEngine
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+"""Version of the snapshot format; snapshots of other versions are rebuilt."""
+
+SNAPSHOT_SUFFIX = ".schema.pickle"
+
+_Snapshot = Tuple[SchemaView, List[RenderPlan], Optional[Configuration]]
+
+
+def _file_digest(path: Union[str, Path]) -> str:
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def schema_files(schemaview: SchemaView) -> Dict[str, Path]:
+    """
+    Files the schemas of a SchemaView were loaded from, including all imports.
+
+    :param schemaview: schema loaded from a file
+    :return: file of each schema, by schema name; schemas not loaded from a file are left out
+    """
+    schemaview.imports_closure()
+    # imports are loaded from paths relative to the main schema
+    main = schemaview.schema.source_file
+    base = Path(main).parent if main else Path()
+    return {
+        name: Path(schema.source_file) if schema is schemaview.schema else base / schema.source_file
+        for name, schema in schemaview.schema_map.items()
+        if schema.source_file
+    }
+
+
+def load_schema(schema: str, config: Optional[str] = None) -> Tuple[SchemaView, StyleEngine]:
+    """
+    Load a schema and its style configuration.
+
+    :param schema: path to the LinkML schema
+    :param config: optional path to a style configuration file
+    :return: schemaview, and a style engine for it
+    """
+    sv = SchemaView(schema)
+    se = StyleEngine(sv)
+    if config:
+        with open(config) as f:
+            se.configuration = Configuration(**yaml.safe_load(f))
+    return sv, se
+
+
+def _environment() -> str:
+    # snapshots are only valid for the versions of the code that pickled them
+    from linkml_runtime import __version__ as runtime_version
+
+    from linkml_renderer import __version__
+
+    return f"{CACHE_VERSION}|{__version__}|{runtime_version}|{sys.version_info[:2]}"
+
+
+@dataclass
+class SchemaCache:
+    """
+    A directory of snapshots of loaded schemas, one per schema and configuration file.
+
+    A snapshot records the content hash of every file it was made from: the schema, each
+    schema it imports, and the configuration. It is used only if all of them are
+    unchanged, and remade otherwise.
+
+    >>> cache = SchemaCache("~/.cache/linkml-renderer")
+    >>> sv, style_engine = cache.load("schema.yaml", "config.yaml")
+    """
+
+    directory: Union[str, Path]
+    """Where snapshots are kept; created when the first snapshot is saved."""
+
+    hits: int = 0
+    """Number of loads served from a snapshot."""
+
+    misses: int = 0
+    """Number of loads that had to parse the schema."""
+
+    def snapshot_path(self, schema: str, config: Optional[str] = None) -> Path:
+        """
+        File holding the snapshot of a schema and configuration file.
+
+        :param schema: path to the LinkML schema
+        :param config: optional path to a style configuration file
+        :return: path within :attr:`directory`
+        """
+        name = f"{Path(schema).resolve()}|{Path(config).resolve() if config else ''}"
+        digest = hashlib.blake2b(name.encode("utf-8"), digest_size=16).hexdigest()
+        return Path(self.directory).expanduser() / f"{digest}{SNAPSHOT_SUFFIX}"
+
+    def load(self, schema: str, config: Optional[str] = None) -> Tuple[SchemaView, StyleEngine]:
+        """
+        Load a schema and its style configuration, from a snapshot if there is a valid one.
+
+        On a miss, the schema is loaded from its files, render plans are compiled for all
+        of its classes, and a new snapshot is saved.
+
+        :param schema: path to the LinkML schema
+        :param config: optional path to a style configuration file
+        :return: schemaview, and a style engine for it
+        """
+        path = self.snapshot_path(schema, config)
+        snapshot = self._read(path, config)
+        if snapshot is not None:
+            sv, plans, configuration = snapshot
+            render_plan_cache.add(sv, plans)
+            se = StyleEngine(sv)
+            if configuration is not None:
+                se.configuration = configuration
+            self.hits += 1
+            logger.info(f"Loaded {schema} from {path}")
+            return sv, se
+        self.misses += 1
+        sv, se = load_schema(schema, config)
+        plans = [render_plan_cache.get(sv, name) for name in sv.all_classes()]
+        sources = {str(p.resolve()): _file_digest(p) for p in schema_files(sv).values()}
+        header = {
+            "environment": _environment(),
+            "sources": sources,
+            "config": _file_digest(config) if config else None,
+        }
+        configuration = se.configuration if config else None
+        try:
+            self._write(path, header, (sv, plans, configuration))
+        except OSError as e:
+            logger.warning(f"Cannot save schema snapshot to {path}: {e}")
+        return sv, se
+
+    def _read(self, path: Path, config: Optional[str]) -> Optional[_Snapshot]:
+        # the header is checked before the snapshot itself is unpickled
+        try:
+            with open(path, "rb") as f:
+                header = pickle.load(f)
+                if not isinstance(header, dict) or header.get("environment") != _environment():
+                    return None
+                if header.get("config") != (_file_digest(config) if config else None):
+                    return None
+                for source, digest in header.get("sources", {}).items():
+                    if _file_digest(source) != digest:
+                        return None
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable schema snapshot {path}: {e}")
+            return None
+
+    def _write(self, path: Path, header: dict, snapshot: _Snapshot) -> None:
+        # written to a temporary file first, as other processes may be reading it
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
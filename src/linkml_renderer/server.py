@@ -0,0 +1,480 @@
+"""
+A local HTTP server that renders instances with schemas kept loaded between requests.
+
+Schemas and style configurations are loaded when the server starts, together with the
+render plans of all of their classes, and stay loaded in each worker process of a pool,
+or once for a pool of threads that share them. Each request only parses and renders its
+instance:
+
+- ``POST /render/<format>?schema=<name>&root=<class>`` renders the request body, JSON or
+  YAML according to its Content-Type, and responds with the rendering. ``schema`` may be
+  left out when the server has one schema; ``root`` as for ``linkml-render -r``.
+- ``GET /stats`` responds with request counters, latencies and throughput, as JSON.
+- ``GET /health`` responds with ``ok``.
+
+At most ``workers + queue_size`` requests are accepted at a time; others are turned away
+at once with ``503 Service Unavailable``, so that a burst of requests cannot pile up
+memory and latency. The server listens on a TCP port or on a Unix socket, and needs no
+outside services.
+"""
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import yaml
+
+from linkml_renderer.registry import renderers
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    "html": "text/html; charset=utf-8",
+    "markdown": "text/markdown; charset=utf-8",
+}
+"""Content-Type of responses by format; other formats are sent as plain text."""
+
+LATENCY_WINDOW = 1024
+"""Number of most recent requests that latency percentiles are computed over."""
+
+THROUGHPUT_WINDOW = 60.0
+"""Seconds over which recent throughput is computed."""
+
+_worker_state: Optional[Dict[str, Any]] = None
+"""Schemas, style engines and renderers by schema name, loaded once per worker process,
+or once for a pool of threads."""
+
+
+def parse_schema_specs(specs: List[str]) -> Dict[str, str]:
+    """
+    Name schemas given on the command line.
+
+    :param specs: ``NAME=PATH``, or ``PATH`` to name a schema after its file
+    :return: path of each schema, by name
+    """
+    schemas = {}
+    for spec in specs:
+        name, sep, path = spec.partition("=")
+        if not sep:
+            name, path = Path(spec).stem, spec
+        if name in schemas:
+            raise ValueError(f"Schema {name} is given more than once")
+        schemas[name] = path
+    return schemas
+
+
+def _load_schemas(
+    schemas: Dict[str, str], config: Optional[str], cache_directory: Optional[str]
+) -> Dict[str, Any]:
+    from linkml_renderer.renderers.render_plan import render_plan_cache
+    from linkml_renderer.schema_cache import SchemaCache, load_schema
+
+    loaded = {}
+    for name, path in schemas.items():
+        if cache_directory:
+            sv, se = SchemaCache(cache_directory).load(path, config)
+        else:
+            sv, se = load_schema(path, config)
+        for class_name in sv.all_classes():
+            render_plan_cache.get(sv, class_name)
+        loaded[name] = (sv, se, {})
+    return loaded
+
+
+def _init_worker(
+    schemas: Dict[str, str], config: Optional[str], cache_directory: Optional[str]
+) -> None:
+    global _worker_state
+    # workers forked from the server inherit the schemas it loaded
+    if _worker_state is None:
+        _worker_state = _load_schemas(schemas, config, cache_directory)
+
+
+def _ready() -> bool:
+    return _worker_state is not None
+
+
+def _render_request(
+    schema: str, fmt: str, body: bytes, content_type: str, root: Optional[str]
+) -> str:
+    sv, se, by_format = _worker_state[schema]
+    renderer = by_format.get(fmt)
+    if renderer is None:
+        # renderers are shared by the threads of a worker
+        renderer = by_format.setdefault(fmt, renderers[fmt](style_engine=se))
+    text = body.decode("utf-8")
+    try:
+        if "json" in content_type:
+            element = json.loads(text)
+        else:
+            element = yaml.safe_load(text)
+    except (ValueError, yaml.YAMLError) as e:
+        raise BadRequest(f"Cannot parse request body: {e}") from e
+    if not isinstance(element, dict):
+        raise BadRequest("Request body must be an object")
+    return renderer.render(element, sv, root)
+
+
+class BadRequest(ValueError):
+    """A request that cannot be rendered because of what it holds."""
+
+
+class ServerBusy(RuntimeError):
+    """A request turned away because the queue is full."""
+
+
+@dataclass
+class ServerStats:
+    """Counters of the requests of a server; safe to update from several threads."""
+
+    started: float = field(default_factory=time.time)
+    requests: int = 0
+    """Render requests received, including those turned away."""
+
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    """Requests turned away because the queue was full."""
+
+    in_flight: int = 0
+    """Requests being rendered or waiting in the queue."""
+
+    by_format: Dict[str, int] = field(default_factory=dict)
+    """Completed requests, by format."""
+
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    _latencies: Deque[float] = field(
+        default_factory=lambda: deque(maxlen=LATENCY_WINDOW), repr=False
+    )
+    _finished: Deque[float] = field(default_factory=deque, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def accept(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+
+    def reject(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self.rejected += 1
+
+    def finish(self, fmt: str, latency: float, ok: bool) -> None:
+        """
+        Count a request that was rendered, or failed to.
+
+        :param fmt: format it was rendered to
+        :param latency: seconds from receiving the request to having its response
+        :param ok: whether it was rendered
+        """
+        now = time.time()
+        with self._lock:
+            self.in_flight -= 1
+            if not ok:
+                self.failed += 1
+                return
+            self.completed += 1
+            self.by_format[fmt] = self.by_format.get(fmt, 0) + 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            self._latencies.append(latency)
+            self._finished.append(now)
+            while self._finished and self._finished[0] < now - THROUGHPUT_WINDOW:
+                self._finished.popleft()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        The counters as plain data.
+
+        :return: counters; latencies in seconds, throughput in requests per second
+        """
+        now = time.time()
+        with self._lock:
+            latencies = sorted(self._latencies)
+            recent = sum(1 for t in self._finished if t >= now - THROUGHPUT_WINDOW)
+            uptime = now - self.started
+
+            def percentile(p: float) -> Optional[float]:
+                if not latencies:
+                    return None
+                return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+            return {
+                "uptime": uptime,
+                "requests": self.requests,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "in_flight": self.in_flight,
+                "by_format": dict(self.by_format),
+                "latency": {
+                    "mean": self.total_latency / self.completed if self.completed else None,
+                    "p50": percentile(0.5),
+                    "p95": percentile(0.95),
+                    "p99": percentile(0.99),
+                    "max": self.max_latency if self.completed else None,
+                },
+                "throughput": {
+                    "overall": self.completed / uptime if uptime else 0.0,
+                    "recent": recent / min(uptime, THROUGHPUT_WINDOW) if uptime else 0.0,
+                },
+            }
+
+
+@dataclass
+class RenderService:
+    """
+    Loaded schemas and a pool of workers that render with them.
+
+    Workers are processes, each with a copy of the schemas, or with ``threads`` set,
+    threads of the server process that share one copy. Threads start at once and use
+    less memory; processes render on more than one core at a time.
+
+    >>> service = RenderService({"personinfo": "personinfo.yaml"}, workers=4)
+    >>> service.start()
+    >>> html = service.render("personinfo", "html", b'{"persons": []}', "application/json")
+    >>> service.close()
+    """
+
+    schemas: Dict[str, str]
+    """Path of each schema, by the name requests refer to it by."""
+
+    config: Optional[str] = None
+    """Style configuration file used with every schema."""
+
+    workers: int = 1
+    """Number of worker processes, or threads."""
+
+    queue_size: int = 64
+    """Number of requests that may wait for a worker; more are turned away."""
+
+    timeout: Optional[float] = 60.0
+    """Seconds a request may take, including waiting for a worker."""
+
+    cache_directory: Optional[str] = None
+    """If set, schemas are loaded from snapshots kept there."""
+
+    threads: bool = False
+    """If True, workers are threads rather than processes."""
+
+    stats: ServerStats = field(default_factory=ServerStats)
+
+    _executor: Optional[Executor] = field(default=None, repr=False)
+    _slots: Optional[threading.BoundedSemaphore] = field(default=None, repr=False)
+
+    def start(self) -> None:
+        """Load the schemas, and start the workers."""
+        global _worker_state
+        # loaded here first, so that a schema that cannot be loaded stops the server from
+        # starting, and so that forked workers start warm
+        _worker_state = _load_schemas(self.schemas, self.config, self.cache_directory)
+        if self.threads:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="linkml-render-worker"
+            )
+        else:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.schemas, self.config, self.cache_directory),
+            )
+            # workers are started now rather than by the first requests
+            for future in [self._executor.submit(_ready) for _ in range(self.workers)]:
+                future.result()
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+
+    def close(self) -> None:
+        """Stop the workers, once the requests they are rendering are done."""
+        global _worker_state
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        _worker_state = None
+
+    def check(self, schema: Optional[str], fmt: str) -> str:
+        """
+        Resolve the schema and format of a request.
+
+        :param schema: schema name, or None if the service has a single schema
+        :param fmt: format name
+        :return: schema name
+        :raises KeyError: if the schema or format is unknown
+        """
+        if fmt not in renderers:
+            raise KeyError(f"Unknown format: {fmt}")
+        if schema is None:
+            if len(self.schemas) != 1:
+                raise KeyError(f"Choose a schema: {', '.join(self.schemas)}")
+            return next(iter(self.schemas))
+        if schema not in self.schemas:
+            raise KeyError(f"Unknown schema: {schema}")
+        return schema
+
+    def render(
+        self,
+        schema: Optional[str],
+        fmt: str,
+        body: bytes,
+        content_type: str = "application/json",
+        root: Optional[str] = None,
+    ) -> str:
+        """
+        Render an instance on a worker.
+
+        :param schema: schema name, or None if the service has a single schema
+        :param fmt: format name
+        :param body: the instance, as JSON or YAML
+        :param content_type: media type of the body
+        :param root: class of the instance; inferred from the schema if not given
+        :return: rendering
+        :raises ServerBusy: if the queue is full
+        """
+        schema = self.check(schema, fmt)
+        if not self._slots.acquire(blocking=False):
+            self.stats.reject()
+            raise ServerBusy(f"More than {self.workers + self.queue_size} requests at once")
+        start = time.perf_counter()
+        self.stats.accept()
+        ok = False
+        try:
+            try:
+                future = self._executor.submit(
+                    _render_request, schema, fmt, body, content_type or "", root
+                )
+            except BaseException:
+                self._slots.release()
+                raise
+            # a request that timed out holds its place until its worker is done with it
+            future.add_done_callback(lambda _: self._slots.release())
+            result = future.result(timeout=self.timeout)
+            ok = True
+            return result
+        finally:
+            self.stats.finish(fmt, time.perf_counter() - start, ok)
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server_version = "linkml-render"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self) -> RenderService:
+        return self.server.service
+
+    def address_string(self) -> str:
+        # clients of a Unix socket have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "local"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.info(f"{self.address_string()} {format % args}")
+
+    def _send(self, status: HTTPStatus, text: str, content_type: str, **headers: str) -> None:
+        data = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name.replace("_", "-"), value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: HTTPStatus, message: str, **headers: str) -> None:
+        self._send(status, message + "\n", "text/plain; charset=utf-8", **headers)
+
+    def do_GET(self) -> None:
+        path = urlsplit(self.path).path
+        if path == "/health":
+            self._send(HTTPStatus.OK, "ok\n", "text/plain; charset=utf-8")
+        elif path == "/stats":
+            text = json.dumps(self.service.stats.to_dict(), indent=2)
+            self._send(HTTPStatus.OK, text, "application/json")
+        else:
+            self._error(HTTPStatus.NOT_FOUND, f"Not found: {path}")
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        prefix = "/render/"
+        if not url.path.startswith(prefix):
+            self._error(HTTPStatus.NOT_FOUND, f"Not found: {url.path}")
+            return
+        fmt = url.path[len(prefix) :]
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            text = self.service.render(
+                query.get("schema"),
+                fmt,
+                body,
+                self.headers.get("Content-Type", ""),
+                query.get("root"),
+            )
+        except KeyError as e:
+            self._error(HTTPStatus.NOT_FOUND, str(e.args[0]))
+        except ServerBusy as e:
+            self._error(HTTPStatus.SERVICE_UNAVAILABLE, str(e), Retry_After="1")
+        except BadRequest as e:
+            self._error(HTTPStatus.BAD_REQUEST, str(e))
+        except FutureTimeoutError:
+            self._error(HTTPStatus.GATEWAY_TIMEOUT, "Rendering took too long")
+        except Exception as e:
+            logger.warning(f"Failed to render {url.path}", exc_info=True)
+            self._error(HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(e).__name__}: {e}")
+        else:
+            self._send(HTTPStatus.OK, text, CONTENT_TYPES.get(fmt, "text/plain; charset=utf-8"))
+
+
+class _TCPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: RenderService):
+        self.service = service
+        super().__init__(address, _RequestHandler)
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, service: RenderService):
+        self.service = service
+        super().__init__(path, _RequestHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def make_server(
+    service: RenderService,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    socket_path: Optional[str] = None,
+) -> socketserver.BaseServer:
+    """
+    Create a server for a started service; call ``serve_forever`` on it to handle requests.
+
+    Each connection is handled in a thread of its own, which waits for a worker to render.
+
+    :param service: schemas and workers
+    :param host: address to listen on
+    :param port: TCP port to listen on; 0 picks a free one
+    :param socket_path: if set, listen on this Unix socket instead of a TCP port
+    :return: server
+    """
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        return _UnixServer(socket_path, service)
+    return _TCPServer((host, port), service)
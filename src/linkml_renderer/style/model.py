@@ -87,6 +87,34 @@ class Configuration(ConfiguredBaseModel):
         None,
         description="""If true, include a diagram at the top of the document. Currently only mermaid supported.""",
     )
+    title_curies: Optional[List[str]] = Field(
+        default_factory=list,
+        description="""Slot URIs, in addition to dcterms:title, that identify the slot holding the title of an object.""",
+    )
+    description_curies: Optional[List[str]] = Field(
+        default_factory=list,
+        description="""Slot URIs, in addition to dcterms:description and skos:definition, that identify the slot holding the description of an object.""",
+    )
+    table_page_size: Optional[int] = Field(
+        None,
+        description="""If set, tables of collections with more rows than this are split into pages of at most this many rows, with a pager. Only applies to HTML.""",
+        ge=1,
+    )
+    diagram_max_nodes: Optional[int] = Field(
+        None,
+        description="""If set, diagrams show at most this many nodes; the rest of the instance is collapsed into summary nodes.""",
+        ge=1,
+    )
+    diagram_max_depth: Optional[int] = Field(
+        None,
+        description="""If set, diagrams only show nodes at most this many slots away from the root.""",
+        ge=0,
+    )
+    diagram_max_fan_out: Optional[int] = Field(
+        None,
+        description="""If set, diagrams show at most this many members of each collection, followed by a summary node for the rest.""",
+        ge=0,
+    )
 
 
 class RenderRule(ConfiguredBaseModel):
@@ -1,43 +1,155 @@
+from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 from linkml_runtime import SchemaView
 from linkml_runtime.linkml_model import ClassDefinitionName, SlotDefinitionName
 
-from linkml_renderer.style.model import Configuration, RenderElementType, RenderRule
+from linkml_renderer.renderers.render_plan import (
+    DEFAULT_DESCRIPTION_CURIES,
+    DEFAULT_TITLE_CURIES,
+    render_plan_cache,
+)
+from linkml_renderer.style.model import Configuration, RenderElementType, RenderRule, RenderType
 
 SLOT_NAME = Union[SlotDefinitionName, str]
 
 
+@dataclass
+class RuleIndex:
+    """
+    Rules of a configuration, indexed by the selectors they use.
+
+    Only rules that set ``render_as`` are indexed. Each rule is stored once, under
+    its most selective key: the slot names it applies to, else the slot URIs it
+    applies to, else as an unrestricted rule. Render types are checked when a
+    candidate is matched.
+    """
+
+    rules: List[RenderRule] = field(default_factory=list)
+    by_slot: Dict[str, List[int]] = field(default_factory=lambda: defaultdict(list))
+    by_uri: Dict[str, List[int]] = field(default_factory=lambda: defaultdict(list))
+    unrestricted: List[int] = field(default_factory=list)
+    rule_uris: Dict[int, frozenset] = field(default_factory=dict)
+
+
 @dataclass
 class StyleEngine:
     """
     A style engine computes which style elements should be applied to a particular element.
+
+    Rules are matched against a slot using all of their selectors: ``applies_to_slots``
+    (slot names), ``applies_to_curies`` (slot URIs, given as CURIEs or full URIs) and
+    ``applies_to_render_types``. An empty selector matches anything. If several rules
+    match, the most specific one wins: a rule naming the slot beats a rule naming its
+    URI, which beats a rule naming neither; a rule restricted to the render type beats
+    one that is not. Remaining ties go to the rule that comes first in the configuration.
+
+    The configuration is compiled into a :class:`RuleIndex` on first use, and lookups
+    are memoized, so the cost per node does not depend on the number of rules. Title and
+    description slots are likewise memoized per class. All of this is discarded if the
+    configuration, its rules or CURIE lists, or the SchemaView change.
     """
 
     schemaview: SchemaView
     configuration: Configuration = field(default_factory=lambda: Configuration())
+    _rule_index: Optional[RuleIndex] = field(default=None, init=False, repr=False, compare=False)
+    _config_key: Optional[Tuple] = field(default=None, init=False, repr=False, compare=False)
+    _render_as_cache: Dict[Tuple, Optional[RenderElementType]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _slot_role_cache: Dict[Tuple, Optional[SlotDefinitionName]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
 
     def slot_by_curie(
         self, class_name: ClassDefinitionName, curies: List[str]
     ) -> Optional[SlotDefinitionName]:
-        sv = self.schemaview
-        slots = [s for s in sv.class_induced_slots(class_name) if sv.get_uri(s.name) in curies]
-        if slots:
-            return slots[0].name
-        else:
-            return None
+        """
+        Find the first slot of a class whose URI is one of the given URIs or CURIEs.
+
+        :param class_name: class whose induced slots are searched
+        :param curies: URIs or CURIEs to match
+        :return: slot name, or None
+        """
+        plan = render_plan_cache.get(self.schemaview, class_name)
+        uris = {self._expand(c) for c in curies}
+        for slot in plan.slots:
+            if plan.slot_curies[slot.name] in curies or plan.slot_uris[slot.name] in uris:
+                return slot.name
+        return None
+
+    @property
+    def title_curies(self) -> List[str]:
+        """URIs or CURIEs of slots that hold the title of an object."""
+        return DEFAULT_TITLE_CURIES + list(self.configuration.title_curies or [])
+
+    @property
+    def description_curies(self) -> List[str]:
+        """URIs or CURIEs of slots that hold the description of an object."""
+        return DEFAULT_DESCRIPTION_CURIES + list(self.configuration.description_curies or [])
+
+    def _slot_for_role(
+        self, role: str, class_name: ClassDefinitionName
+    ) -> Optional[SlotDefinitionName]:
+        if self._config_key != self._current_config_key():
+            self.rule_index()
+        key = (role, class_name)
+        try:
+            return self._slot_role_cache[key]
+        except KeyError:
+            curies = self.title_curies if role == "title" else self.description_curies
+            slot_name = self.slot_by_curie(class_name, curies)
+            self._slot_role_cache[key] = slot_name
+            return slot_name
 
     def title_slot(self, class_name: ClassDefinitionName) -> Optional[SlotDefinitionName]:
-        return self.slot_by_curie(class_name, ["dcterms:title"])
+        """
+        The slot holding the title of instances of a class.
+
+        Memoized per class until the configuration or schema changes.
+
+        :param class_name:
+        :return: slot name, or None
+        """
+        return self._slot_for_role("title", class_name)
 
     def description_slot(self, class_name: ClassDefinitionName) -> Optional[SlotDefinitionName]:
-        return self.slot_by_curie(class_name, ["dcterms:description", "skos:definition"])
+        """
+        The slot holding the description of instances of a class.
+
+        Memoized per class until the configuration or schema changes.
+
+        :param class_name:
+        :return: slot name, or None
+        """
+        return self._slot_for_role("description", class_name)
+
+    def configure_title_curies(self, curies: List[str]) -> None:
+        """
+        Add URIs or CURIEs that identify title slots.
+
+        :param curies:
+        """
+        config = self.configuration
+        config.title_curies = list(config.title_curies or []) + list(curies)
+        self.invalidate()
+
+    def configure_description_curies(self, curies: List[str]) -> None:
+        """
+        Add URIs or CURIEs that identify description slots.
+
+        :param curies:
+        """
+        config = self.configuration
+        config.description_curies = list(config.description_curies or []) + list(curies)
+        self.invalidate()
 
     def configure_slot(self, slot_name: SLOT_NAME, render_as: RenderElementType, **kwargs) -> None:
         self.configuration.rules.append(
             RenderRule(applies_to_slots=[slot_name], render_as=render_as, **kwargs)
         )
+        self.invalidate()
 
     def configure_slots(
         self, slot_names: List[SLOT_NAME], render_as: RenderElementType, **kwargs
@@ -45,8 +157,127 @@ class StyleEngine:
         for slot_name in slot_names:
             self.configure_slot(slot_name, render_as, **kwargs)
 
-    def slot_render_as(self, slot_name: SlotDefinitionName) -> Optional[RenderElementType]:
-        for rule in self.configuration.rules:
-            if slot_name in rule.applies_to_slots:
-                return rule.render_as
-        return None
+    def invalidate(self) -> None:
+        """
+        Discard the compiled rule index and all memoized lookups.
+
+        This happens automatically when rules or CURIEs are added through this engine,
+        when the configuration is replaced, and when the SchemaView is modified; call it
+        after modifying existing rules in place.
+        """
+        self._rule_index = None
+        self._config_key = None
+        self._render_as_cache = {}
+        self._slot_role_cache = {}
+
+    def _current_config_key(self) -> Tuple:
+        config = self.configuration
+        sv = self.schemaview
+        return (
+            id(config),
+            id(config.rules),
+            len(config.rules),
+            len(config.title_curies or []),
+            len(config.description_curies or []),
+            id(sv),
+            sv.modifications if sv is not None else None,
+        )
+
+    def _expand(self, uri_or_curie: str) -> str:
+        if self.schemaview is None:
+            return uri_or_curie
+        return self.schemaview.expand_curie(uri_or_curie)
+
+    def rule_index(self) -> RuleIndex:
+        """
+        The compiled index of the current configuration.
+
+        :return: index, rebuilt if the configuration has changed
+        """
+        key = self._current_config_key()
+        if self._rule_index is not None and self._config_key == key:
+            return self._rule_index
+        index = RuleIndex(rules=list(self.configuration.rules))
+        for i, rule in enumerate(index.rules):
+            if rule.render_as is None:
+                continue
+            if rule.applies_to_curies:
+                index.rule_uris[i] = frozenset(self._expand(c) for c in rule.applies_to_curies)
+            if rule.applies_to_slots:
+                for slot_name in rule.applies_to_slots:
+                    index.by_slot[slot_name].append(i)
+            elif rule.applies_to_curies:
+                for uri in index.rule_uris[i]:
+                    index.by_uri[uri].append(i)
+            else:
+                index.unrestricted.append(i)
+        self._rule_index = index
+        self._config_key = key
+        self._render_as_cache = {}
+        self._slot_role_cache = {}
+        return index
+
+    def matching_rule(
+        self,
+        slot_name: SLOT_NAME,
+        slot_uri: Optional[str] = None,
+        render_type: Optional[RenderType] = None,
+    ) -> Optional[RenderRule]:
+        """
+        Find the rule with highest precedence that applies to a slot.
+
+        :param slot_name: name of the slot
+        :param slot_uri: URI or CURIE of the slot, if known
+        :param render_type: type of output being rendered, if known
+        :return: matching rule that sets render_as, or None
+        """
+        index = self.rule_index()
+        uri = self._expand(slot_uri) if slot_uri else None
+        candidates = list(index.by_slot.get(slot_name, []))
+        if uri is not None:
+            candidates.extend(index.by_uri.get(uri, []))
+        candidates.extend(index.unrestricted)
+        best = None
+        best_rank = None
+        for i in candidates:
+            rule = index.rules[i]
+            rule_uris = index.rule_uris.get(i)
+            if rule_uris is not None and uri not in rule_uris:
+                continue
+            if rule.applies_to_render_types and render_type not in rule.applies_to_render_types:
+                continue
+            rank = (
+                -4 * bool(rule.applies_to_slots)
+                - 2 * bool(rule_uris)
+                - bool(rule.applies_to_render_types),
+                i,
+            )
+            if best_rank is None or rank < best_rank:
+                best = rule
+                best_rank = rank
+        return best
+
+    def slot_render_as(
+        self,
+        slot_name: SLOT_NAME,
+        slot_uri: Optional[str] = None,
+        render_type: Optional[RenderType] = None,
+    ) -> Optional[RenderElementType]:
+        """
+        Determine how a slot should be rendered.
+
+        :param slot_name: name of the slot
+        :param slot_uri: URI or CURIE of the slot, if known
+        :param render_type: type of output being rendered, if known
+        :return: element type from the matching rule, or None if no rule applies
+        """
+        if self._config_key != self._current_config_key():
+            self.rule_index()
+        key = (slot_name, slot_uri, render_type)
+        try:
+            return self._render_as_cache[key]
+        except KeyError:
+            rule = self.matching_rule(slot_name, slot_uri, render_type)
+            render_as = rule.render_as if rule else None
+            self._render_as_cache[key] = render_as
+            return render_as
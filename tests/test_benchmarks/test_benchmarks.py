@@ -0,0 +1,72 @@
+"""Tests for the synthetic instance generator and benchmark runner."""
+import unittest
+
+from linkml_runtime import SchemaView
+
+from linkml_renderer.benchmarks.generator import GeneratorConfig, SyntheticGenerator
+from linkml_renderer.benchmarks.runner import (
+    BenchmarkCase,
+    compare,
+    format_report,
+    load_results,
+    run_benchmarks,
+    save_results,
+)
+from linkml_renderer.benchmarks.startup import (
+    StartupResult,
+    format_startup_report,
+    time_command,
+)
+from linkml_renderer.renderers.markdown_renderer import MarkdownRenderer
+from tests.test_renderers import OUTPUT_DIR, PERSONINFO_DIR
+
+SCHEMA = PERSONINFO_DIR / "personinfo.yaml"
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Test generation of instances and comparison of results."""
+
+    def test_generator(self):
+        sv = SchemaView(str(SCHEMA))
+        config = GeneratorConfig(collection_length=5, nested_collection_length=2, max_depth=1)
+        generator = SyntheticGenerator(sv, config)
+        instance = generator.generate()
+        self.assertEqual(instance, SyntheticGenerator(sv, config).generate())
+        self.assertEqual(5, len(instance["persons"]))
+        person = instance["persons"][0]
+        self.assertEqual("Person:1", person["id"])
+        self.assertEqual(16, len(person["name"]))
+        self.assertIsInstance(person["age_in_years"], int)
+        self.assertEqual(2, len(person["aliases"]))
+        # objects below max_depth are not generated
+        self.assertNotIn("has_employment_history", person)
+        deeper = SyntheticGenerator(sv, GeneratorConfig(max_depth=2)).generate()
+        self.assertIn("has_employment_history", deeper["persons"][0])
+        self.assertGreater(generator.objects, 5)
+        MarkdownRenderer().render(instance, sv)
+
+    def test_run_and_compare(self):
+        case = BenchmarkCase("personinfo", SCHEMA)
+        config = GeneratorConfig(collection_length=3, nested_collection_length=1, max_depth=1)
+        results = run_benchmarks([case], {"markdown": MarkdownRenderer}, config, repeat=1)
+        self.assertEqual(["personinfo/markdown"], [r.key for r in results])
+        result = results[0]
+        self.assertGreater(result.output_bytes, 0)
+        self.assertGreater(result.peak_memory, 0)
+        path = OUTPUT_DIR / "bench.json"
+        OUTPUT_DIR.mkdir(exist_ok=True, parents=True)
+        save_results(results, path, size="test")
+        baseline = load_results(path)
+        self.assertEqual(results, baseline)
+        self.assertEqual([], compare(results, baseline)[0].regressions)
+        baseline[0].wall_time = result.wall_time / 2
+        baseline[0].peak_memory = result.peak_memory // 2
+        comparison = compare(results, baseline)[0]
+        self.assertEqual(["time", "memory"], comparison.regressions)
+        self.assertIn("REGRESSION", format_report([comparison]))
+
+    def test_startup(self):
+        times = time_command(["--help"], repeat=2)
+        self.assertEqual(2, len(times))
+        report = format_startup_report([StartupResult("help", ["--help"], min(times), max(times))])
+        self.assertIn("help", report)
@@ -28,3 +28,20 @@ class TestContext(unittest.TestCase):
         new_context = context.extend(None, "foo")
         self.assertEqual([], context.target_path)
         self.assertEqual(["foo"], new_context.target_path)
+
+    def test_paths_are_shared(self):
+        sv = package_schemaview("linkml_runtime.linkml_model.meta")
+        context = Context(schemaview=sv)
+        context.set_root("SchemaDefinition")
+        enums_context = context.extend(sv.get_slot("enums"), "table")
+        self.assertIs(context.source_path, enums_context.source_path.parent)
+        self.assertIs(context.target_path, enums_context.target_path.parent)
+        self.assertTrue(enums_context.in_table)
+        self.assertFalse(context.in_table)
+        indexed_context = enums_context.index_extend("e1", "span")
+        self.assertEqual("e1", indexed_context.current.index)
+        self.assertIsNone(enums_context.current.index)
+        self.assertIs(context.source_path, indexed_context.source_path.parent)
+        self.assertEqual(["table", "span"], indexed_context.target_path)
+        self.assertEqual(2, indexed_context.target_depth)
+        self.assertTrue(indexed_context.in_table)
@@ -0,0 +1,67 @@
+"""Tests for reading slot values of instances."""
+import unittest
+from typing import List, Optional
+
+import pydantic
+import pydantic.v1
+import yaml
+from linkml_runtime import SchemaView
+from linkml_runtime.linkml_model import SchemaDefinition
+
+from linkml_renderer.renderers.accessor import is_object, slot_getter, slot_value
+from linkml_renderer.renderers.markdown_renderer import MarkdownRenderer
+from tests.test_renderers import PERSONINFO_DIR
+
+
+class Person(pydantic.BaseModel):
+    id: str
+    name: Optional[str] = None
+    aliases: List[str] = []
+
+
+class Container(pydantic.BaseModel):
+    model_config = pydantic.ConfigDict(extra="allow")
+    persons: List[Person] = []
+
+
+class PersonV1(pydantic.v1.BaseModel):
+    id: str
+    name: Optional[str] = None
+
+
+class TestAccessor(unittest.TestCase):
+    """Test slot access on each kind of instance."""
+
+    def test_slot_value(self):
+        aliases = ["freddy"]
+        for obj in [
+            {"id": "P:1", "name": "fred", "aliases": aliases},
+            Person(id="P:1", name="fred", aliases=aliases),
+            PersonV1(id="P:1", name="fred"),
+        ]:
+            self.assertTrue(is_object(obj))
+            get = slot_getter(obj)
+            self.assertEqual("P:1", get("id"))
+            self.assertEqual("fred", slot_value(obj, "name"))
+            self.assertIsNone(get("no_such_slot"))
+        schema = SchemaDefinition(id="https://example.org/s", name="fred")
+        self.assertEqual("fred", slot_value(schema, "name"))
+        self.assertIsNone(slot_value(schema, "no_such_slot"))
+        # values are not copied
+        person = Person(id="P:1", aliases=aliases)
+        self.assertIs(person.aliases, slot_value(person, "aliases"))
+        container = Container(persons=[], notes="extra")
+        self.assertEqual("extra", slot_value(container, "notes"))
+        self.assertFalse(is_object("P:1"))
+        self.assertFalse(is_object([]))
+        with self.assertRaises(ValueError):
+            slot_getter("P:1")
+
+    def test_render_pydantic(self):
+        sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        with open(str(PERSONINFO_DIR / "Container-001.yaml"), "r", encoding="UTF-8") as f:
+            obj = yaml.safe_load(f)
+        persons = [{k: v for k, v in p.items() if k in ("id", "name")} for p in obj["persons"]]
+        model = Container(persons=[Person(**p) for p in persons])
+        renderer = MarkdownRenderer()
+        self.assertEqual(renderer.render({"persons": persons}, sv), renderer.render(model, sv))
@@ -1,9 +1,12 @@
+import json
 import os
+import shutil
 import unittest
 
+import yaml
 from click.testing import CliRunner
 
-from linkml_renderer.cli import main
+from linkml_renderer.cli import FORMAT_TO_SUFFIX, main
 from tests.test_renderers import INPUT_DIR, OUTPUT_DIR
 
 
@@ -76,3 +79,156 @@ class CliTestSuite(unittest.TestCase):
                 print(f"OUT={out}")
                 print(result.stderr)
                 self.assertEqual(0, result.exit_code)
+
+    def test_render_batch(self):
+        directory = INPUT_DIR / "phenopackets"
+        bad_directory = OUTPUT_DIR / "batch-input"
+        bad_directory.mkdir(exist_ok=True, parents=True)
+        with open(bad_directory / "broken.json", "w") as f:
+            f.write("{not json")
+        outdir = OUTPUT_DIR / "batch"
+        for jobs in ["1", "2"]:
+            result = self.runner.invoke(
+                main,
+                [
+                    "-s",
+                    str(directory / "schema" / "phenopackets.yaml"),
+                    "-c",
+                    str(INPUT_DIR / "conf-pfx.yaml"),
+                    "-d",
+                    str(outdir),
+                    "-j",
+                    jobs,
+                    str(directory / "*.json"),
+                    str(bad_directory),
+                ],
+            )
+            self.assertEqual(1, result.exit_code)
+            self.assertIn("Failed to render", result.stderr)
+            self.assertIn("broken.json", result.stderr)
+            self.assertTrue((outdir / "covid.html").exists())
+            self.assertTrue((outdir / "marfan.html").exists())
+
+    def test_multiple_inputs_require_output_directory(self):
+        directory = INPUT_DIR / "phenopackets"
+        result = self.runner.invoke(
+            main,
+            ["-s", str(directory / "schema" / "phenopackets.yaml"), str(directory)],
+        )
+        self.assertEqual(2, result.exit_code)
+
+    def test_render_records(self):
+        directory = INPUT_DIR / "personinfo"
+        with open(directory / "Container-001.yaml") as f:
+            container = yaml.safe_load(f)
+        records_dir = OUTPUT_DIR / "records-input"
+        records_dir.mkdir(exist_ok=True, parents=True)
+        jsonl_path = records_dir / "containers.jsonl"
+        with open(jsonl_path, "w") as f:
+            for _ in range(3):
+                f.write(json.dumps(container, default=str) + "\n")
+        yaml_path = records_dir / "containers.yaml"
+        with open(yaml_path, "w") as f:
+            yaml.safe_dump_all([container, container], f)
+        schema = str(directory / "personinfo.yaml")
+        for fmt in ["html", "markdown", "mermaid"]:
+            for opts, n in [
+                (["-f", "jsonl", str(jsonl_path)], 3),
+                (["--records", str(yaml_path)], 2),
+            ]:
+                result = self.runner.invoke(main, ["-t", fmt, "-s", schema] + opts)
+                self.assertEqual(0, result.exit_code, result.stderr)
+                if fmt == "html":
+                    self.assertEqual(1, result.stdout.count("<!DOCTYPE html>"))
+                    self.assertEqual(n, result.stdout.count("<section>"))
+                outdir = OUTPUT_DIR / "records" / fmt
+                result = self.runner.invoke(
+                    main, ["-t", fmt, "-s", schema, "-d", str(outdir)] + opts
+                )
+                self.assertEqual(0, result.exit_code, result.stderr)
+                self.assertIn(f"Rendered {n} of {n} records", result.stderr)
+                self.assertTrue((outdir / f"containers-{n}{FORMAT_TO_SUFFIX[fmt]}").exists())
+
+    def test_render_several_formats(self):
+        directory = INPUT_DIR / "personinfo"
+        schema = str(directory / "personinfo.yaml")
+        data = str(directory / "Container-001.yaml")
+        formats = ["html", "markdown", "mermaid"]
+        opts = [arg for fmt in formats for arg in ("-t", fmt)]
+        outpath = OUTPUT_DIR / "cl-multi-Container-001.html"
+        result = self.runner.invoke(main, opts + ["-s", schema, data, "-o", str(outpath)])
+        self.assertEqual(0, result.exit_code, result.stderr)
+        for fmt in formats:
+            single = self.runner.invoke(main, ["-t", fmt, "-s", schema, data])
+            with open(outpath.with_suffix(FORMAT_TO_SUFFIX[fmt]), encoding="utf-8") as f:
+                self.assertEqual(single.stdout, f.read())
+        result = self.runner.invoke(main, opts + ["-s", schema, data])
+        self.assertEqual(2, result.exit_code)
+        outdir = OUTPUT_DIR / "batch-multi"
+        result = self.runner.invoke(main, opts + ["-s", schema, "-d", str(outdir), data])
+        self.assertEqual(0, result.exit_code, result.stderr)
+        for fmt in formats:
+            self.assertTrue((outdir / f"Container-001{FORMAT_TO_SUFFIX[fmt]}").exists())
+
+    def test_profile(self):
+        directory = INPUT_DIR / "personinfo"
+        schema = str(directory / "personinfo.yaml")
+        data = str(directory / "Container-001.yaml")
+        plain = self.runner.invoke(main, ["-t", "markdown", "-s", schema, data])
+        profile_path = OUTPUT_DIR / "profile.json"
+        opts = ["--profile-json", str(profile_path)]
+        result = self.runner.invoke(main, ["-t", "markdown", "-s", schema, data] + opts)
+        self.assertEqual(0, result.exit_code, result.stderr)
+        self.assertEqual(plain.stdout, result.stdout)
+        self.assertIn("visit.objects", result.stderr)
+        with open(profile_path, encoding="utf-8") as f:
+            profile = json.load(f)
+        self.assertEqual(len(plain.stdout.encode("utf-8")), profile["counters"]["bytes.markdown"])
+
+    def test_cache_dir(self):
+        directory = INPUT_DIR / "personinfo"
+        schema = str(directory / "personinfo.yaml")
+        data = str(directory / "Container-001.yaml")
+        cache_dir = OUTPUT_DIR / "schema-cache-cli"
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        plain = self.runner.invoke(main, ["-s", schema, data])
+        for _ in range(2):
+            result = self.runner.invoke(main, ["-s", schema, "--cache-dir", str(cache_dir), data])
+            self.assertEqual(0, result.exit_code, result.stderr)
+            self.assertEqual(plain.stdout, result.stdout)
+        self.assertEqual(1, len(list(cache_dir.iterdir())))
+        shutil.rmtree(cache_dir)
+
+    def test_serve_help(self):
+        result = self.runner.invoke(main, ["serve", "--help"])
+        self.assertEqual(0, result.exit_code, result.stderr)
+        self.assertIn("/render/FORMAT", result.stdout)
+        result = self.runner.invoke(main, ["serve"])
+        self.assertNotEqual(0, result.exit_code)
+
+    def test_repeat_cache_size(self):
+        directory = INPUT_DIR / "personinfo"
+        schema = str(directory / "personinfo.yaml")
+        data = str(directory / "Container-001.yaml")
+        plain = self.runner.invoke(main, ["-s", schema, data])
+        opts = ["--repeat-cache-size", "100000", "--profile"]
+        result = self.runner.invoke(main, ["-s", schema, data] + opts)
+        self.assertEqual(0, result.exit_code, result.stderr)
+        self.assertEqual(plain.stdout, result.stdout)
+        self.assertIn("repeats.misses", result.stderr)
+
+    def test_incremental(self):
+        directory = INPUT_DIR / "personinfo"
+        schema = str(directory / "personinfo.yaml")
+        data = str(directory / "Container-001.yaml")
+        outpath = OUTPUT_DIR / "incremental-Container-001.html"
+        plain = self.runner.invoke(main, ["-s", schema, data])
+        opts = ["-s", schema, "--incremental", data, "-o", str(outpath)]
+        for _ in range(2):
+            result = self.runner.invoke(main, opts)
+            self.assertEqual(0, result.exit_code, result.stderr)
+            with open(outpath, encoding="utf-8") as f:
+                self.assertEqual(plain.stdout, f.read())
+        self.assertTrue(outpath.with_name(outpath.name + ".fragments.json").exists())
+        result = self.runner.invoke(main, ["-s", schema, "--incremental", data])
+        self.assertEqual(2, result.exit_code)
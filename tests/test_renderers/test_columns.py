@@ -0,0 +1,36 @@
+"""Tests for the table pre-scan."""
+import unittest
+
+from linkml_runtime import SchemaView
+
+from linkml_renderer.renderers.columns import scan_columns
+from linkml_renderer.renderers.render_plan import render_plan_cache
+from tests.test_renderers import PERSONINFO_DIR
+
+
+class TestColumns(unittest.TestCase):
+    """Test detection of populated columns and their statistics."""
+
+    def test_scan_columns(self):
+        sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        slots = render_plan_cache.get(sv, "Person").ordered_slots
+        rows = [
+            {"id": "P:1", "name": "fred", "primary_email": None, "unknown": "x"},
+            {"id": "P:22", "age_in_years": 33, "has_employment_history": []},
+            {"id": "P:3", "has_familial_relationships": [{"related_to": "P:1"}]},
+            "P:4",
+        ]
+        columns = scan_columns(rows, slots)
+        self.assertEqual(
+            ["id", "name", "age_in_years", "has_familial_relationships"],
+            [column.slot.name for column in columns],
+        )
+        self.assertEqual([0, 1, 2, 3], [column.index for column in columns])
+        id_column = columns[0]
+        self.assertEqual(3, id_column.populated)
+        self.assertEqual(4, id_column.max_width)
+        self.assertEqual({"str"}, id_column.types)
+        self.assertEqual({"int"}, columns[2].types)
+        self.assertEqual({"list"}, columns[3].types)
+        self.assertEqual(0, columns[3].max_width)
+        self.assertEqual([], scan_columns(["P:1", "P:2"], slots))
@@ -0,0 +1,71 @@
+"""Tests for recording and replaying render events."""
+import unittest
+from io import StringIO
+
+import yaml
+from linkml_runtime import SchemaView
+
+from linkml_renderer.renderers.events import (
+    EventRecorder,
+    EventType,
+    dump_events,
+    load_events,
+    record,
+)
+from linkml_renderer.renderers.html_renderer import HTMLRenderer
+from linkml_renderer.renderers.markdown_renderer import MarkdownRenderer
+from linkml_renderer.renderers.mermaid_renderer import MermaidRenderer
+from linkml_renderer.renderers.traversal import TraversalEngine
+from linkml_renderer.style.model import RenderElementType
+from linkml_renderer.style.style_engine import StyleEngine
+from tests.test_renderers import PERSONINFO_DIR
+
+
+class TestEvents(unittest.TestCase):
+    """Test that replaying recorded events gives the same output as a traversal."""
+
+    def setUp(self) -> None:
+        self.sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        with open(str(PERSONINFO_DIR / "Container-001.yaml"), "r", encoding="UTF-8") as f:
+            self.obj = yaml.safe_load(f)
+
+    def test_record(self):
+        recorder = EventRecorder()
+        TraversalEngine(self.sv).walk(self.obj, recorder)
+        events = recorder.events
+        self.assertEqual(events, record(self.obj, self.sv))
+        self.assertEqual(EventType.START_DOCUMENT, events[0][0])
+        self.assertEqual(EventType.END_DOCUMENT, events[-1][0])
+        self.assertIn((EventType.ATOM, "fred bloggs", None), events)
+        self.assertIn(
+            (EventType.START_SLOT, "Person", "name", "http://schema.org/name", False), events
+        )
+        persons = next(e for e in events if e[0] == EventType.START_COLLECTION)
+        self.assertEqual((2, None, "Person"), persons[1:4])
+        self.assertEqual(["id", "name"], persons[4][:2])
+
+    def test_replay(self):
+        se = StyleEngine(self.sv)
+        se.configure_slots(["has_employment_history"], RenderElementType.TUPLE)
+        se.configuration.include_diagrams = True
+        events = record(self.obj, self.sv, style_engine=se)
+        stream = StringIO()
+        dump_events(events, stream)
+        for renderer_class in [HTMLRenderer, MarkdownRenderer, MermaidRenderer]:
+            renderer = renderer_class(style_engine=se)
+            expected = renderer.render(self.obj, self.sv)
+            self.assertEqual(expected, renderer.render_events(events, self.sv))
+            loaded = load_events(StringIO(stream.getvalue()))
+            self.assertEqual(expected, renderer.render_events(loaded, self.sv))
+
+    def test_replay_skips_and_stops(self):
+        se = StyleEngine(self.sv)
+        obj = {"persons": [{"id": f"P:{i}", "name": f"person {i}"} for i in range(50)]}
+        events = record(obj, self.sv)
+        renderer = MermaidRenderer(style_engine=se)
+        for setting, value in [("diagram_max_fan_out", 10), ("diagram_max_nodes", 20)]:
+            setattr(se.configuration, setting, value)
+            expected = renderer.render(obj, self.sv)
+            self.assertIn("more", expected)
+            self.assertEqual(expected, renderer.render_events(events, self.sv))
+            setattr(se.configuration, setting, None)
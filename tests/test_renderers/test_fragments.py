@@ -0,0 +1,141 @@
+"""Tests for incremental rendering from fragments of the previous output."""
+import copy
+import unittest
+
+import yaml
+from linkml_runtime import SchemaView
+
+from linkml_renderer.renderers.fragments import (
+    FragmentCache,
+    RepeatCache,
+    manifest_path,
+    subtree_hash,
+)
+from linkml_renderer.renderers.html_renderer import HTMLRenderer
+from linkml_renderer.renderers.markdown_renderer import MarkdownRenderer
+from linkml_renderer.style.model import RenderElementType
+from linkml_renderer.style.style_engine import StyleEngine
+from tests.test_renderers import OUTPUT_DIR, PERSONINFO_DIR
+
+
+class TestFragments(unittest.TestCase):
+    """Test that incremental renders give the same output as full renders."""
+
+    def setUp(self) -> None:
+        self.sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        with open(str(PERSONINFO_DIR / "Container-001.yaml"), "r", encoding="UTF-8") as f:
+            self.obj = yaml.safe_load(f)
+        OUTPUT_DIR.mkdir(exist_ok=True, parents=True)
+
+    def test_subtree_hash(self):
+        memo = {}
+        h = subtree_hash(self.obj, memo)
+        self.assertEqual(h, subtree_hash(copy.deepcopy(self.obj)))
+        changed = copy.deepcopy(self.obj)
+        changed["persons"][1]["name"] = "Someone else"
+        self.assertNotEqual(h, subtree_hash(changed))
+        self.assertEqual(subtree_hash(self.obj["persons"][0]), subtree_hash(changed["persons"][0]))
+        # slots with no value do not count
+        person = dict(self.obj["persons"][0], aliases=None)
+        self.assertEqual(subtree_hash(self.obj["persons"][0]), subtree_hash(person))
+        self.assertNotEqual(subtree_hash({"age": 1}), subtree_hash({"age": "1"}))
+
+    def test_incremental(self):
+        se = StyleEngine(self.sv)
+        se.configure_slots(["has_employment_history"], RenderElementType.TUPLE)
+        changed = copy.deepcopy(self.obj)
+        changed["persons"][1]["name"] = "Someone else"
+        for renderer_class in [HTMLRenderer, MarkdownRenderer]:
+            full = renderer_class(style_engine=se)
+            renderer = renderer_class(style_engine=se, fragments=FragmentCache())
+            self.assertEqual(full.render(self.obj, self.sv), renderer.render(self.obj, self.sv))
+            fragments = renderer.fragments
+            self.assertEqual(0, fragments.spliced)
+            n = fragments.rendered
+            self.assertGreater(n, 1)
+            self.assertEqual(full.render(changed, self.sv), renderer.render(changed, self.sv))
+            # only the changed person and the container are rendered again
+            self.assertEqual(2, fragments.rendered)
+            self.assertGreater(fragments.spliced, 0)
+            self.assertEqual(n, len(fragments.fragments))
+            self.assertEqual(full.render(changed, self.sv), renderer.render(changed, self.sv))
+            self.assertEqual((0, 1), (fragments.rendered, fragments.spliced))
+
+    def test_manifest(self):
+        path = OUTPUT_DIR / "fragments-person.md"
+        manifest = manifest_path(path)
+        self.assertEqual("fragments-person.md.fragments.json", manifest.name)
+        renderer = MarkdownRenderer(fragments=FragmentCache())
+        expected = renderer.render(self.obj, self.sv)
+        renderer.fragments.save(manifest)
+        loaded = FragmentCache.load(manifest)
+        self.assertEqual(renderer.fragments.fragments, loaded.fragments)
+        renderer = MarkdownRenderer(fragments=loaded)
+        self.assertEqual(expected, renderer.render(self.obj, self.sv))
+        self.assertEqual(1, loaded.spliced)
+        # a different style invalidates all fragments
+        se = StyleEngine(self.sv)
+        se.configure_slots(["persons"], RenderElementType.description_list)
+        renderer = MarkdownRenderer(style_engine=se, fragments=loaded)
+        self.assertEqual(
+            MarkdownRenderer(style_engine=se).render(self.obj, self.sv),
+            renderer.render(self.obj, self.sv),
+        )
+        self.assertEqual(0, loaded.spliced)
+        self.assertEqual({}, FragmentCache.load(OUTPUT_DIR / "no-such-manifest.json").fragments)
+
+    def test_repeats(self):
+        # every person has the same medical history, with the same diagnosis in each event
+        history = self.obj["persons"][1]["has_medical_history"]
+        obj = copy.deepcopy(self.obj)
+        for i in range(5):
+            obj["persons"].append(
+                {
+                    "id": f"P:1{i}",
+                    "name": f"p{i}",
+                    "has_medical_history": copy.deepcopy(history * 3),
+                }
+            )
+        se = StyleEngine(self.sv)
+        se.configure_slots(["has_medical_history"], RenderElementType.description_list)
+        for renderer_class in [HTMLRenderer, MarkdownRenderer]:
+            expected = renderer_class(style_engine=se).render(obj, self.sv)
+            cache = RepeatCache()
+            renderer = renderer_class(style_engine=se, repeat_cache=cache)
+            self.assertEqual(expected, renderer.render(obj, self.sv))
+            self.assertGreater(cache.hits, 0)
+            self.assertGreater(cache.stats()["entries"], 0)
+            hits = cache.hits
+            # the cache is emptied between renders, statistics are kept
+            self.assertEqual(expected, renderer.render(obj, self.sv))
+            self.assertEqual(2 * hits, cache.hits)
+            # with fragments of the previous render, repeats are reused from either
+            renderer.fragments = FragmentCache()
+            self.assertEqual(expected, renderer.render(obj, self.sv))
+            self.assertEqual(expected, renderer.render(obj, self.sv))
+            # objects larger than max_values are not cached
+            cache = RepeatCache(max_values=1)
+            renderer = renderer_class(style_engine=se, repeat_cache=cache)
+            self.assertEqual(expected, renderer.render(obj, self.sv))
+            self.assertEqual((0, 0), (cache.hits, cache.misses))
+
+    def test_repeat_cache_eviction(self):
+        cache = RepeatCache(max_size=10)
+        cache.put("a", "12345")
+        cache.put("b", "12345")
+        self.assertEqual("12345", cache.get("a"))
+        cache.put("c", "12345")
+        # b was used least recently
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual("12345", cache.get("a"))
+        cache.put("d", "x" * 11)
+        self.assertIsNone(cache.get("d"))
+        self.assertEqual(
+            {"hits": 2, "misses": 0, "evictions": 1, "entries": 2, "size": 10}, cache.stats()
+        )
+        self.assertFalse(cache.admit("e"))
+        self.assertTrue(cache.admit("e"))
+        cache.reset()
+        self.assertEqual(
+            {"hits": 0, "misses": 0, "evictions": 0, "entries": 0, "size": 0}, cache.stats()
+        )
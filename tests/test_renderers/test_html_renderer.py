@@ -1,6 +1,7 @@
 """Demo version test."""
 import logging
 import unittest
+from io import BytesIO, StringIO
 
 import yaml
 from linkml_runtime import SchemaView
@@ -9,6 +10,7 @@ from linkml_runtime.utils.introspection import package_schemaview
 
 from linkml_renderer.renderers import html_renderer
 from linkml_renderer.renderers.html_renderer import HTMLRenderer
+from linkml_renderer.renderers.pagination import pager_for
 from linkml_renderer.style.model import RenderElementType
 from linkml_renderer.style.style_engine import StyleEngine
 from tests.test_renderers import OUTPUT_DIR, PERSONINFO_DIR
@@ -73,3 +75,53 @@ class TestHTMLRenderer(unittest.TestCase):
             html = self.dumper.render(obj, sv)
             with open(OUTPUT_DIR / "person.narrow.html", "w") as f:
                 f.write(html)
+
+    def test_render_to_stream(self):
+        sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        self.dumper.style_engine = StyleEngine(sv)
+        with open(str(PERSONINFO_DIR / "Container-001.yaml"), "r", encoding="UTF-8") as f:
+            obj = yaml.safe_load(f)
+        html = self.dumper.render(obj, sv)
+        for chunk_size in [1, 100, 1000000]:
+            text_stream = StringIO()
+            self.dumper.render_to(text_stream, obj, sv, chunk_size=chunk_size)
+            self.assertEqual(html, text_stream.getvalue())
+        binary_stream = BytesIO()
+        self.dumper.render_to(binary_stream, obj, sv, chunk_size=100)
+        self.assertEqual(html, binary_stream.getvalue().decode("utf-8"))
+
+    def test_table_pages(self):
+        sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        se = StyleEngine(sv)
+        self.dumper.style_engine = se
+        obj = {
+            "persons": [
+                {"id": f"P:{i:03d}", "name": f"person {i}", "age_in_years": i} for i in range(25)
+            ]
+        }
+        html = self.dumper.render(obj, sv)
+        self.assertEqual(1, html.count("<table"))
+        se.configuration.table_page_size = 10
+        # without a pager, all pages are written to the document
+        html = self.dumper.render(obj, sv)
+        self.assertEqual(3, html.count("<table"))
+        self.assertEqual(25, html.count("person "))
+        self.assertIn('href="#Person__persons-3"', html)
+        # with a pager, only the first page is in the document
+        page_dir = OUTPUT_DIR / "pages"
+        page_files = {}
+        for jobs in [1, 2]:
+            pager = pager_for(page_dir / f"persons{jobs}.html", jobs=jobs)
+            html = self.dumper.render(obj, sv, pager=pager)
+            self.assertEqual(1, html.count("<table"))
+            self.assertEqual(10, html.count("person "))
+            self.assertIn(f'href="persons{jobs}-persons-2.html"', html)
+            self.assertEqual(
+                [page_dir / f"persons{jobs}-persons-{n}.html" for n in [2, 3]], pager.written
+            )
+            pages = [p.read_text().replace(f"persons{jobs}", "persons") for p in pager.written]
+            self.assertIn("person 24", pages[1])
+            self.assertEqual(5, pages[1].count("person "))
+            self.assertIn('href="persons.html#persons-1"', pages[1])
+            page_files[jobs] = pages
+        self.assertEqual(page_files[1], page_files[2])
@@ -1,6 +1,9 @@
 """Demo version test."""
+import asyncio
 import logging
+import threading
 import unittest
+from io import StringIO
 
 import yaml
 from linkml_runtime import SchemaView
@@ -56,3 +59,85 @@ class TestMarkdownRenderer(unittest.TestCase):
             html = self.dumper.render(obj, sv)
             with open(OUTPUT_DIR / "person.md", "w") as f:
                 f.write(html)
+
+    def test_render_iter(self):
+        sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        self.dumper.style_engine = StyleEngine(sv)
+        with open(str(PERSONINFO_DIR / "Container-001.yaml"), "r", encoding="UTF-8") as f:
+            obj = yaml.safe_load(f)
+        md = self.dumper.render(obj, sv)
+        chunks = list(self.dumper.render_iter(obj, sv, chunk_size=50))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(md, "".join(chunks))
+        # stopping early must not leave the producer blocked
+        chunk_iter = self.dumper.render_iter(obj, sv, chunk_size=1)
+        self.assertEqual(md[0], next(chunk_iter)[0])
+        chunk_iter.close()
+        stream = StringIO()
+        self.dumper.render_to(stream, obj, sv)
+        self.assertEqual(md, stream.getvalue())
+
+    def test_arender(self):
+        sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        self.dumper.style_engine = StyleEngine(sv)
+        with open(str(PERSONINFO_DIR / "Container-001.yaml"), "r", encoding="UTF-8") as f:
+            obj = yaml.safe_load(f)
+        md = self.dumper.render(obj, sv)
+
+        async def consume(chunk_size: int, limit: int = None):
+            ticks = []
+
+            async def tick():
+                while True:
+                    ticks.append(len(ticks))
+                    await asyncio.sleep(0)
+
+            ticker = asyncio.create_task(tick())
+            chunks = []
+            async for chunk in self.dumper.arender(obj, sv, chunk_size=chunk_size):
+                chunks.append(chunk)
+                if len(chunks) == limit:
+                    break
+            ticker.cancel()
+            return chunks, ticks
+
+        chunks, ticks = asyncio.run(consume(50))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(md, "".join(chunks))
+        # other tasks ran while the document was being rendered
+        self.assertGreaterEqual(len(ticks), len(chunks))
+        # stopping early stops the producer
+        chunks, _ = asyncio.run(consume(1, limit=2))
+        self.assertEqual(md[:2], "".join(chunks)[:2])
+        for thread in threading.enumerate():
+            if thread.name == "linkml-render-producer":
+                thread.join(timeout=5)
+                self.assertFalse(thread.is_alive())
+
+        async def fail():
+            return [c async for c in self.dumper.arender(obj, sv, source_element_name="Nope")]
+
+        with self.assertRaisesRegex(ValueError, "Nope"):
+            asyncio.run(fail())
+
+    def test_render_many(self):
+        sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        self.dumper.style_engine = StyleEngine(sv)
+        with open(str(PERSONINFO_DIR / "Container-001.yaml"), "r", encoding="UTF-8") as f:
+            obj = yaml.safe_load(f)
+        md = self.dumper.render(obj, sv)
+        consumed = []
+
+        def records():
+            for i in range(3):
+                consumed.append(i)
+                yield obj
+
+        outputs = self.dumper.render_many(records(), sv)
+        self.assertEqual(md, next(outputs))
+        # records are consumed lazily
+        self.assertEqual([0], consumed)
+        self.assertEqual([md, md], list(outputs))
+        stream = StringIO()
+        self.dumper.render_many_to(stream, [obj, obj], sv)
+        self.assertEqual(md + self.dumper.record_separator + md, stream.getvalue())
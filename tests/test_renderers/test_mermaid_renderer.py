@@ -58,3 +58,50 @@ class TestMermaidRenderer(unittest.TestCase):
                 f.write("```mermaid\n")
                 f.write(html)
                 f.write("```")
+
+    def test_node_ids(self):
+        sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        self.renderer.style_engine = StyleEngine(sv)
+        with open(str(PERSONINFO_DIR / "Container-001.yaml"), "r", encoding="UTF-8") as f:
+            obj = yaml.safe_load(f)
+        mermaid = self.renderer.render(obj, sv)
+        # ids are scoped to a render, so rendering again gives the same output
+        self.assertEqual(mermaid, self.renderer.render(obj, sv))
+        self.assertEqual(mermaid, MermaidRenderer(style_engine=StyleEngine(sv)).render(obj, sv))
+        # each node is defined once
+        entities = [line for line in mermaid.splitlines() if "-->" not in line]
+        self.assertEqual(len(entities), len(set(entities)))
+        self.assertIn("ANON__fMedicalEvent_", mermaid)
+
+    def test_budgets(self):
+        sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        se = StyleEngine(sv)
+        self.renderer.style_engine = se
+        obj = {
+            "persons": [
+                {
+                    "id": f"P:{i}",
+                    "name": f"person {i}",
+                    "has_employment_history": [{"employed_at": "ROR:1"}],
+                }
+                for i in range(5000)
+            ]
+        }
+        se.configuration.diagram_max_fan_out = 10
+        mermaid = self.renderer.render(obj, sv)
+        self.assertIn('"+ 4,990 more"', mermaid)
+        self.assertNotIn("P:10", mermaid)
+        se.configuration.diagram_max_fan_out = None
+        se.configuration.diagram_max_nodes = 20
+        mermaid = self.renderer.render(obj, sv)
+        nodes = [
+            line for line in mermaid.splitlines()[1:] if "->" not in line and "MORE__" not in line
+        ]
+        self.assertEqual(20, len(nodes))
+        self.assertIn("more", mermaid)
+        se.configuration.diagram_max_nodes = None
+        se.configuration.diagram_max_depth = 1
+        mermaid = self.renderer.render(obj, sv)
+        self.assertIn("P:4999", mermaid)
+        self.assertNotIn("ROR:1", mermaid)
+        self.assertIn('"+ 1 more"', mermaid)
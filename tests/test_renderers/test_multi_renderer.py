@@ -0,0 +1,122 @@
+"""Tests for rendering several formats in one traversal."""
+import unittest
+
+import yaml
+from linkml_runtime import SchemaView
+
+from linkml_renderer.renderers.html_renderer import HTMLRenderer
+from linkml_renderer.renderers.markdown_renderer import MarkdownRenderer
+from linkml_renderer.renderers.mermaid_renderer import MermaidRenderer
+from linkml_renderer.renderers.multi_renderer import MultiRenderer
+from linkml_renderer.renderers.traversal import (
+    Descend,
+    TeeBackend,
+    TraversalBackend,
+    TraversalEngine,
+)
+from linkml_renderer.style.model import RenderElementType
+from linkml_renderer.style.style_engine import StyleEngine
+from tests.test_renderers import OUTPUT_DIR, PERSONINFO_DIR
+
+FORMATS = {"html": HTMLRenderer, "markdown": MarkdownRenderer, "mermaid": MermaidRenderer}
+
+
+class RecordingBackend(TraversalBackend):
+    """Records the calls it receives, optionally skipping a slot or stopping collections."""
+
+    def __init__(self, skip_slot=None, max_items=None):
+        self.calls = []
+        self.skip_slot = skip_slot
+        self.max_items = max_items
+        self._items = []
+
+    def start_object(self, class_name, identifier, title, description):
+        self.calls.append(("start_object", class_name, identifier))
+        return Descend.VISIT
+
+    def end_object(self):
+        self.calls.append(("end_object",))
+
+    def start_slot(self, slot, slot_uri, empty):
+        self.calls.append(("start_slot", slot.name))
+        return Descend.SKIP if slot.name == self.skip_slot else Descend.VISIT
+
+    def end_slot(self):
+        self.calls.append(("end_slot",))
+
+    def start_collection(self, size, keys, columns, collection=None, context=None, stats=None):
+        self.calls.append(("start_collection", size))
+        self._items.append(0)
+        return Descend.VISIT
+
+    def end_collection(self, remaining):
+        self.calls.append(("end_collection", remaining))
+        self._items.pop()
+
+    def start_item(self, key):
+        if self.max_items is not None and self._items[-1] >= self.max_items:
+            return Descend.STOP
+        self._items[-1] += 1
+        self.calls.append(("start_item", key))
+        return Descend.VISIT
+
+    def end_item(self):
+        self.calls.append(("end_item",))
+
+    def atom(self, value, url):
+        self.calls.append(("atom", value))
+
+    def reference(self, value):
+        self.calls.append(("reference", value))
+
+
+class TestMultiRenderer(unittest.TestCase):
+    """Test that one traversal gives the same output as rendering each format alone."""
+
+    def setUp(self) -> None:
+        self.sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        with open(str(PERSONINFO_DIR / "Container-001.yaml"), "r", encoding="UTF-8") as f:
+            self.obj = yaml.safe_load(f)
+        OUTPUT_DIR.mkdir(exist_ok=True, parents=True)
+
+    def test_same_as_individual_renderers(self):
+        se = StyleEngine(self.sv)
+        se.configure_slots(["has_employment_history"], RenderElementType.TUPLE)
+        multi = MultiRenderer.for_formats(FORMATS, se)
+        outputs = multi.render(self.obj, self.sv)
+        self.assertEqual(list(FORMATS), list(outputs))
+        for fmt, renderer_class in FORMATS.items():
+            expected = renderer_class(style_engine=se).render(self.obj, self.sv)
+            self.assertEqual(expected, outputs[fmt], fmt)
+        outputs = MultiRenderer.for_formats({"markdown": MarkdownRenderer}, se).render(
+            self.obj, self.sv
+        )
+        self.assertEqual(
+            MarkdownRenderer(style_engine=se).render(self.obj, self.sv), outputs["markdown"]
+        )
+
+    def test_render_to_files(self):
+        multi = MultiRenderer.for_formats(FORMATS, StyleEngine(self.sv))
+        paths = {fmt: OUTPUT_DIR / f"multi-person.{fmt}" for fmt in FORMATS}
+        multi.render_to_files(paths, self.obj, self.sv)
+        for fmt, path in paths.items():
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(multi.renderers[fmt].render(self.obj, self.sv), f.read())
+
+    def test_tee_backend(self):
+        def walk(backend):
+            TraversalEngine(self.sv).walk(self.obj, backend)
+
+        backends = [
+            RecordingBackend(),
+            RecordingBackend(skip_slot="has_employment_history"),
+            RecordingBackend(max_items=1),
+        ]
+        walk(TeeBackend(backends))
+        for tee_backend in backends:
+            alone = RecordingBackend(tee_backend.skip_slot, tee_backend.max_items)
+            walk(alone)
+            self.assertEqual(alone.calls, tee_backend.calls)
+        self.assertIn(("start_slot", "has_employment_history"), backends[1].calls)
+        self.assertLess(len(backends[1].calls), len(backends[0].calls))
+        self.assertIn(("end_collection", 1), backends[2].calls)
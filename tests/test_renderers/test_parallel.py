@@ -0,0 +1,67 @@
+"""Tests for rendering the collections of a document in parallel."""
+import copy
+import unittest
+from io import StringIO
+
+import yaml
+from linkml_runtime import SchemaView
+
+from linkml_renderer.renderers.html_renderer import HTMLRenderer
+from linkml_renderer.renderers.markdown_renderer import MarkdownRenderer
+from linkml_renderer.renderers.mermaid_renderer import MermaidRenderer
+from linkml_renderer.renderers.parallel import ParallelRender, WorkUnit
+from linkml_renderer.renderers.profiling import RenderProfile
+from linkml_renderer.style.style_engine import StyleEngine
+from tests.test_renderers import PERSONINFO_DIR
+
+
+class TestParallel(unittest.TestCase):
+    """Test that parallel renders are the same as serial ones."""
+
+    def setUp(self) -> None:
+        """Setup."""
+        self.sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        with open(PERSONINFO_DIR / "Container-001.yaml", encoding="utf-8") as f:
+            container = yaml.safe_load(f)
+        obj = copy.deepcopy(container)
+        obj["persons"] = []
+        for i in range(20):
+            person = copy.deepcopy(container["persons"][i % len(container["persons"])])
+            person["id"] = f"P:{i}"
+            obj["persons"].append(person)
+        self.obj = obj
+
+    def test_render(self):
+        options = ParallelRender(jobs=2, min_members=5, unit_size=3)
+        for renderer_class in [HTMLRenderer, MarkdownRenderer, MermaidRenderer]:
+            se = StyleEngine(self.sv)
+            expected = renderer_class(style_engine=se).render(self.obj, self.sv)
+            renderer = renderer_class(style_engine=se, parallel=options, profile=RenderProfile())
+            self.assertEqual(expected, renderer.render(self.obj, self.sv))
+            spliced = renderer.profile.counters.get("fragments.spliced", 0)
+            if renderer_class is MermaidRenderer:
+                # mermaid cannot splice fragments, and renders everything itself
+                self.assertEqual(0, spliced)
+            else:
+                # the persons, but not the organizations, which are too few
+                self.assertEqual(len(self.obj["persons"]), spliced, renderer_class.__name__)
+
+    def test_other_states(self):
+        # workers render whole documents; sections of a document are in another state,
+        # and their members are rendered again
+        renderer = HTMLRenderer(style_engine=StyleEngine(self.sv))
+        expected = StringIO()
+        renderer.render_many_to(expected, [self.obj, self.obj], self.sv)
+        renderer.parallel = ParallelRender(jobs=2, min_members=5)
+        stream = StringIO()
+        renderer.render_many_to(stream, [self.obj, self.obj], self.sv)
+        self.assertEqual(expected.getvalue(), stream.getvalue())
+
+    def test_units(self):
+        options = ParallelRender(jobs=2, min_members=10)
+        self.assertEqual([], options.units("persons", 9))
+        units = options.units("persons", 20)
+        self.assertEqual(7, len(units))
+        self.assertEqual(WorkUnit("persons", 18, 20), units[-1])
+        self.assertEqual(list(range(20)), [n for u in units for n in range(u.start, u.stop)])
+        self.assertIsNone(ParallelRender(jobs=1).parts(HTMLRenderer(), self.sv))
@@ -0,0 +1,76 @@
+"""Tests for render profiling."""
+import unittest
+
+import yaml
+from linkml_runtime import SchemaView
+
+from linkml_renderer.paths.context import Context
+from linkml_renderer.renderers.html_renderer import HTMLRenderer
+from linkml_renderer.renderers.markdown_renderer import MarkdownRenderer
+from linkml_renderer.renderers.mermaid_renderer import MermaidRenderer
+from linkml_renderer.renderers.multi_renderer import MultiRenderer
+from linkml_renderer.renderers.profiling import RenderProfile
+from linkml_renderer.style.style_engine import StyleEngine
+from tests.test_renderers import PERSONINFO_DIR
+
+
+class TestProfiling(unittest.TestCase):
+    """Test that profiling counts a render without changing it."""
+
+    def setUp(self) -> None:
+        self.sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        with open(str(PERSONINFO_DIR / "Container-001.yaml"), "r", encoding="UTF-8") as f:
+            self.obj = yaml.safe_load(f)
+
+    def test_counters(self):
+        se = StyleEngine(self.sv)
+        copy = Context._copy
+        for renderer_class in [HTMLRenderer, MarkdownRenderer, MermaidRenderer]:
+            expected = renderer_class(style_engine=se).render(self.obj, self.sv)
+            profile = RenderProfile()
+            renderer = renderer_class(style_engine=se, profile=profile)
+            self.assertEqual(expected, renderer.render(self.obj, self.sv))
+            counters = profile.counters
+            self.assertEqual(1, counters["visit.documents"])
+            self.assertGreater(counters["visit.objects"], 1)
+            self.assertGreater(counters["visit.atoms"], 1)
+            self.assertGreater(counters["style.title_slot"], 0)
+            self.assertGreater(counters["context.copies"], 0)
+            name = renderer.render_type.value.lower()
+            self.assertEqual(len(expected.encode("utf-8")), counters[f"bytes.{name}"])
+            self.assertIn("phase.traverse", profile.timers)
+            # wrappers only exist during the render
+            self.assertNotIn("get_uri", self.sv.__dict__)
+            self.assertNotIn("slot_render_as", se.__dict__)
+            self.assertIs(copy, Context._copy)
+
+    def test_schema_lookups(self):
+        # render plans are compiled on first use, so a fresh schema is looked up in
+        sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        profile = RenderProfile()
+        MarkdownRenderer(profile=profile).render(self.obj, sv)
+        self.assertGreater(profile.counters["schema.class_induced_slots"], 0)
+        self.assertGreater(profile.timers["schema.class_induced_slots"], 0)
+        self.assertNotIn("class_induced_slots", sv.__dict__)
+
+    def test_multi_renderer(self):
+        profile = RenderProfile()
+        formats = {"html": HTMLRenderer, "markdown": MarkdownRenderer}
+        multi = MultiRenderer.for_formats(formats, StyleEngine(self.sv), profile)
+        outputs = multi.render(self.obj, self.sv)
+        # both formats are written from one traversal
+        self.assertEqual(1, profile.counters["visit.documents"])
+        for fmt, output in outputs.items():
+            self.assertEqual(len(output.encode("utf-8")), profile.counters[f"bytes.{fmt}"])
+
+    def test_merge_and_report(self):
+        profile = RenderProfile()
+        profile.count("visit.objects", 2)
+        profile.add_time("phase.traverse", 0.5)
+        other = RenderProfile({"visit.objects": 3}, {"phase.traverse": 0.25})
+        profile.merge(other)
+        self.assertEqual(
+            {"counters": {"visit.objects": 5}, "timers": {"phase.traverse": 0.75}},
+            profile.to_dict(),
+        )
+        self.assertIn("visit.objects", profile.summary())
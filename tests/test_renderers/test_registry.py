@@ -0,0 +1,39 @@
+"""Tests for the registry of renderers by format name."""
+import subprocess
+import sys
+import unittest
+
+from linkml_renderer.registry import RendererRegistry
+from linkml_renderer.renderers.markdown_renderer import MarkdownRenderer
+from linkml_renderer.renderers.mermaid_renderer import MermaidRenderer
+
+
+class TestRegistry(unittest.TestCase):
+    """Test lookup and registration of renderers."""
+
+    def test_builtins(self):
+        registry = RendererRegistry(group=None)
+        self.assertEqual(["html", "markdown", "mermaid"], list(registry))
+        self.assertIs(MermaidRenderer, registry["mermaid"])
+        with self.assertRaises(KeyError):
+            registry["rst"]
+
+    def test_register(self):
+        registry = RendererRegistry(group=None)
+        registry.register("md", MarkdownRenderer)
+        self.assertIs(MarkdownRenderer, registry["md"])
+        registry.register("diagram", "linkml_renderer.renderers.mermaid_renderer:MermaidRenderer")
+        self.assertIs(MermaidRenderer, registry["diagram"])
+        self.assertEqual(5, len(registry))
+
+    def test_lazy_imports(self):
+        # loading the command line interface imports neither renderers nor schemas
+        code = (
+            "import sys, linkml_renderer.cli; "
+            "print(sorted(m for m in sys.modules if m.startswith(("
+            "'linkml_runtime', 'airium', 'linkml_renderer.renderers'))))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        self.assertEqual("[]", result.stdout.strip())
@@ -0,0 +1,53 @@
+"""Tests for compiled render plans."""
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from linkml_runtime import SchemaView
+
+from linkml_renderer.renderers.render_plan import RenderPlanCache
+from tests.test_renderers import PERSONINFO_DIR
+
+
+class TestRenderPlan(unittest.TestCase):
+    """Test render plan compilation and caching."""
+
+    def setUp(self) -> None:
+        """Setup."""
+        self.sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        self.cache = RenderPlanCache()
+
+    def test_plan(self):
+        plan = self.cache.get(self.sv, "FamilialRelationship")
+        self.assertEqual(
+            ["type", "related_to", "started_at_time", "ended_at_time"],
+            [s.name for s in plan.ordered_slots],
+        )
+        self.assertEqual(
+            "http://schema.org/identifier", self.cache.get(self.sv, "Person").slot_uris["id"]
+        )
+        self.assertEqual("id", self.cache.get(self.sv, "Person").identifier_slot.name)
+
+    def test_cached_per_class(self):
+        plan = self.cache.get(self.sv, "Person")
+        self.assertIs(plan, self.cache.get(self.sv, "Person"))
+        self.assertIsNot(plan, self.cache.get(self.sv, "Organization"))
+        other_sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        self.assertIsNot(plan, self.cache.get(other_sv, "Person"))
+
+    def test_invalidated_on_modification(self):
+        plan = self.cache.get(self.sv, "Person")
+        self.sv.set_modified()
+        self.assertIsNot(plan, self.cache.get(self.sv, "Person"))
+
+    def test_schemaview_unchanged(self):
+        plan = self.cache.get(self.sv, "Person")
+        slot = next(s for s in plan.slots if s.name == "has_medical_history")
+        self.assertTrue(slot.inlined)
+        induced = self.sv.class_induced_slots("Person")
+        self.assertFalse(next(s for s in induced if s.name == "has_medical_history").inlined)
+
+    def test_threads(self):
+        sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        with ThreadPoolExecutor(8) as executor:
+            plans = list(executor.map(lambda _: self.cache.get(sv, "Container"), range(32)))
+        self.assertTrue(all(plan is plans[0] for plan in plans))
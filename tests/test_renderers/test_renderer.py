@@ -1,12 +1,20 @@
 """Demo version test."""
+import copy
 import logging
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
+import yaml
 from linkml_runtime import SchemaView
 
 from linkml_renderer.paths.context import Context
 from linkml_renderer.renderers import renderer
+from linkml_renderer.renderers.fragments import RepeatCache
 from linkml_renderer.renderers.html_renderer import HTMLRenderer
+from linkml_renderer.renderers.markdown_renderer import MarkdownRenderer
+from linkml_renderer.renderers.mermaid_renderer import MermaidRenderer
+from linkml_renderer.style.model import RenderElementType
+from linkml_renderer.style.style_engine import StyleEngine
 from tests.test_renderers import OUTPUT_DIR, PERSONINFO_DIR
 
 logger = logging.getLogger(renderer.__name__)
@@ -34,3 +42,29 @@ class TestRenderer(unittest.TestCase):
         slots = renderer.ordered_slots(context)
         slot_names = [s.name for s in slots]
         self.assertEqual(["type", "related_to", "started_at_time", "ended_at_time"], slot_names)
+
+    def test_shared_between_threads(self):
+        sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        with open(PERSONINFO_DIR / "Container-001.yaml", encoding="utf-8") as f:
+            container = yaml.safe_load(f)
+        history = container["persons"][1]["has_medical_history"]
+        documents = []
+        for i in range(12):
+            obj = copy.deepcopy(container)
+            for person in obj["persons"][i % 3 :]:
+                # repeated objects, written by the repeat cache of each render
+                person["has_medical_history"] = copy.deepcopy(history[i % 2 :] * 3)
+            documents.append(obj)
+        for renderer_class in [HTMLRenderer, MarkdownRenderer, MermaidRenderer]:
+            se = StyleEngine(SchemaView(sv.schema))
+            se.configure_slots(["has_medical_history"], RenderElementType.description_list)
+            expected = [renderer_class(style_engine=se).render(obj, sv) for obj in documents]
+            # one renderer, style engine and schema for all threads
+            se = StyleEngine(sv)
+            se.configure_slots(["has_medical_history"], RenderElementType.description_list)
+            renderer = renderer_class(style_engine=se, repeat_cache=RepeatCache())
+            with ThreadPoolExecutor(6) as executor:
+                rendered = list(executor.map(lambda obj: renderer.render(obj, sv), documents * 3))
+            self.assertEqual(expected * 3, rendered, renderer_class.__name__)
+            if renderer_class is not MermaidRenderer:
+                self.assertGreater(renderer.repeat_cache.hits, 0)
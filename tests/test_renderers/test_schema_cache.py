@@ -0,0 +1,65 @@
+"""Tests for the on-disk cache of loaded schemas."""
+import json
+import shutil
+import unittest
+
+from linkml_renderer.renderers.html_renderer import HTMLRenderer
+from linkml_renderer.schema_cache import SchemaCache, load_schema
+from tests.test_renderers import INPUT_DIR, OUTPUT_DIR
+
+PHENOPACKETS_DIR = INPUT_DIR / "phenopackets"
+
+
+class TestSchemaCache(unittest.TestCase):
+    """Test that schemas loaded from snapshots render as schemas loaded from files."""
+
+    def setUp(self) -> None:
+        # a copy, so that schema files can be changed
+        self.dir = OUTPUT_DIR / "schema-cache"
+        shutil.rmtree(self.dir, ignore_errors=True)
+        shutil.copytree(PHENOPACKETS_DIR / "schema", self.dir / "schema")
+        shutil.copy(INPUT_DIR / "conf-pfx.yaml", self.dir / "conf.yaml")
+        self.schema = str(self.dir / "schema" / "phenopackets.yaml")
+        self.config = str(self.dir / "conf.yaml")
+        with open(PHENOPACKETS_DIR / "marfan.json", encoding="utf-8") as f:
+            self.obj = json.load(f)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def render(self, sv, se) -> str:
+        return HTMLRenderer(style_engine=se).render(self.obj, sv, "Phenopacket")
+
+    def test_cache(self):
+        expected = self.render(*load_schema(self.schema, self.config))
+        cache = SchemaCache(self.dir / "cache")
+        self.assertEqual(expected, self.render(*cache.load(self.schema, self.config)))
+        self.assertEqual((0, 1), (cache.hits, cache.misses))
+        self.assertTrue(cache.snapshot_path(self.schema, self.config).exists())
+        sv, se = cache.load(self.schema, self.config)
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        self.assertEqual(expected, self.render(sv, se))
+        # without a configuration, the snapshot is a different one
+        cache.load(self.schema)
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+
+    def test_invalidated(self):
+        cache = SchemaCache(self.dir / "cache")
+        cache.load(self.schema, self.config)
+        # a change to an imported schema
+        with open(self.dir / "schema" / "base.yaml", "a", encoding="utf-8") as f:
+            f.write("\n# changed\n")
+        cache.load(self.schema, self.config)
+        cache.load(self.schema, self.config)
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+        # a change to the configuration
+        with open(self.config, "a", encoding="utf-8") as f:
+            f.write("include_diagrams: false\n")
+        sv, se = cache.load(self.schema, self.config)
+        self.assertEqual((1, 3), (cache.hits, cache.misses))
+        self.assertFalse(se.configuration.include_diagrams)
+        # an unreadable snapshot is replaced
+        cache.snapshot_path(self.schema, self.config).write_bytes(b"garbage")
+        cache.load(self.schema, self.config)
+        cache.load(self.schema, self.config)
+        self.assertEqual((2, 4), (cache.hits, cache.misses))
@@ -0,0 +1,137 @@
+"""Tests for the render server."""
+import json
+import socket
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+from linkml_runtime import SchemaView
+
+from linkml_renderer.renderers.html_renderer import HTMLRenderer
+from linkml_renderer.renderers.markdown_renderer import MarkdownRenderer
+from linkml_renderer.server import RenderService, ServerBusy, make_server, parse_schema_specs
+from tests.test_renderers import OUTPUT_DIR, PERSONINFO_DIR
+
+SCHEMA = str(PERSONINFO_DIR / "personinfo.yaml")
+
+
+class TestServer(unittest.TestCase):
+    """Test rendering over HTTP and on a Unix socket."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.service = RenderService({"personinfo": SCHEMA}, workers=2, queue_size=2)
+        cls.service.start()
+        cls.server = make_server(cls.service, port=0)
+        cls.url = "http://{}:{}".format(*cls.server.server_address[:2])
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        with open(PERSONINFO_DIR / "Container-001.yaml", encoding="utf-8") as f:
+            # as sent in JSON, with dates as strings
+            cls.obj = json.loads(json.dumps(yaml.safe_load(f), default=str))
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.service.close()
+
+    def post(self, path: str, body: bytes, content_type: str = "application/json"):
+        request = urllib.request.Request(
+            self.url + path, data=body, headers={"Content-Type": content_type}
+        )
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers["Content-Type"], response.read().decode()
+
+    def test_render(self):
+        sv = SchemaView(SCHEMA)
+        body = json.dumps(self.obj).encode("utf-8")
+        status, content_type, html = self.post("/render/html", body)
+        self.assertEqual(200, status)
+        self.assertTrue(content_type.startswith("text/html"))
+        self.assertEqual(HTMLRenderer().render(self.obj, sv), html)
+        body = yaml.safe_dump(self.obj).encode("utf-8")
+        _, _, md = self.post("/render/markdown?schema=personinfo", body, "application/yaml")
+        self.assertEqual(MarkdownRenderer().render(self.obj, sv), md)
+        with urllib.request.urlopen(self.url + "/stats") as response:
+            stats = json.load(response)
+        self.assertGreaterEqual(stats["completed"], 2)
+        self.assertGreater(stats["latency"]["max"], 0)
+        self.assertIn("html", stats["by_format"])
+
+    def test_errors(self):
+        cases = [
+            ("/render/rst", b"{}", 404),
+            ("/render/html?schema=other", b"{}", 404),
+            ("/render/html", b"{not json", 400),
+            ("/elsewhere", b"{}", 404),
+        ]
+        for path, body, status in cases:
+            with self.assertRaises(urllib.error.HTTPError) as e:
+                self.post(path, body)
+            self.assertEqual(status, e.exception.code, path)
+
+    def test_backpressure(self):
+        slots = self.service._slots
+        taken = 0
+        while slots.acquire(blocking=False):
+            taken += 1
+        try:
+            self.assertEqual(4, taken)
+            with self.assertRaises(ServerBusy):
+                self.service.render(None, "markdown", b"{}")
+            with self.assertRaises(urllib.error.HTTPError) as e:
+                self.post("/render/markdown", b"{}")
+            self.assertEqual(503, e.exception.code)
+        finally:
+            for _ in range(taken):
+                slots.release()
+        self.assertGreaterEqual(self.service.stats.rejected, 2)
+
+    def test_unix_socket(self):
+        OUTPUT_DIR.mkdir(exist_ok=True, parents=True)
+        path = str(OUTPUT_DIR / "server.sock")
+        server = make_server(self.service, socket_path=path)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(path)
+                client.sendall(b"GET /health HTTP/1.1\r\nHost: local\r\nConnection: close\r\n\r\n")
+                response = b""
+                while True:
+                    data = client.recv(4096)
+                    if not data:
+                        break
+                    response += data
+            self.assertTrue(response.startswith(b"HTTP/1.1 200"))
+            self.assertTrue(response.endswith(b"ok\n"))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_threads(self):
+        service = RenderService({"personinfo": SCHEMA}, workers=4, threads=True)
+        service.start()
+        try:
+            sv = SchemaView(SCHEMA)
+            expected = MarkdownRenderer().render(self.obj, sv)
+            body = json.dumps(self.obj).encode("utf-8")
+            with ThreadPoolExecutor(8) as executor:
+                results = list(
+                    executor.map(lambda _: service.render(None, "markdown", body), range(16))
+                )
+            self.assertEqual([expected] * 16, results)
+        finally:
+            service.close()
+
+    def test_parse_schema_specs(self):
+        self.assertEqual(
+            {"personinfo": "a/personinfo.yaml", "p": "b.yaml"},
+            parse_schema_specs(["a/personinfo.yaml", "p=b.yaml"]),
+        )
+        with self.assertRaises(ValueError):
+            parse_schema_specs(["a/x.yaml", "x=b.yaml"])
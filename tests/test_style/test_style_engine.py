@@ -2,12 +2,19 @@
 import logging
 import unittest
 
+from linkml_runtime import SchemaView
 from linkml_runtime.linkml_model import SlotDefinitionName
 from linkml_runtime.utils.introspection import package_schemaview
 
 from linkml_renderer.style import style_engine
-from linkml_renderer.style.model import RenderElementType
+from linkml_renderer.style.model import (
+    Configuration,
+    RenderElementType,
+    RenderRule,
+    RenderType,
+)
 from linkml_renderer.style.style_engine import StyleEngine
+from tests.test_renderers import PERSONINFO_DIR
 
 logger = logging.getLogger(style_engine.__name__)
 
@@ -20,3 +27,53 @@ class TestStyleEngine(unittest.TestCase):
         se = StyleEngine(sv)
         se.configure_slot(SlotDefinitionName("classes"), RenderElementType.table)
         self.assertEqual(RenderElementType.table, se.slot_render_as(SlotDefinitionName("classes")))
+
+    def test_rule_selectors(self):
+        sv = package_schemaview("linkml_runtime.linkml_model.meta")
+        se = StyleEngine(sv)
+        se.configuration = Configuration(
+            rules=[
+                RenderRule(render_as=RenderElementType.simple_list),
+                RenderRule(applies_to_curies=["linkml:classes"], render_as=RenderElementType.TUPLE),
+                RenderRule(
+                    applies_to_curies=["https://w3id.org/linkml/enums"],
+                    applies_to_render_types=[RenderType.MARKDOWN],
+                    render_as=RenderElementType.description_list,
+                ),
+                RenderRule(applies_to_slots=["slots"], render_as=RenderElementType.table),
+            ]
+        )
+        uri = sv.get_uri("classes", expand=True)
+        self.assertEqual(RenderElementType.TUPLE, se.slot_render_as("classes", uri))
+        self.assertEqual(RenderElementType.TUPLE, se.slot_render_as("classes", "linkml:classes"))
+        self.assertEqual(RenderElementType.simple_list, se.slot_render_as("classes"))
+        enums_uri = sv.get_uri("enums", expand=True)
+        self.assertEqual(
+            RenderElementType.description_list,
+            se.slot_render_as("enums", enums_uri, RenderType.MARKDOWN),
+        )
+        self.assertEqual(
+            RenderElementType.simple_list, se.slot_render_as("enums", enums_uri, RenderType.HTML)
+        )
+        self.assertEqual(RenderElementType.table, se.slot_render_as("slots", "linkml:slots"))
+        se.configuration = Configuration()
+        self.assertIsNone(se.slot_render_as("slots", "linkml:slots"))
+        se.configure_slot("slots", RenderElementType.TUPLE)
+        self.assertEqual(RenderElementType.TUPLE, se.slot_render_as("slots", "linkml:slots"))
+
+    def test_title_and_description_slots(self):
+        sv = SchemaView(str(PERSONINFO_DIR / "personinfo.yaml"))
+        se = StyleEngine(sv)
+        self.assertIsNone(se.title_slot("Person"))
+        self.assertIsNone(se.description_slot("Person"))
+        se.configure_description_curies(["schema:description"])
+        self.assertEqual("description", se.description_slot("Person"))
+        se.configure_title_curies(["schema:name"])
+        self.assertEqual("name", se.title_slot("Person"))
+        se.configuration = Configuration(title_curies=["http://schema.org/identifier"])
+        self.assertEqual("id", se.title_slot("Person"))
+        se.configuration = Configuration()
+        self.assertIsNone(se.title_slot("Person"))
+        sv.get_slot("name").slot_uri = "dcterms:title"
+        sv.set_modified()
+        self.assertEqual("name", se.title_slot("Person"))